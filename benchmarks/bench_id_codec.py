@@ -0,0 +1,116 @@
+"""
+Benchmark y paridad del codec de ids (scripts/03_transform/id_codec.py)
+1. Codec: codifica y decodifica los order_id de staging replicados (--scale) y
+   exige que la ida y vuelta devuelva los mismos ids.
+2. Tabla de hechos: construye fct_orders con ids hex (merges y dicts de strings)
+   y con ids codificados (enteros uint64), cada una en un proceso nuevo para que
+   el pico de memoria no herede la memoria de la otra; mide tiempo, pico de
+   memoria y memoria de los datos limpios, y exige que ambas tablas sean identicas.
+Termina con codigo 1 si alguna comparacion difiere.
+
+Requiere staging (Fase 2).
+
+Uso:
+    python benchmarks/bench_id_codec.py
+    python benchmarks/bench_id_codec.py --staging data/staging --scale 10
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "03_transform"))
+
+from create_fact_table import FactTableBuilder
+from dtype_policy import memory_mb
+from id_codec import ID_DTYPE, decode_hex_ids, encode_hex_ids
+from scripts.profiling import PeakMemoryTracker
+from scripts.staging_io import read_staging_table
+
+
+def bench_codec(staging_path: str, scale: int) -> dict:
+    """Ida y vuelta hex -> (hi, lo) -> hex de los order_id replicados"""
+    order_ids = read_staging_table(staging_path, "orders", columns=['order_id'])['order_id']
+    ids = pd.Series(pd.concat([order_ids] * scale, ignore_index=True), dtype=ID_DTYPE, name='order_id')
+    start = time.perf_counter()
+    hi, lo = encode_hex_ids(ids)
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    decoded = decode_hex_ids(hi, lo)
+    decode_seconds = time.perf_counter() - start
+    encoded_mb = memory_mb(pd.DataFrame({'order_id_hi': hi, 'order_id_lo': lo}))
+    return {
+        'rows': len(ids),
+        'encode_seconds': round(encode_seconds, 4),
+        'decode_seconds': round(decode_seconds, 4),
+        'hex_mb': round(memory_mb(ids.to_frame()), 1),
+        'encoded_mb': round(encoded_mb, 1),
+        'identical': bool(decoded.equals(ids)),
+    }
+
+
+def build_fact(staging_path: str, id_codec: bool) -> tuple:
+    """fct_orders con o sin codec de ids, sin cache persistente"""
+    builder = FactTableBuilder(staging_path, persistent_cache=False, id_codec=id_codec)
+    with PeakMemoryTracker() as tracker:
+        fct_orders = builder.create_fact_orders()
+    # Datos limpios memoizados en la cache del cleaner (no se recalculan)
+    cleaned_mb = sum(memory_mb(getattr(builder.cleaner, f"clean_{name}")())
+                     for name in ('orders', 'order_items', 'order_payments', 'order_reviews'))
+    return fct_orders, {
+        'seconds': round(tracker.seconds, 3),
+        'peak_delta_mb': round(tracker.delta_mb, 1),
+        'cleaned_mb': round(cleaned_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del codec de ids hex a enteros de 128 bits")
+    parser.add_argument('--staging', type=str, default="data/staging", help="Directorio de staging")
+    parser.add_argument('--scale', type=int, default=10, help="Copias de los order_id para el codec")
+    parser.add_argument('--output', type=str, default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    results = {'codec': bench_codec(args.staging, args.scale)}
+    codec = results['codec']
+    logger.info(f"Codec: {codec['rows']:,} ids, codificar {codec['encode_seconds']:.3f} s, "
+                f"decodificar {codec['decode_seconds']:.3f} s, {codec['hex_mb']:.1f} MB hex -> "
+                f"{codec['encoded_mb']:.1f} MB uint64, {'OK' if codec['identical'] else 'DIFIERE'}")
+
+    facts = {}
+    for name, id_codec in (('fact_hex', False), ('fact_encoded', True)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            facts[name], results[name] = executor.submit(build_fact, args.staging, id_codec).result()
+    hex_fact, encoded_fact = facts['fact_hex'], facts['fact_encoded']
+    try:
+        pd.testing.assert_frame_equal(encoded_fact, hex_fact, check_exact=True)
+        results['fact_identical'] = True
+    except AssertionError as e:
+        logger.error(f"fct_orders difiere entre ids hex y codificados\n{e}")
+        results['fact_identical'] = False
+
+    logger.info("=" * 70)
+    logger.info(f"{'fct_orders':<16}{'Tiempo s':>12}{'Pico MB':>12}{'Limpios MB':>14}")
+    for name in ('fact_hex', 'fact_encoded'):
+        stats = results[name]
+        logger.info(f"{name:<16}{stats['seconds']:>12.3f}{stats['peak_delta_mb']:>12.1f}{stats['cleaned_mb']:>14.1f}")
+    logger.info(f"Paridad: {'OK' if results['fact_identical'] else 'DIFIERE'}")
+    logger.info("=" * 70)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Resultados guardados en {args.output}")
+    return codec['identical'] and results['fact_identical']
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,189 @@
+"""
+Benchmark de perfiles de escritura Parquet
+Escribe cada tabla con varios perfiles (codec y nivel, row group, diccionario,
+orden previo y bloom filters) y reporta tamano del archivo, tiempo de escritura
+y tiempo de lectura filtrada por la clave de busqueda de la tabla (p. ej.
+order_id = X), junto con cuantos row groups no se pueden descartar con las
+estadisticas min/max. Sirve para elegir los perfiles de la seccion parquet de
+config.yaml a partir de datos.
+
+Requiere staging (Fase 2) y, para las tablas del modelo estrella, transformed (Fase 3).
+
+Uso:
+    python benchmarks/bench_parquet_profiles.py
+    python benchmarks/bench_parquet_profiles.py --tables orders geolocation fct_orders --lookups 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.chdir(str(PROJECT_ROOT))
+
+from config.pipeline_config import DEFAULT_WRITE_PROFILE, get_write_profile
+from scripts.parquet_profiles import write_parquet
+from scripts.staging_io import read_staging_table
+
+WORK_PATH = PROJECT_ROOT / "benchmarks" / "work" / "parquet_profiles"
+
+# Clave por la que se buscan filas de cada tabla
+LOOKUP_KEYS = {
+    'customers': 'customer_id',
+    'products': 'product_id',
+    'sellers': 'seller_id',
+    'orders': 'order_id',
+    'order_items': 'order_id',
+    'order_payments': 'order_id',
+    'order_reviews': 'order_id',
+    'geolocation': 'geolocation_zip_code_prefix',
+    'dim_customers': 'customer_id',
+    'dim_products': 'product_id',
+    'dim_sellers': 'seller_id',
+    'fct_orders': 'order_id',
+}
+TRANSFORMED_TABLES = ('dim_customers', 'dim_products', 'dim_sellers', 'fct_orders')
+
+# Perfiles candidatos; 'key' se reemplaza por la clave de busqueda de la tabla
+CANDIDATES = {
+    'snappy': {},
+    'lz4': {'compression': 'lz4'},
+    'zstd-3': {'compression': 'zstd', 'compression_level': 3},
+    'zstd-9': {'compression': 'zstd', 'compression_level': 9},
+    'zstd-3-sin-dict': {'compression': 'zstd', 'compression_level': 3, 'use_dictionary': False},
+    'zstd-3-rg64k': {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65_536},
+    'zstd-3-rg64k-orden': {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65_536,
+                           'sort_by': ['key']},
+    'zstd-3-rg64k-bloom': {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65_536,
+                           'bloom_filter_columns': ['key']},
+    'zstd-3-rg64k-orden-bloom': {'compression': 'zstd', 'compression_level': 3, 'row_group_size': 65_536,
+                                 'sort_by': ['key'], 'bloom_filter_columns': ['key']},
+}
+
+
+def _profile(overrides: dict, key: str) -> dict:
+    profile = dict(DEFAULT_WRITE_PROFILE)
+    for name, value in overrides.items():
+        profile[name] = [key if column == 'key' else column for column in value] \
+            if isinstance(value, list) else value
+    return profile
+
+
+def _candidate_row_groups(path: Path, key: str, value) -> int:
+    """Row groups cuyo rango min/max incluye value (los que un lector debe abrir)"""
+    metadata = pq.ParquetFile(path).metadata
+    index = metadata.schema.to_arrow_schema().get_field_index(key)
+    candidates = 0
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(index).statistics
+        if stats is None or not stats.has_min_max or stats.min <= value <= stats.max:
+            candidates += 1
+    return candidates
+
+
+def _absent_key(keys: list, rng: random.Random):
+    """
+    Clave ausente pero dentro del rango min/max de la tabla
+
+    Las estadisticas min/max no pueden descartarla; es el caso en que un bloom
+    filter permite saltar el row group.
+    """
+    present = set(keys)
+    low, high = min(keys), max(keys)
+    while True:
+        if isinstance(low, str):
+            candidate = ''.join(rng.choice('0123456789abcdef') for _ in range(len(low)))
+        else:
+            candidate = rng.randint(low, high)
+        if candidate not in present and low < candidate < high:
+            return candidate
+
+
+def _load_table(table: str, staging_path: Path, transformed_path: Path) -> pa.Table:
+    if table in TRANSFORMED_TABLES:
+        return pq.read_table(transformed_path / f"{table}.parquet")
+    return pa.Table.from_pandas(read_staging_table(staging_path, table), preserve_index=False)
+
+
+def bench_table(table: str, data: pa.Table, lookups: int, seed: int) -> dict:
+    """Escribe la tabla con cada perfil y mide tamano, escritura y lectura filtrada"""
+    key = LOOKUP_KEYS[table]
+    keys = pc.unique(data[key].drop_null()).to_pylist()
+    rng = random.Random(seed)
+    sample = rng.sample(keys, min(lookups, len(keys)))
+    missing = [_absent_key(keys, rng)] if keys else []
+
+    results = {}
+    for name, overrides in CANDIDATES.items():
+        profile = _profile(overrides, key)
+        path = WORK_PATH / table / f"{name}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        size = write_parquet(data, path, profile)
+        write_seconds = time.perf_counter() - start
+
+        timings, row_groups = [], []
+        for value in sample + missing:
+            start = time.perf_counter()
+            pq.read_table(path, filters=pc.field(key) == value)
+            timings.append(time.perf_counter() - start)
+            row_groups.append(_candidate_row_groups(path, key, value))
+        metadata = pq.ParquetFile(path).metadata
+        results[name] = {
+            'bytes': size,
+            'write_seconds': round(write_seconds, 3),
+            'lookup_ms': round(1000 * sum(timings[:len(sample)]) / max(len(sample), 1), 2),
+            'missing_lookup_ms': round(1000 * timings[-1], 2) if missing else None,
+            'row_groups': metadata.num_row_groups,
+            'candidate_row_groups': round(sum(row_groups[:len(sample)]) / max(len(sample), 1), 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de perfiles de escritura Parquet")
+    parser.add_argument('--staging', type=str, default="data/staging", help="Directorio de staging")
+    parser.add_argument('--transformed', type=str, default="data/transformed", help="Directorio del modelo estrella")
+    parser.add_argument('--tables', nargs='+', choices=list(LOOKUP_KEYS), default=list(LOOKUP_KEYS))
+    parser.add_argument('--lookups', type=int, default=20, help="Busquedas por clave por perfil")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for table in args.tables:
+        data = _load_table(table, Path(args.staging), Path(args.transformed))
+        logger.info(f"{table}: {data.num_rows:,} filas, perfil actual {get_write_profile(table)}")
+        results[table] = bench_table(table, data, args.lookups, args.seed)
+
+    logger.info("=" * 112)
+    logger.info(f"{'Tabla':<16}{'Perfil':<26}{'MB':>8}{'vs snappy':>10}{'Escr. s':>9}"
+                f"{'Busq. ms':>10}{'Ausente ms':>11}{'RG':>6}{'RG cand.':>10}")
+    for table, by_profile in results.items():
+        base_bytes = by_profile['snappy']['bytes']
+        for name, stats in by_profile.items():
+            logger.info(f"{table:<16}{name:<26}{stats['bytes'] / 1024 / 1024:>8.2f}"
+                        f"{stats['bytes'] / base_bytes:>9.2f}x{stats['write_seconds']:>9.3f}"
+                        f"{stats['lookup_ms']:>10.2f}{stats['missing_lookup_ms'] or 0:>11.2f}"
+                        f"{stats['row_groups']:>6}{stats['candidate_row_groups']:>10.1f}")
+    logger.info("=" * 112)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Resultados guardados en {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,112 @@
+"""
+Benchmark de los modos de extraccion a staging (read_sql, cursor, copy)
+Extrae cada una de las 9 tablas de OLTP con cada modo, compara tiempo,
+registros/segundo y pico de memoria, y verifica que los Parquet resultantes
+tengan el mismo contenido que el modo read_sql.
+
+Requiere la base OLTP cargada (Fase 1).
+
+Uso:
+    python benchmarks/bench_staging_extract.py
+    python benchmarks/bench_staging_extract.py --modes read_sql copy --tables orders geolocation
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.chdir(str(PROJECT_ROOT))
+
+from run_pipeline import load_module
+from scripts.staging_io import staging_table_path
+
+WORK_PATH = PROJECT_ROOT / "benchmarks" / "work" / "staging_extract"
+
+TABLES = [
+    'customers', 'products', 'sellers', 'product_category_translation', 'orders',
+    'order_items', 'order_payments', 'order_reviews', 'geolocation',
+]
+MODES = ('read_sql', 'cursor', 'copy')
+
+
+def _normalized(staging_path: Path, table: str) -> pd.DataFrame:
+    """Lee una tabla de staging llevando fechas y textos a tipos comparables entre modos"""
+    df = pq.read_table(staging_table_path(staging_path, table)).to_pandas()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].astype('datetime64[us]')
+        elif pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de modos de extraccion a staging")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--tables', nargs='+', choices=TABLES, default=TABLES)
+    parser.add_argument('--batch-size', type=int, default=None, help="Filas por lote (cursor/copy)")
+    parser.add_argument('--output', type=str, default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    staging_module = load_module(PROJECT_ROOT / "scripts" / "02_staging" / "load_to_staging.py",
+                                 "load_to_staging")
+    loaders = {
+        mode: staging_module.OLTPToStagingLoader(staging_path=str(WORK_PATH / mode), extract_mode=mode,
+                                                 batch_size=args.batch_size)
+        for mode in args.modes
+    }
+
+    results = {}
+    mismatches = []
+    for table in args.tables:
+        results[table] = {}
+        for mode, loader in loaders.items():
+            loader.extract_table_to_parquet(table)
+            results[table][mode] = loader.extract_stats[table]
+
+        # Paridad contra el primer modo (read_sql por defecto)
+        reference_mode = args.modes[0]
+        reference = _normalized(WORK_PATH / reference_mode, table)
+        for mode in args.modes[1:]:
+            try:
+                pd.testing.assert_frame_equal(reference, _normalized(WORK_PATH / mode, table),
+                                              check_dtype=False)
+            except AssertionError as e:
+                mismatches.append((table, mode))
+                logger.error(f"{table}: {mode} difiere de {reference_mode}: {e}")
+
+    reference_mode = args.modes[0]
+    logger.info("=" * 90)
+    logger.info(f"{'Tabla':<30}{'Modo':<10}{'Filas':>12}{'Seg':>9}{'Filas/s':>12}{'Pico MB':>9}{'vs ' + reference_mode:>12}")
+    for table, by_mode in results.items():
+        base_seconds = by_mode[reference_mode]['seconds']
+        for mode, stats in by_mode.items():
+            speedup = base_seconds / stats['seconds'] if stats['seconds'] else float('nan')
+            logger.info(f"{table:<30}{mode:<10}{stats['rows']:>12,}{stats['seconds']:>9.2f}"
+                        f"{stats['rows_per_sec'] or 0:>12,}{stats['peak_delta_mb']:>9.1f}{speedup:>11.2f}x")
+    logger.info("=" * 90)
+    for mode in args.modes:
+        total = sum(by_mode[mode]['seconds'] for by_mode in results.values())
+        logger.info(f"Total {mode}: {total:.2f} s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Resultados guardados en {args.output}")
+
+    if mismatches:
+        logger.error(f"{len(mismatches)} tablas con diferencias de contenido entre modos")
+        return False
+    logger.success("Todos los modos producen el mismo contenido")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,196 @@
+"""
+Micro-benchmark y paridad de los kernels vectorizados de la transformacion
+Compara cada transformacion con su implementacion anterior (apply por fila y
+lambda x: x.iloc[0] por grupo) sobre los datos limpios de staging replicados a
+escala (--scale, por defecto 10x, con ids renombrados por copia). Antes de medir
+se agregan casos borde (pesos 0, nulos y negativos; primer item o pago con
+valores nulos) y se exige que la salida sea identica: mismos valores, nulos,
+dtypes, indice y orden. Termina con codigo 1 si alguna transformacion difiere.
+
+Requiere staging (Fase 2).
+
+Uso:
+    python benchmarks/bench_transform_kernels.py
+    python benchmarks/bench_transform_kernels.py --scale 1 --repeat 3
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "03_transform"))
+
+from create_dimensions import classify_product_size
+from create_fact_table import aggregate_order_items, aggregate_order_payments
+from data_cleaning import DataCleaner
+
+
+# Implementaciones anteriores (referencia de paridad)
+
+def legacy_classify_size(dim_products: pd.DataFrame) -> pd.Series:
+    def classify_size(row):
+        if row['product_weight_g'] == 0:
+            return 'desconocido'
+        elif row['product_weight_g'] < 500:
+            return 'pequeno'
+        elif row['product_weight_g'] < 2000:
+            return 'mediano'
+        else:
+            return 'grande'
+    return dim_products.apply(classify_size, axis=1)
+
+
+def legacy_aggregate_order_items(df_order_items: pd.DataFrame) -> pd.DataFrame:
+    order_items_agg = df_order_items.groupby('order_id').agg({
+        'order_item_id': 'count',
+        'price': 'sum',
+        'freight_value': 'sum',
+        'product_id': lambda x: x.iloc[0],
+        'seller_id': lambda x: x.iloc[0]
+    }).reset_index()
+    order_items_agg.columns = ['order_id', 'items_count', 'total_items_price',
+                               'total_freight', 'product_id', 'seller_id']
+    return order_items_agg
+
+
+def legacy_aggregate_order_payments(df_order_payments: pd.DataFrame) -> pd.DataFrame:
+    order_payments_agg = df_order_payments.groupby('order_id').agg({
+        'payment_value': 'sum',
+        'payment_installments': 'max',
+        'payment_type': lambda x: x.iloc[0]
+    }).reset_index()
+    order_payments_agg.columns = ['order_id', 'total_payment',
+                                  'max_installments', 'payment_type']
+    return order_payments_agg
+
+
+def _scale(df: pd.DataFrame, scale: int, id_columns: list) -> pd.DataFrame:
+    """Replica el DataFrame scale veces; las columnas id reciben el sufijo de la copia"""
+    if scale <= 1:
+        return df
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        for column in id_columns:
+            copy[column] = copy[column] + f"-{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def _with_edge_cases(df: pd.DataFrame, rows: list) -> pd.DataFrame:
+    """Agrega filas borde con las columnas de df (el resto queda nulo)"""
+    edge = pd.DataFrame(rows).reindex(columns=df.columns)
+    edge = edge.astype({column: df[column].dtype for column in edge.columns if column in rows[0]},
+                       errors='ignore')
+    return pd.concat([df, edge], ignore_index=True)
+
+
+def load_inputs(staging_path: str, scale: int) -> dict:
+    # Ids en hex: las implementaciones anteriores y el replicado trabajan sobre strings
+    cleaner = DataCleaner(staging_path, persistent_cache=False, id_codec=False)
+    products = _scale(cleaner.clean_products(), scale, ['product_id'])
+    products = _with_edge_cases(products, [
+        {'product_id': 'edge-zero', 'product_weight_g': 0.0},
+        {'product_id': 'edge-null', 'product_weight_g': np.nan},
+        {'product_id': 'edge-negative', 'product_weight_g': -1.0},
+        {'product_id': 'edge-500', 'product_weight_g': 500.0},
+        {'product_id': 'edge-2000', 'product_weight_g': 2000.0},
+    ])
+    items = _scale(cleaner.clean_order_items(), scale, ['order_id'])
+    items = _with_edge_cases(items, [
+        # Primer item sin producto ni vendedor: se conserva el nulo
+        {'order_id': 'edge-order', 'order_item_id': 1, 'price': 1.0, 'freight_value': 0.5},
+        {'order_id': 'edge-order', 'order_item_id': 2, 'price': 2.0, 'freight_value': 0.5,
+         'product_id': 'p2', 'seller_id': 's2'},
+    ])
+    payments = _scale(cleaner.clean_order_payments(), scale, ['order_id'])
+    payments = _with_edge_cases(payments, [
+        {'order_id': 'edge-order', 'payment_sequential': 1, 'payment_value': 1.0, 'payment_installments': 1},
+        {'order_id': 'edge-order', 'payment_sequential': 2, 'payment_value': 2.0, 'payment_installments': 3,
+         'payment_type': 'voucher'},
+    ])
+    return {'products': products, 'order_items': items, 'order_payments': payments}
+
+
+def _timed(function, data, repeat: int):
+    """Mejor tiempo de repeat ejecuciones y el resultado de la ultima"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(data)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def _identical(legacy, vectorized) -> str:
+    """None si las salidas son identicas; si no, la diferencia"""
+    try:
+        if isinstance(legacy, pd.Series):
+            pd.testing.assert_series_equal(vectorized, legacy, check_exact=True)
+        else:
+            pd.testing.assert_frame_equal(vectorized, legacy, check_exact=True)
+    except AssertionError as e:
+        return str(e)
+    return None
+
+
+TRANSFORMS = {
+    'classify_size': ('products', legacy_classify_size,
+                      lambda df: classify_product_size(df['product_weight_g'])),
+    'aggregate_order_items': ('order_items', legacy_aggregate_order_items, aggregate_order_items),
+    'aggregate_order_payments': ('order_payments', legacy_aggregate_order_payments, aggregate_order_payments),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de los kernels vectorizados de la transformacion")
+    parser.add_argument('--staging', type=str, default="data/staging", help="Directorio de staging")
+    parser.add_argument('--scale', type=int, default=10, help="Copias de los datos limpios")
+    parser.add_argument('--repeat', type=int, default=1, help="Repeticiones por implementacion (mejor tiempo)")
+    parser.add_argument('--output', type=str, default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.staging, args.scale)
+    results, valid = {}, True
+    for name, (input_name, legacy, vectorized) in TRANSFORMS.items():
+        data = inputs[input_name]
+        logger.info(f"{name}: {len(data):,} filas de entrada (escala {args.scale}x)")
+        legacy_seconds, legacy_result = _timed(legacy, data, args.repeat)
+        vectorized_seconds, vectorized_result = _timed(vectorized, data, args.repeat)
+        difference = _identical(legacy_result, vectorized_result)
+        if difference:
+            valid = False
+            logger.error(f"{name}: la salida difiere de la implementacion anterior\n{difference}")
+        results[name] = {
+            'rows': len(data),
+            'legacy_seconds': round(legacy_seconds, 4),
+            'vectorized_seconds': round(vectorized_seconds, 4),
+            'speedup': round(legacy_seconds / vectorized_seconds, 1) if vectorized_seconds > 0 else None,
+            'identical': difference is None,
+        }
+
+    logger.info("=" * 90)
+    logger.info(f"{'Transformacion':<28}{'Filas':>12}{'Anterior s':>12}{'Vectorizado s':>15}{'Aceleracion':>13}{'Paridad':>10}")
+    for name, stats in results.items():
+        logger.info(f"{name:<28}{stats['rows']:>12,}{stats['legacy_seconds']:>12.3f}"
+                    f"{stats['vectorized_seconds']:>15.4f}{stats['speedup'] or 0:>12.1f}x"
+                    f"{'OK' if stats['identical'] else 'DIFIERE':>10}")
+    logger.info("=" * 90)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Resultados guardados en {args.output}")
+    return valid
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
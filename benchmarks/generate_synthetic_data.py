@@ -0,0 +1,460 @@
+"""
+Generador de datos sinteticos Olist para benchmarks de escala
+Escribe los 9 CSVs de Olist con un factor de escala (1x ~ tamano del dataset
+original) y distribuciones realistas: clientes recurrentes, ordenes con varios
+items, varios pagos por orden, muchas filas de geolocalizacion por zip y
+foreign keys validas. La salida es determinista a partir de la semilla.
+
+Uso:
+    python benchmarks/generate_synthetic_data.py --scale 10 --seed 42
+    python benchmarks/generate_synthetic_data.py --scale 1 --output data/raw
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Tamanos del dataset original (factor 1x)
+BASE_ORDERS = 99_441
+BASE_PRODUCTS = 32_951
+BASE_SELLERS = 3_095
+BASE_ZIP_PREFIXES = 19_015
+BASE_GEOLOCATION_ROWS = 1_000_163
+MAX_ZIP_PREFIXES = 89_000
+
+ORDERS_PER_CHUNK = 200_000
+GEOLOCATION_ZIPS_PER_CHUNK = 5_000
+
+# Rangos de CEP (prefijo de 5 digitos) por estado
+STATE_ZIP_RANGES = [
+    ('SP', 1000, 19999), ('RJ', 20000, 28999), ('ES', 29000, 29999), ('MG', 30000, 39999),
+    ('BA', 40000, 48999), ('SE', 49000, 49999), ('PE', 50000, 56999), ('AL', 57000, 57999),
+    ('PB', 58000, 58999), ('RN', 59000, 59999), ('CE', 60000, 63999), ('PI', 64000, 64999),
+    ('MA', 65000, 65999), ('PA', 66000, 68899), ('AP', 68900, 68999), ('AM', 69000, 69299),
+    ('RR', 69300, 69399), ('AC', 69900, 69999), ('DF', 70000, 72799), ('GO', 72800, 76799),
+    ('RO', 76800, 76999), ('TO', 77000, 77999), ('MT', 78000, 78899), ('MS', 79000, 79999),
+    ('PR', 80000, 87999), ('SC', 88000, 89999), ('RS', 90000, 99999),
+]
+
+# Participacion de clientes por estado (aproximada al dataset original)
+STATE_WEIGHTS = {
+    'SP': .420, 'RJ': .129, 'MG': .117, 'RS': .055, 'PR': .051, 'SC': .037, 'BA': .034,
+    'DF': .022, 'ES': .020, 'GO': .020, 'PE': .017, 'CE': .013, 'PA': .010, 'MT': .009,
+    'MA': .008, 'MS': .007, 'PB': .005, 'PI': .005, 'RN': .005, 'AL': .004, 'SE': .004,
+    'TO': .003, 'RO': .003, 'AM': .002, 'AC': .001, 'AP': .001, 'RR': .001,
+}
+
+# Coordenadas aproximadas (lat, lng) de la capital de cada estado
+STATE_CENTERS = {
+    'SP': (-23.55, -46.63), 'RJ': (-22.91, -43.17), 'ES': (-20.32, -40.34), 'MG': (-19.92, -43.94),
+    'BA': (-12.97, -38.50), 'SE': (-10.91, -37.07), 'PE': (-8.05, -34.88), 'AL': (-9.67, -35.74),
+    'PB': (-7.12, -34.86), 'RN': (-5.79, -35.21), 'CE': (-3.73, -38.52), 'PI': (-5.09, -42.80),
+    'MA': (-2.53, -44.30), 'PA': (-1.46, -48.50), 'AP': (0.03, -51.07), 'AM': (-3.12, -60.02),
+    'RR': (2.82, -60.67), 'AC': (-9.97, -67.81), 'DF': (-15.79, -47.88), 'GO': (-16.69, -49.26),
+    'RO': (-8.76, -63.90), 'TO': (-10.18, -48.33), 'MT': (-15.60, -56.10), 'MS': (-20.44, -54.65),
+    'PR': (-25.43, -49.27), 'SC': (-27.59, -48.55), 'RS': (-30.03, -51.23),
+}
+
+ORDER_STATUS = {
+    'delivered': .9702, 'shipped': .0111, 'canceled': .0063, 'unavailable': .0061,
+    'invoiced': .0032, 'processing': .0030, 'created': .0001,
+}
+PAYMENT_TYPES = {'credit_card': .739, 'boleto': .190, 'voucher': .056, 'debit_card': .015}
+REVIEW_SCORES = {5: .577, 4: .193, 3: .082, 2: .032, 1: .116}
+ITEMS_PER_ORDER = {1: .900, 2: .076, 3: .013, 4: .005, 5: .002, 6: .004}
+EXTRA_PAYMENTS = {0: .970, 1: .022, 2: .005, 3: .003}
+
+PURCHASE_START = pd.Timestamp('2016-09-04').value // 10**9
+PURCHASE_END = pd.Timestamp('2018-10-17').value // 10**9
+DAY = 86_400
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """Mezcla de bits splitmix64 vectorizada (uint64, con desborde modular)"""
+    with np.errstate(over='ignore'):
+        z = values + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _choice(rng: np.random.Generator, distribution: dict, size: int) -> np.ndarray:
+    values = list(distribution)
+    weights = np.array(list(distribution.values()), dtype=float)
+    return np.asarray(values)[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+class OlistDataGenerator:
+    """Genera los 9 CSVs de Olist con un factor de escala y una semilla"""
+
+    def __init__(self, scale_factor: float = 1.0, seed: int = 42):
+        if scale_factor <= 0:
+            raise ValueError("El factor de escala debe ser positivo")
+        self.scale_factor = scale_factor
+        self.seed = seed
+        self.n_orders = max(1, round(BASE_ORDERS * scale_factor))
+        self.n_products = max(1, round(BASE_PRODUCTS * scale_factor))
+        self.n_sellers = max(1, round(BASE_SELLERS * scale_factor))
+        self.n_zips = max(1, min(round(BASE_ZIP_PREFIXES * scale_factor), MAX_ZIP_PREFIXES))
+        self.n_geolocation = max(self.n_zips, round(BASE_GEOLOCATION_ROWS * scale_factor))
+
+    # ------------------------------------------------------------------
+    # Utilidades deterministas
+    # ------------------------------------------------------------------
+    def _rng(self, *stream) -> np.random.Generator:
+        return np.random.default_rng([self.seed, *stream])
+
+    def hex_ids(self, namespace: int, indices: np.ndarray) -> np.ndarray:
+        """IDs hexadecimales de 32 caracteres derivados de (semilla, tipo, indice)"""
+        salt = _splitmix64(np.array([self.seed * 1_000 + namespace], dtype=np.uint64))[0]
+        x = np.asarray(indices, dtype=np.uint64) ^ salt
+        raw = np.empty((len(x), 2), dtype='>u8')
+        raw[:, 0] = _splitmix64(x)
+        raw[:, 1] = _splitmix64(x ^ np.uint64(0x5DEECE66D))
+        return np.frombuffer(raw.tobytes().hex().encode('ascii'), dtype='S32').astype(str)
+
+    # ------------------------------------------------------------------
+    # Tablas maestras
+    # ------------------------------------------------------------------
+    def _build_zips(self):
+        """Prefijos de zip con estado, ciudad, centro y peso de poblacion"""
+        rng = self._rng(1)
+        states = [state for state, _, _ in STATE_ZIP_RANGES]
+        state_weights = np.array([STATE_WEIGHTS[state] for state in states])
+        zips_per_state = np.maximum(1, np.round(state_weights / state_weights.sum() * self.n_zips)).astype(int)
+
+        prefixes, zip_states = [], []
+        for (state, low, high), count in zip(STATE_ZIP_RANGES, zips_per_state):
+            count = min(count, high - low + 1)
+            prefixes.append(np.sort(rng.choice(np.arange(low, high + 1), size=count, replace=False)))
+            zip_states.extend([state] * count)
+        prefixes = np.concatenate(prefixes)
+        zip_states = np.array(zip_states)
+
+        # Ciudades: varias por estado, la capital concentra mas zips
+        city_index = np.minimum(rng.geometric(0.08, size=len(prefixes)) - 1, 199)
+        cities = np.where(city_index == 0, 'capital', 'municipio ' + city_index.astype(str))
+        cities = np.char.add(np.char.add(cities.astype(str), ' '), np.char.lower(zip_states.astype(str)))
+
+        centers = np.array([STATE_CENTERS[state] for state in zip_states])
+        offsets = rng.normal(0, 0.6, size=(len(prefixes), 2)) * (city_index[:, None] > 0)
+        weights = np.array([STATE_WEIGHTS[state] for state in zip_states]) * rng.lognormal(0, 1, len(prefixes))
+        state_totals = pd.Series(weights).groupby(zip_states).transform('sum').to_numpy()
+        state_share = np.array([STATE_WEIGHTS[state] for state in zip_states])
+
+        self.zips = pd.DataFrame({
+            'prefix': np.char.zfill(prefixes.astype(str), 5),
+            'state': zip_states,
+            'city': cities,
+            'lat': centers[:, 0] + offsets[:, 0],
+            'lng': centers[:, 1] + offsets[:, 1],
+            'weight': weights / state_totals * state_share,
+        })
+        self.zips['weight'] /= self.zips['weight'].sum()
+
+    def _zip_for_index(self, namespace: int, indices: np.ndarray) -> np.ndarray:
+        """Zip determinista por indice, distribuido segun el peso de poblacion"""
+        salt = _splitmix64(np.array([self.seed * 1_000 + namespace + 500], dtype=np.uint64))[0]
+        uniform = _splitmix64(np.asarray(indices, dtype=np.uint64) ^ salt) / float(2**64)
+        cumulative = np.cumsum(self.zips['weight'].to_numpy())
+        return np.minimum(np.searchsorted(cumulative, uniform, side='right'), len(self.zips) - 1)
+
+    def _build_products(self) -> pd.DataFrame:
+        rng = self._rng(2)
+        n = self.n_products
+        translation = pd.read_csv(PROJECT_ROOT / "data" / "raw" / "product_category_name_translation.csv",
+                                  encoding='utf-8-sig')
+        categories = translation['product_category_name'].to_numpy()
+        # Popularidad de categorias tipo Zipf
+        category_weights = 1.0 / np.arange(1, len(categories) + 1) ** 0.9
+        category = categories[rng.choice(len(categories), size=n, p=category_weights / category_weights.sum())]
+        category = np.where(rng.random(n) < 0.0185, None, category).astype(object)
+
+        weight_g = np.clip(np.round(rng.lognormal(6.6, 1.2, n)), 2, 40_425).astype(int)
+        length = np.clip(np.round(rng.lognormal(3.3, 0.45, n)), 7, 105).astype(int)
+        height = np.clip(np.round(rng.lognormal(2.6, 0.7, n)), 2, 105).astype(int)
+        width = np.clip(np.round(rng.lognormal(3.0, 0.45, n)), 6, 118).astype(int)
+
+        products = pd.DataFrame({
+            'product_id': self.hex_ids(2, np.arange(n)),
+            'product_category_name': category,
+            'product_name_lenght': pd.array(np.clip(rng.normal(48, 10, n), 5, 76).astype(int), dtype='Int64'),
+            'product_description_lenght': pd.array(np.clip(rng.lognormal(6.5, 0.8, n), 4, 3992).astype(int), dtype='Int64'),
+            'product_photos_qty': pd.array(np.clip(rng.geometric(0.45, n), 1, 20), dtype='Int64'),
+            'product_weight_g': pd.array(weight_g, dtype='Int64'),
+            'product_length_cm': pd.array(length, dtype='Int64'),
+            'product_height_cm': pd.array(height, dtype='Int64'),
+            'product_width_cm': pd.array(width, dtype='Int64'),
+        })
+        # Productos sin categoria tampoco tienen nombre/descripcion/fotos
+        no_category = products['product_category_name'].isna()
+        products.loc[no_category, ['product_name_lenght', 'product_description_lenght', 'product_photos_qty']] = pd.NA
+        # Unos pocos productos sin medidas
+        missing_dims = rng.random(n) < 0.0001
+        products.loc[missing_dims, ['product_weight_g', 'product_length_cm',
+                                    'product_height_cm', 'product_width_cm']] = pd.NA
+
+        # Precio base y vendedor principal (pocos vendedores concentran muchos productos)
+        self.product_price = np.round(rng.lognormal(4.4, 0.95, n), 2).clip(0.85, 6_735)
+        self.product_weight = weight_g
+        seller_weights = 1.0 / np.arange(1, self.n_sellers + 1) ** 1.1
+        self.product_seller = rng.permutation(self.n_sellers)[
+            rng.choice(self.n_sellers, size=n, p=seller_weights / seller_weights.sum())
+        ]
+        popularity = 1.0 / np.arange(1, n + 1) ** 0.8
+        self.product_popularity = popularity[rng.permutation(n)]
+        self.product_popularity /= self.product_popularity.sum()
+        return products
+
+    def _build_sellers(self) -> pd.DataFrame:
+        rng = self._rng(3)
+        # Los vendedores se concentran aun mas en SP que los clientes
+        weights = self.zips['weight'].to_numpy() * np.where(self.zips['state'] == 'SP', 2.0, 0.6)
+        zip_index = rng.choice(len(self.zips), size=self.n_sellers, p=weights / weights.sum())
+        zips = self.zips.iloc[zip_index]
+        return pd.DataFrame({
+            'seller_id': self.hex_ids(3, np.arange(self.n_sellers)),
+            'seller_zip_code_prefix': zips['prefix'].to_numpy(),
+            'seller_city': zips['city'].to_numpy(),
+            'seller_state': zips['state'].to_numpy(),
+        })
+
+    # ------------------------------------------------------------------
+    # Ordenes y tablas dependientes (por chunks)
+    # ------------------------------------------------------------------
+    def _unique_customer_index(self, rng: np.random.Generator, order_index: np.ndarray) -> np.ndarray:
+        """Indice de cliente unico por orden: ~3.4% de ordenes son de clientes recurrentes"""
+        unique_index = order_index.copy()
+        repeat = (rng.random(len(order_index)) < 0.034) & (order_index > 0)
+        unique_index[repeat] = np.floor(rng.random(repeat.sum()) * order_index[repeat]).astype(np.int64)
+        return unique_index
+
+    def _build_order_chunk(self, chunk_index: int, start: int, stop: int) -> dict:
+        rng = self._rng(10, chunk_index)
+        n = stop - start
+        order_index = np.arange(start, stop, dtype=np.int64)
+        order_ids = self.hex_ids(10, order_index)
+
+        # Clientes: un customer_id por orden; customer_unique_id se repite en recurrentes
+        unique_index = self._unique_customer_index(rng, order_index)
+        # La ubicacion depende solo del cliente unico: se repite en sus ordenes
+        zip_index = self._zip_for_index(12, unique_index)
+        zips = self.zips.iloc[zip_index]
+        customers = pd.DataFrame({
+            'customer_id': self.hex_ids(11, order_index),
+            'customer_unique_id': self.hex_ids(12, unique_index),
+            'customer_zip_code_prefix': zips['prefix'].to_numpy(),
+            'customer_city': zips['city'].to_numpy(),
+            'customer_state': zips['state'].to_numpy(),
+        })
+
+        # Fechas de la orden (volumen creciente en el tiempo)
+        span = PURCHASE_END - PURCHASE_START
+        purchase = PURCHASE_START + (rng.beta(2.0, 1.2, n) * span).astype(np.int64)
+        status = _choice(rng, ORDER_STATUS, n)
+        approved = purchase + rng.exponential(10 * 3600, n).astype(np.int64)
+        carrier = approved + rng.gamma(2.0, 1.4 * DAY, n).astype(np.int64)
+        delivered = carrier + rng.gamma(2.5, 3.6 * DAY, n).astype(np.int64)
+        estimated = (purchase // DAY + rng.normal(24, 8, n).clip(3, 60).astype(np.int64)) * DAY
+
+        def to_datetime(seconds, valid):
+            return pd.Series(pd.to_datetime(seconds, unit='s')).where(valid)
+
+        has_approval = ~np.isin(status, ['created']) & (rng.random(n) > 0.0015)
+        has_carrier = np.isin(status, ['delivered', 'shipped']) & (rng.random(n) > 0.0002)
+        has_delivery = (status == 'delivered') & (rng.random(n) > 0.0003)
+        orders = pd.DataFrame({
+            'order_id': order_ids,
+            'customer_id': customers['customer_id'].to_numpy(),
+            'order_status': status,
+            'order_purchase_timestamp': pd.to_datetime(purchase, unit='s'),
+            'order_approved_at': to_datetime(approved, has_approval),
+            'order_delivered_carrier_date': to_datetime(carrier, has_carrier),
+            'order_delivered_customer_date': to_datetime(delivered, has_delivery),
+            'order_estimated_delivery_date': pd.to_datetime(estimated, unit='s'),
+        })
+
+        # Items: ~0.8% de ordenes (canceladas/no disponibles) sin items
+        has_items = ~(np.isin(status, ['unavailable', 'canceled', 'created']) & (rng.random(n) < 0.6))
+        items_count = np.where(has_items, _choice(rng, ITEMS_PER_ORDER, n), 0).astype(int)
+        item_order = np.repeat(np.arange(n), items_count)
+        item_seq = np.concatenate([np.arange(1, k + 1) for k in items_count]) if len(item_order) else np.array([], int)
+        product = rng.choice(self.n_products, size=len(item_order), p=self.product_popularity)
+        # En ordenes con varios items es comun repetir el mismo producto
+        repeat_previous = (item_seq > 1) & (rng.random(len(item_order)) < 0.6)
+        for position in np.flatnonzero(repeat_previous):
+            product[position] = product[position - 1]
+        price = np.round(self.product_price[product] * rng.uniform(0.95, 1.05, len(product)), 2)
+        freight = np.round(7 + self.product_weight[product] / 1000 * rng.uniform(1.5, 3.5, len(product))
+                           + rng.exponential(6, len(product)), 2)
+        order_items = pd.DataFrame({
+            'order_id': order_ids[item_order],
+            'order_item_id': item_seq,
+            'product_id': self.hex_ids(2, product),
+            'seller_id': self.hex_ids(3, self.product_seller[product]),
+            'shipping_limit_date': pd.to_datetime(purchase[item_order] + 6 * DAY + rng.integers(0, DAY, len(item_order)),
+                                                  unit='s'),
+            'price': price,
+            'freight_value': freight,
+        })
+
+        # Pagos: uno principal y, a veces, vouchers adicionales que reparten el total
+        order_total = np.bincount(item_order, weights=price + freight, minlength=n)
+        order_total = np.where(order_total > 0, order_total, np.round(rng.lognormal(4.6, 0.9, n), 2))
+        n_payments = 1 + _choice(rng, EXTRA_PAYMENTS, n).astype(int)
+        pay_order = np.repeat(np.arange(n), n_payments)
+        pay_seq = np.concatenate([np.arange(1, k + 1) for k in n_payments])
+        main_type = _choice(rng, PAYMENT_TYPES, n)
+        pay_type = np.where(pay_seq == 1, main_type[pay_order], 'voucher')
+        weights = rng.gamma(1.0, 1.0, len(pay_order))
+        share = weights / np.bincount(pay_order, weights=weights, minlength=n)[pay_order]
+        installments = np.where(pay_type == 'credit_card',
+                                np.clip(rng.geometric(0.35, len(pay_order)), 1, 24), 1)
+        order_payments = pd.DataFrame({
+            'order_id': order_ids[pay_order],
+            'payment_sequential': pay_seq,
+            'payment_type': pay_type,
+            'payment_installments': installments,
+            'payment_value': np.round(order_total[pay_order] * share, 2),
+        })
+
+        # Reviews: ~1 por orden; algunas comparten review_id entre ordenes (duplicados reales de Olist)
+        has_review = rng.random(n) > 0.0075
+        review_order = np.flatnonzero(has_review)
+        review_index = order_index[review_order].copy()
+        shared = (rng.random(len(review_order)) < 0.008) & (np.arange(len(review_order)) > 0)
+        review_index[shared] = review_index[np.flatnonzero(shared) - 1]
+        review_base = np.where(has_delivery[review_order], delivered[review_order], estimated[review_order])
+        creation = (review_base // DAY + 1) * DAY
+        title_present = rng.random(len(review_order)) < 0.12
+        message_present = rng.random(len(review_order)) < 0.41
+        score = _choice(rng, REVIEW_SCORES, len(review_order)).astype(int)
+        order_reviews = pd.DataFrame({
+            'review_id': self.hex_ids(13, review_index),
+            'order_id': order_ids[review_order],
+            'review_score': score,
+            'review_comment_title': np.where(title_present, 'recomendo', None),
+            'review_comment_message': np.where(message_present,
+                                               np.where(score >= 4, 'produto chegou no prazo, recomendo',
+                                                        'nao recebi o produto, "pessimo"'), None),
+            'review_creation_date': pd.to_datetime(creation, unit='s'),
+            'review_answer_timestamp': pd.to_datetime(creation + rng.gamma(1.5, 1.7 * DAY, len(review_order)).astype(np.int64),
+                                                      unit='s'),
+        })
+
+        return {
+            'customers': customers,
+            'orders': orders,
+            'order_items': order_items,
+            'order_payments': order_payments,
+            'order_reviews': order_reviews,
+        }
+
+    # ------------------------------------------------------------------
+    # Geolocalizacion
+    # ------------------------------------------------------------------
+    def _iter_geolocation_chunks(self):
+        rng = self._rng(4)
+        # Muchas filas por zip, con mas filas en zips mas poblados
+        rows_per_zip = 1 + rng.multinomial(self.n_geolocation - len(self.zips), self.zips['weight'].to_numpy())
+        for chunk_index, start in enumerate(range(0, len(self.zips), GEOLOCATION_ZIPS_PER_CHUNK)):
+            chunk_rng = self._rng(4, chunk_index)
+            zips = self.zips.iloc[start:start + GEOLOCATION_ZIPS_PER_CHUNK]
+            counts = rows_per_zip[start:start + GEOLOCATION_ZIPS_PER_CHUNK]
+            repeated = zips.loc[zips.index.repeat(counts)]
+            n = len(repeated)
+            yield pd.DataFrame({
+                'geolocation_zip_code_prefix': repeated['prefix'].to_numpy(),
+                'geolocation_lat': repeated['lat'].to_numpy() + chunk_rng.normal(0, 0.02, n),
+                'geolocation_lng': repeated['lng'].to_numpy() + chunk_rng.normal(0, 0.02, n),
+                'geolocation_city': repeated['city'].to_numpy(),
+                'geolocation_state': repeated['state'].to_numpy(),
+            })
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    FILE_NAMES = {
+        'customers': "olist_customers_dataset.csv",
+        'products': "olist_products_dataset.csv",
+        'sellers': "olist_sellers_dataset.csv",
+        'product_category_translation': "product_category_name_translation.csv",
+        'orders': "olist_orders_dataset.csv",
+        'order_items': "olist_order_items_dataset.csv",
+        'order_payments': "olist_order_payments_dataset.csv",
+        'order_reviews': "olist_order_reviews_dataset.csv",
+        'geolocation': "olist_geolocation_dataset.csv",
+    }
+
+    @staticmethod
+    def _write(df: pd.DataFrame, path: Path, first: bool):
+        df.to_csv(path, mode='w' if first else 'a', header=first, index=False,
+                  date_format='%Y-%m-%d %H:%M:%S', float_format='%.8g' if 'geolocation_lat' in df else None)
+
+    def generate(self, output_dir: str) -> dict:
+        """
+        Escribe los 9 CSVs en output_dir
+
+        Returns:
+            Diccionario tabla -> registros escritos
+        """
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        counts = {}
+        start_time = time.time()
+        logger.info(f"Generando datos sinteticos x{self.scale_factor} (semilla {self.seed}) en {output}")
+
+        self._build_zips()
+
+        products = self._build_products()
+        self._write(products, output / self.FILE_NAMES['products'], True)
+        counts['products'] = len(products)
+
+        sellers = self._build_sellers()
+        self._write(sellers, output / self.FILE_NAMES['sellers'], True)
+        counts['sellers'] = len(sellers)
+
+        translation = pd.read_csv(PROJECT_ROOT / "data" / "raw" / "product_category_name_translation.csv",
+                                  encoding='utf-8-sig')
+        self._write(translation, output / self.FILE_NAMES['product_category_translation'], True)
+        counts['product_category_translation'] = len(translation)
+
+        for chunk_index, start in enumerate(range(0, self.n_orders, ORDERS_PER_CHUNK)):
+            stop = min(start + ORDERS_PER_CHUNK, self.n_orders)
+            for table, df in self._build_order_chunk(chunk_index, start, stop).items():
+                self._write(df, output / self.FILE_NAMES[table], chunk_index == 0)
+                counts[table] = counts.get(table, 0) + len(df)
+            logger.info(f"  Ordenes {stop:,}/{self.n_orders:,}")
+
+        for chunk_index, df in enumerate(self._iter_geolocation_chunks()):
+            self._write(df, output / self.FILE_NAMES['geolocation'], chunk_index == 0)
+            counts['geolocation'] = counts.get('geolocation', 0) + len(df)
+
+        for table, count in counts.items():
+            logger.info(f"  {table}: {count:,} registros")
+        logger.success(f"Datos sinteticos generados en {time.time() - start_time:.1f} s")
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera CSVs sinteticos de Olist a escala")
+    parser.add_argument('--scale', type=float, default=1.0, help="Factor de escala (1 = tamano original)")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla (misma semilla = mismos archivos)")
+    parser.add_argument('--output', type=str, default=None,
+                        help="Directorio de salida (por defecto data/synthetic/sf<escala>)")
+    args = parser.parse_args()
+
+    output = args.output or str(PROJECT_ROOT / "data" / "synthetic" / f"sf{args.scale:g}")
+    OlistDataGenerator(scale_factor=args.scale, seed=args.seed).generate(output)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,105 @@
+"""
+Paridad y benchmark de los motores de la Fase 3 (transform.engine)
+Construye el modelo estrella con el motor pandas (sin cache persistente), el
+motor DuckDB (scripts/03_transform/duckdb_engine.py) y el motor Arrow
+(scripts/03_transform/arrow_engine.py), cada uno en un proceso nuevo para que el
+pico de memoria no herede la memoria de otro. Reporta tiempo y pico de memoria
+por tabla y exige que los Parquet de cada motor tengan el mismo schema y los
+mismos datos que los del motor pandas. Termina con codigo 1 si alguna tabla difiere.
+
+Requiere staging (Fase 2); el motor duckdb requiere duckdb instalado.
+
+Uso:
+    python benchmarks/parity_transform_engines.py
+    python benchmarks/parity_transform_engines.py --engines pandas arrow
+    python benchmarks/parity_transform_engines.py --staging data/staging --output benchmarks/results/engines.json
+"""
+import argparse
+import json
+import multiprocessing
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from run_pipeline import STAR_SCHEMA_TABLES, build_star_schema
+
+ENGINES = ('pandas', 'duckdb', 'arrow')
+
+
+def build(staging_path: str, output_path: str, engine: str) -> dict:
+    """Modelo estrella completo con un motor; devuelve las estadisticas por tabla"""
+    return build_star_schema(staging_path, output_path, persistent_cache=False, engine=engine)
+
+
+def compare_table(expected_path: Path, actual_path: Path, table_name: str) -> bool:
+    """Mismo schema (con metadatos pandas) y mismos datos en los dos Parquet"""
+    expected_schema, actual_schema = pq.read_schema(expected_path), pq.read_schema(actual_path)
+    if not actual_schema.equals(expected_schema, check_metadata=False):
+        logger.error(f"{table_name}: schema distinto\n{expected_schema}\n--\n{actual_schema}")
+        return False
+    if actual_schema.pandas_metadata['columns'] != expected_schema.pandas_metadata['columns']:
+        logger.error(f"{table_name}: metadatos pandas distintos")
+        return False
+    try:
+        pd.testing.assert_frame_equal(pd.read_parquet(actual_path), pd.read_parquet(expected_path),
+                                      check_exact=True)
+    except AssertionError as e:
+        logger.error(f"{table_name}: datos distintos\n{e}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad y benchmark de los motores de transformacion")
+    parser.add_argument('--staging', type=str, default="data/staging", help="Directorio de staging")
+    parser.add_argument('--work-dir', type=str, default="benchmarks/work/engines",
+                        help="Directorio para los modelos estrella de cada motor")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES),
+                        help="Motores a comparar (el primero es la referencia; por defecto pandas)")
+    parser.add_argument('--output', type=str, default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    results = {}
+    for engine in args.engines:
+        output_path = work_dir / engine
+        shutil.rmtree(output_path, ignore_errors=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results[engine] = executor.submit(build, args.staging, str(output_path), engine).result()
+
+    reference, *others = args.engines
+    results['identical'] = {
+        engine: {table: compare_table(work_dir / reference / f"{table}.parquet",
+                                      work_dir / engine / f"{table}.parquet", f"{engine} {table}")
+                 for table in STAR_SCHEMA_TABLES}
+        for engine in others
+    }
+
+    logger.info("=" * 105)
+    logger.info(f"{'Tabla':<16}" + "".join(f"{engine + ' s':>11}{engine + ' MB':>12}" for engine in args.engines)
+                + "".join(f"{'= ' + engine:>10}" for engine in others))
+    for table in STAR_SCHEMA_TABLES:
+        logger.info(f"{table:<16}"
+                    + "".join(f"{results[engine][table]['seconds']:>11.3f}"
+                              f"{results[engine][table]['peak_delta_mb']:>12.1f}" for engine in args.engines)
+                    + "".join(f"{'OK' if results['identical'][engine][table] else 'DIFIERE':>10}"
+                              for engine in others))
+    logger.info("=" * 105)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Resultados guardados en {args.output}")
+    return all(all(tables.values()) for tables in results['identical'].values())
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,285 @@
+"""
+Benchmark end-to-end del pipeline ETL con seguimiento de regresiones
+Ejecuta las 4 fases contra el PostgreSQL local (.env) sobre datos sinteticos a
+distintas escalas y registra, por fase y por tabla: tiempo, registros/segundo,
+bytes escritos y memoria (pico de RSS). El resultado se guarda en JSON y se
+compara contra un baseline: si una metrica empeora mas que el umbral el
+proceso termina con codigo 1.
+
+ATENCION: la fase de extraccion trunca las tablas OLTP y la carga al DWH
+trunca las tablas OLAP.
+
+Uso:
+    python benchmarks/run_benchmark.py --scales 1 10
+    python benchmarks/run_benchmark.py --scales 1 --save-baseline
+    python benchmarks/run_benchmark.py --scales 1 --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import text
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+os.chdir(str(PROJECT_ROOT))
+
+from run_pipeline import load_module, build_star_schema
+from scripts.profiling import PeakMemoryTracker
+from generate_synthetic_data import OlistDataGenerator
+
+RESULTS_PATH = PROJECT_ROOT / "benchmarks" / "results"
+WORK_PATH = PROJECT_ROOT / "benchmarks" / "work"
+DEFAULT_BASELINE = PROJECT_ROOT / "benchmarks" / "baseline.json"
+
+PHASES = ('extract', 'staging', 'transform', 'dwh')
+
+OLTP_TABLES = [
+    'customers', 'products', 'sellers', 'product_category_translation', 'orders',
+    'order_items', 'order_payments', 'order_reviews', 'geolocation',
+]
+
+# Direccion de cada metrica comparada contra el baseline
+LOWER_IS_BETTER = ('seconds', 'bytes_written', 'peak_rss_mb')
+HIGHER_IS_BETTER = ('rows_per_sec',)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _relation_sizes(engine, tables) -> dict:
+    """Bytes ocupados por cada tabla (datos + indices + TOAST)"""
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text("SELECT pg_total_relation_size(to_regclass(:t))"), {'t': table}).scalar()
+            for table in tables
+        }
+
+
+def _phase_summary(tracker: PeakMemoryTracker, tables: dict) -> dict:
+    rows = sum(stats.get('rows') or 0 for stats in tables.values())
+    return {
+        'seconds': round(tracker.seconds, 3),
+        'rows': rows,
+        'rows_per_sec': round(rows / tracker.seconds) if tracker.seconds > 0 else None,
+        'bytes_written': sum(stats.get('bytes_written') or 0 for stats in tables.values()),
+        'peak_rss_mb': round(tracker.peak_mb, 1),
+        'peak_delta_mb': round(tracker.delta_mb, 1),
+    }
+
+
+class PipelineBenchmark:
+    """Ejecuta el pipeline sobre datos sinteticos de una escala y recolecta metricas"""
+
+    def __init__(self, scale_factor: float, seed: int = 42, regenerate: bool = False):
+        self.scale_factor = scale_factor
+        self.seed = seed
+        self.regenerate = regenerate
+        self.data_path = PROJECT_ROOT / "data" / "synthetic" / f"sf{scale_factor:g}"
+        self.staging_path = WORK_PATH / f"sf{scale_factor:g}" / "staging"
+        self.transformed_path = WORK_PATH / f"sf{scale_factor:g}" / "transformed"
+
+    def prepare_data(self):
+        """Genera los CSVs sinteticos si no existen"""
+        marker = self.data_path / "olist_geolocation_dataset.csv"
+        if self.regenerate or not marker.exists():
+            OlistDataGenerator(scale_factor=self.scale_factor, seed=self.seed).generate(str(self.data_path))
+        else:
+            logger.info(f"Usando datos sinteticos existentes en {self.data_path}")
+
+    def run_extract(self) -> tuple:
+        extract_module = load_module(PROJECT_ROOT / "scripts" / "01_extract" / "load_csv_to_oltp.py",
+                                     "load_csv_to_oltp")
+        loader = extract_module.CSVToOLTPLoader(data_path=str(self.data_path))
+        with loader.engine.connect() as conn:
+            conn.execute(text(f"TRUNCATE TABLE {', '.join(OLTP_TABLES)} CASCADE"))
+            if conn.execute(text("SELECT to_regclass('etl_source_files')")).scalar():
+                conn.execute(text("TRUNCATE TABLE etl_source_files"))
+            conn.commit()
+
+        with PeakMemoryTracker() as tracker:
+            loader.load_all()
+
+        sizes = _relation_sizes(loader.engine, loader.load_stats)
+        tables = {
+            table: {
+                'rows': stats['rows'],
+                'seconds': stats['seconds'],
+                'rows_per_sec': stats['rows_per_sec'],
+                'bytes_written': sizes.get(table),
+                'peak_delta_mb': stats.get('parse_peak_delta_mb'),
+            }
+            for table, stats in loader.load_stats.items()
+        }
+        return tracker, tables
+
+    def run_staging(self) -> tuple:
+        staging_module = load_module(PROJECT_ROOT / "scripts" / "02_staging" / "load_to_staging.py",
+                                     "load_to_staging")
+        loader = staging_module.OLTPToStagingLoader(staging_path=str(self.staging_path))
+        with PeakMemoryTracker() as tracker:
+            loader.load_all_to_staging()
+        return tracker, dict(loader.extract_stats)
+
+    def run_transform(self) -> tuple:
+        with PeakMemoryTracker() as tracker:
+            # Sin la cache de data/cleaned: se mide la limpieza completa
+            tables = build_star_schema(str(self.staging_path), str(self.transformed_path), persistent_cache=False)
+        return tracker, tables
+
+    def run_dwh(self) -> tuple:
+        dwh_module = load_module(PROJECT_ROOT / "scripts" / "04_load" / "load_to_dwh.py", "load_to_dwh")
+        loader = dwh_module.DWHLoader(transformed_path=str(self.transformed_path))
+        with PeakMemoryTracker() as tracker:
+            if not loader.load_all():
+                raise RuntimeError("La carga al Data Warehouse fallo")
+        sizes = _relation_sizes(loader.engine, loader.load_stats)
+        tables = {table: {**stats, 'bytes_written': sizes.get(table)} for table, stats in loader.load_stats.items()}
+        return tracker, tables
+
+    def run(self, phases=PHASES) -> dict:
+        """Ejecuta las fases indicadas y retorna {phases: ..., tables: ...}"""
+        self.prepare_data()
+        result = {'phases': {}, 'tables': {}}
+        runners = {
+            'extract': self.run_extract,
+            'staging': self.run_staging,
+            'transform': self.run_transform,
+            'dwh': self.run_dwh,
+        }
+        for phase in PHASES:
+            if phase not in phases:
+                continue
+            logger.info(f"[sf{self.scale_factor:g}] Fase {phase}...")
+            tracker, tables = runners[phase]()
+            result['phases'][phase] = _phase_summary(tracker, tables)
+            result['tables'][phase] = tables
+            summary = result['phases'][phase]
+            logger.success(f"[sf{self.scale_factor:g}] {phase}: {summary['seconds']:.2f} s, "
+                           f"{summary['rows']:,} registros ({summary['rows_per_sec'] or 0:,} reg/s), "
+                           f"pico RSS {summary['peak_rss_mb']:.0f} MB")
+        return result
+
+
+def _flatten(results: dict) -> dict:
+    """(escala, fase, tabla|None, metrica) -> valor"""
+    flat = {}
+    for scale, scale_result in results.get('scales', {}).items():
+        for phase, metrics in scale_result.get('phases', {}).items():
+            for metric, value in metrics.items():
+                flat[(scale, phase, None, metric)] = value
+        for phase, tables in scale_result.get('tables', {}).items():
+            for table, metrics in tables.items():
+                for metric, value in metrics.items():
+                    flat[(scale, phase, table, metric)] = value
+    return flat
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = 0.10,
+                    min_seconds: float = 1.0) -> list:
+    """
+    Compara dos resultados y retorna las metricas que empeoraron mas que threshold
+
+    Las mediciones con menos de min_seconds (en el baseline) se ignoran porque su
+    ruido relativo supera cualquier umbral razonable.
+    """
+    current_flat = _flatten(current)
+    baseline_flat = _flatten(baseline)
+    regressions = []
+    for key, base_value in baseline_flat.items():
+        scale, phase, table, metric = key
+        value = current_flat.get(key)
+        if value is None or not base_value or metric not in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            continue
+        if metric in ('seconds', 'rows_per_sec', 'peak_rss_mb'):
+            base_seconds = baseline_flat.get((scale, phase, table, 'seconds')) or 0
+            if base_seconds < min_seconds:
+                continue
+        if metric in LOWER_IS_BETTER:
+            change = (value - base_value) / base_value
+        else:
+            change = (base_value - value) / base_value
+        if change > threshold:
+            regressions.append({
+                'scale': scale, 'phase': phase, 'table': table, 'metric': metric,
+                'baseline': base_value, 'current': value, 'change': round(change, 4),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end del pipeline ETL")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0], help="Factores de escala")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla de los datos sinteticos")
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES), help="Fases a ejecutar")
+    parser.add_argument('--regenerate', action='store_true', help="Regenerar los CSVs sinteticos")
+    parser.add_argument('--output', type=str, default=None, help="Archivo JSON de resultados")
+    parser.add_argument('--baseline', type=str, default=str(DEFAULT_BASELINE), help="Baseline para comparar")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Empeoramiento relativo maximo permitido (0.10 = 10%%)")
+    parser.add_argument('--min-seconds', type=float, default=1.0,
+                        help="Ignorar mediciones de tiempo mas cortas que esto en el baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar el resultado como baseline")
+    args = parser.parse_args()
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'scales': {},
+    }
+    start_time = time.time()
+    for scale in args.scales:
+        benchmark = PipelineBenchmark(scale, seed=args.seed, regenerate=args.regenerate)
+        results['scales'][f"sf{scale:g}"] = benchmark.run(args.phases)
+    results['total_seconds'] = round(time.time() - start_time, 3)
+
+    RESULTS_PATH.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else \
+        RESULTS_PATH / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    logger.success(f"Resultados guardados en {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        logger.success(f"Baseline actualizado: {baseline_path}")
+        return True
+
+    if not baseline_path.exists():
+        logger.warning(f"No existe baseline en {baseline_path}; usar --save-baseline para crearlo")
+        return True
+
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    regressions = compare_results(results, baseline, args.threshold, args.min_seconds)
+    if not regressions:
+        logger.success(f"Sin regresiones respecto al baseline ({baseline.get('git_commit')}, "
+                       f"umbral {args.threshold:.0%})")
+        return True
+
+    logger.error(f"{len(regressions)} regresiones respecto al baseline ({baseline.get('git_commit')}):")
+    for item in regressions:
+        target = f"{item['phase']}.{item['table']}" if item['table'] else item['phase']
+        logger.error(f"  [{item['scale']}] {target} {item['metric']}: "
+                     f"{item['baseline']} -> {item['current']} ({item['change']:+.1%})")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
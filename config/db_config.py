@@ -19,13 +19,18 @@ class DatabaseConfig:
         self.oltp_db = os.getenv('OLTP_DB', 'olist_oltp')
         self.olap_db = os.getenv('OLAP_DB', 'olist_olap')
     
-    def get_oltp_engine(self):
-        """Retorna engine de SQLAlchemy para base OLTP"""
+    def get_oltp_engine(self, **engine_kwargs):
+        """
+        Retorna engine de SQLAlchemy para base OLTP
+        
+        Args:
+            **engine_kwargs: Opciones adicionales para create_engine (ej. pool_size)
+        """
         connection_string = (
             f"postgresql://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.oltp_db}"
         )
-        return create_engine(connection_string, pool_pre_ping=True)
+        return create_engine(connection_string, pool_pre_ping=True, **engine_kwargs)
     
     def get_oltp_connection_string(self):
         """Retorna string de conexión para OLTP"""
@@ -0,0 +1,70 @@
+"""
+Lectura de config/config.yaml
+Expone las especificaciones de tablas (archivo, tipos, fechas, clave primaria)
+usadas por la fase de extraccion
+"""
+from pathlib import Path
+
+import yaml
+
+CONFIG_PATH = Path(__file__).parent / "config.yaml"
+
+
+def load_pipeline_config(config_path: str = None) -> dict:
+    """Carga el archivo YAML de configuracion del pipeline"""
+    path = Path(config_path) if config_path else CONFIG_PATH
+    # utf-8-sig: el archivo puede incluir BOM
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return yaml.safe_load(f)
+
+
+def get_table_specs(config: dict = None) -> dict:
+    """
+    Retorna las especificaciones por tabla de la seccion `tables`
+
+    Cada especificacion incluye: file, label, columns (columna -> tipo),
+    date_columns (columnas de tipo timestamp), primary_key, dedup y streaming.
+    """
+    config = config or load_pipeline_config()
+    specs = {}
+    for table_name, spec in (config.get('tables') or {}).items():
+        columns = dict(spec.get('columns') or {})
+        specs[table_name] = {
+            'file': spec['file'],
+            'label': spec.get('label', table_name),
+            'columns': columns,
+            'date_columns': [col for col, col_type in columns.items() if col_type == 'timestamp'],
+            'primary_key': list(spec.get('primary_key') or []) or None,
+            'dedup': bool(spec.get('dedup', False)),
+            'streaming': bool(spec.get('streaming', False)),
+        }
+    return specs
+
+
+# Perfil de escritura Parquet cuando config.yaml no define la seccion parquet
+DEFAULT_WRITE_PROFILE = {
+    'compression': 'snappy',
+    'compression_level': None,
+    'row_group_size': None,
+    'use_dictionary': True,
+    'sort_by': [],
+    'bloom_filter_columns': [],
+    'bloom_filter_fpp': 0.05,
+}
+
+
+def get_write_profile(table_name: str, config: dict = None) -> dict:
+    """
+    Retorna el perfil de escritura Parquet de una tabla (seccion `parquet`)
+
+    Se combinan, en este orden: DEFAULT_WRITE_PROFILE, parquet.defaults y
+    parquet.tables.<tabla>. Aplica tanto a tablas de staging como del modelo estrella.
+    """
+    config = config or load_pipeline_config()
+    parquet_config = config.get('parquet') or {}
+    profile = dict(DEFAULT_WRITE_PROFILE)
+    profile.update(parquet_config.get('defaults') or {})
+    profile.update((parquet_config.get('tables') or {}).get(table_name) or {})
+    profile['sort_by'] = list(profile.get('sort_by') or [])
+    profile['bloom_filter_columns'] = list(profile.get('bloom_filter_columns') or [])
+    return profile
@@ -21,6 +21,26 @@ Path("logs").mkdir(exist_ok=True)
 PROJECT_ROOT = Path(__file__).parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from config.pipeline_config import get_write_profile, load_pipeline_config
+from scripts.manifest import DatasetManifest, source_fingerprint
+from scripts.parquet_profiles import write_parquet
+from scripts.profiling import PeakMemoryTracker
+
+STAR_SCHEMA_TABLES = ['dim_customers', 'dim_products', 'dim_sellers', 'dim_date', 'fct_orders']
+# Tablas de staging que lee la Fase 3
+STAR_SCHEMA_INPUTS = [
+    'customers', 'products', 'sellers', 'product_category_translation',
+    'orders', 'order_items', 'order_payments', 'order_reviews',
+]
+# Codigo y configuracion de los que depende el resultado de la Fase 3
+STAR_SCHEMA_SOURCES = [
+    *sorted((PROJECT_ROOT / "scripts" / "03_transform").glob("*.py")),
+    PROJECT_ROOT / "scripts" / "staging_io.py",
+    PROJECT_ROOT / "scripts" / "parquet_profiles.py",
+    PROJECT_ROOT / "config" / "config.yaml",
+    PROJECT_ROOT / "config" / "pipeline_config.py",
+]
+
 
 def load_module(module_path, module_name):
     """Carga un módulo dinámicamente desde una ruta"""
@@ -30,7 +50,129 @@ def load_module(module_path, module_name):
     return module
 
 
-def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True):
+def star_schema_inputs(staging_path: str = "data/staging") -> dict:
+    """
+    Version de las entradas de la Fase 3: checksums de staging/_manifest.json de
+    las tablas que lee y huella del codigo/configuracion de la transformacion
+    """
+    inputs = DatasetManifest(staging_path).checksums(STAR_SCHEMA_INPUTS)
+    inputs['code'] = source_fingerprint(STAR_SCHEMA_SOURCES)
+    return inputs
+
+
+def star_schema_is_current(staging_path: str = "data/staging", transformed_path: str = "data/transformed") -> bool:
+    """
+    True si data/transformed se construyo con las mismas entradas y sus archivos
+    coinciden con el manifest (solo se leen manifests y footers)
+    """
+    inputs = star_schema_inputs(staging_path)
+    if any(checksum is None for checksum in inputs.values()):
+        return False
+    manifest = DatasetManifest(transformed_path)
+    for table_name in STAR_SCHEMA_TABLES:
+        entry = manifest.table(table_name)
+        if entry is None or entry.get('inputs') != inputs:
+            return False
+    return not any(manifest.verify(tables=STAR_SCHEMA_TABLES).values())
+
+
+def build_star_schema(staging_path: str = "data/staging", transformed_path: str = "data/transformed",
+                      skip_unchanged: bool = False, persistent_cache: bool = None, engine: str = None):
+    """
+    Fase 3: crea las dimensiones y la tabla de hechos y las guarda en Parquet
+    
+    Cada tabla escrita se registra en transformed/_manifest.json junto con la
+    version de sus entradas (ver star_schema_inputs).
+    
+    Args:
+        skip_unchanged: Si True y el modelo estrella ya se construyo con el mismo
+            staging y el mismo codigo (star_schema_is_current), no se reconstruye
+        persistent_cache: Reutilizar los datos limpios guardados en data/cleaned
+            (por defecto transform.persistent_cache de config.yaml; solo motor pandas)
+        engine: 'pandas' (DataCleaner y builders), 'duckdb' (SQL sobre los Parquet de
+            staging, ver duckdb_engine.py) o 'arrow' (pyarrow.compute sobre pa.Table, ver
+            arrow_engine.py); por defecto transform.engine de config.yaml
+    
+    Returns:
+        Diccionario tabla -> metricas (rows, seconds, rows_per_sec, bytes_written, peak_delta_mb)
+    """
+    # Crear directorio para datos transformados
+    transformed_path = Path(transformed_path)
+    transformed_path.mkdir(parents=True, exist_ok=True)
+    manifest = DatasetManifest(transformed_path)
+    
+    if skip_unchanged and star_schema_is_current(staging_path, transformed_path):
+        logger.info("Staging y codigo sin cambios desde la ultima transformacion; se reutiliza el modelo estrella")
+        return {
+            table_name: {'rows': entry['rows'], 'bytes_written': entry['bytes'], 'skipped': True}
+            for table_name, entry in ((name, manifest.table(name)) for name in STAR_SCHEMA_TABLES)
+        }
+    inputs = star_schema_inputs(staging_path)
+    pipeline_config = load_pipeline_config()
+    engine = engine or (pipeline_config.get('transform') or {}).get('engine', 'pandas')
+    
+    # Agregar directorio de transformacion al sys.path
+    transform_dir = PROJECT_ROOT / "scripts" / "03_transform"
+    sys.path.insert(0, str(transform_dir))
+    
+    if engine == 'duckdb':
+        duckdb_module = load_module(transform_dir / "duckdb_engine.py", "duckdb_engine")
+        builder = duckdb_module.DuckDBStarSchemaBuilder(str(staging_path))
+        dim_builder = builder
+    elif engine == 'arrow':
+        arrow_module = load_module(transform_dir / "arrow_engine.py", "arrow_engine")
+        builder = arrow_module.ArrowStarSchemaBuilder(str(staging_path))
+        dim_builder = builder
+    elif engine == 'pandas':
+        transform_module = load_module(
+            transform_dir / "create_fact_table.py",
+            "create_fact_table"
+        )
+        builder = transform_module.FactTableBuilder(str(staging_path), persistent_cache=persistent_cache)
+        dim_builder = builder.dim_builder
+    else:
+        raise ValueError(f"Motor de transformacion desconocido: {engine} (pandas | duckdb | arrow)")
+    logger.info(f"Motor de transformacion: {engine}")
+    
+    stats = {}
+    
+    def build(table_name, create):
+        with PeakMemoryTracker() as tracker:
+            df = create()
+            output_path = transformed_path / f"{table_name}.parquet"
+            # Codec, row groups, orden y bloom filters segun la seccion parquet de config.yaml
+            bytes_written = write_parquet(df, output_path, get_write_profile(table_name, pipeline_config))
+        manifest.record(table_name, inputs=inputs)
+        stats[table_name] = {
+            'rows': len(df),
+            'seconds': round(tracker.seconds, 3),
+            'rows_per_sec': round(len(df) / tracker.seconds) if tracker.seconds > 0 else None,
+            'bytes_written': bytes_written,
+            'peak_delta_mb': round(tracker.delta_mb, 1),
+        }
+    
+    # Crear dimensiones
+    logger.info("Creando dimensiones...")
+    build('dim_customers', dim_builder.create_dim_customers)
+    build('dim_products', dim_builder.create_dim_products)
+    build('dim_sellers', dim_builder.create_dim_sellers)
+    build('dim_date', dim_builder.create_dim_date)
+    logger.success(f"Dimensiones guardadas en {transformed_path}")
+    
+    # Crear tabla de hechos
+    logger.info("Creando tabla de hechos...")
+    build('fct_orders', builder.create_fact_orders)
+    logger.success(f"Tabla de hechos guardada en {transformed_path}")
+    if engine in ('duckdb', 'arrow'):
+        builder.close()
+    else:
+        builder.cleaner.cache.log_summary()
+    
+    return stats
+
+
+def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True,
+                 incremental_extract=False, incremental_staging=None, skip_unchanged=True):
     """
     Ejecuta el pipeline ETL completo
     
@@ -38,6 +180,11 @@ def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True):
         run_staging: Si True, ejecuta tambien la fase de staging
         run_transformation: Si True, ejecuta tambien la fase de transformacion
         run_dwh_load: Si True, ejecuta tambien la carga a Data Warehouse OLAP
+        incremental_extract: Si True, la extraccion solo procesa los CSVs que cambiaron
+        incremental_staging: Si True, staging solo extrae filas nuevas segun la marca de
+            agua (por defecto staging.incremental de config.yaml)
+        skip_unchanged: Si True, la transformacion se omite cuando staging y el codigo
+            no cambiaron desde la ultima (segun los manifests)
     """
     
     logger.info("="*80)
@@ -55,7 +202,7 @@ def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True):
             PROJECT_ROOT / "scripts" / "01_extract" / "load_csv_to_oltp.py",
             "load_csv_to_oltp"
         )
-        loader = extract_module.CSVToOLTPLoader()
+        loader = extract_module.CSVToOLTPLoader(incremental=incremental_extract)
         loader.load_all()
         logger.success("Extracción completada")
         
@@ -68,7 +215,7 @@ def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True):
                 PROJECT_ROOT / "scripts" / "02_staging" / "load_to_staging.py",
                 "load_to_staging"
             )
-            staging_loader = staging_module.OLTPToStagingLoader()
+            staging_loader = staging_module.OLTPToStagingLoader(incremental=incremental_staging)
             staging_loader.load_all_to_staging()
             logger.success("Staging completado")
         
@@ -78,39 +225,7 @@ def run_pipeline(run_staging=True, run_transformation=True, run_dwh_load=True):
             logger.info("TRANSFORMACION - Crear modelo estrella (dimensiones y tabla de hechos)")
             logger.info("="*80)
             
-            # Crear directorio para datos transformados
-            transformed_path = PROJECT_ROOT / "data" / "transformed"
-            transformed_path.mkdir(exist_ok=True)
-            
-            # Agregar directorio de transformacion al sys.path
-            transform_dir = PROJECT_ROOT / "scripts" / "03_transform"
-            sys.path.insert(0, str(transform_dir))
-            
-            transform_module = load_module(
-                transform_dir / "create_fact_table.py",
-                "create_fact_table"
-            )
-            builder = transform_module.FactTableBuilder()
-            
-            # Crear dimensiones
-            logger.info("Creando dimensiones...")
-            dim_customers = builder.dim_builder.create_dim_customers()
-            dim_products = builder.dim_builder.create_dim_products()
-            dim_sellers = builder.dim_builder.create_dim_sellers()
-            dim_date = builder.dim_builder.create_dim_date()
-            
-            # Guardar dimensiones
-            dim_customers.to_parquet(transformed_path / "dim_customers.parquet", compression='snappy')
-            dim_products.to_parquet(transformed_path / "dim_products.parquet", compression='snappy')
-            dim_sellers.to_parquet(transformed_path / "dim_sellers.parquet", compression='snappy')
-            dim_date.to_parquet(transformed_path / "dim_date.parquet", compression='snappy')
-            logger.success(f"Dimensiones guardadas en {transformed_path}")
-            
-            # Crear tabla de hechos
-            logger.info("Creando tabla de hechos...")
-            fct_orders = builder.create_fact_orders()
-            fct_orders.to_parquet(transformed_path / "fct_orders.parquet", compression='snappy')
-            logger.success(f"Tabla de hechos guardada en {transformed_path}")
+            build_star_schema(skip_unchanged=skip_unchanged)
             
             logger.success("Transformacion completada")
         elif run_transformation and not run_staging:
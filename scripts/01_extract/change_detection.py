@@ -0,0 +1,117 @@
+"""
+Deteccion de cambios en los archivos fuente de data/raw
+Guarda una huella (hash SHA-256, tamano y mtime) por archivo en la tabla etl_source_files
+"""
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+
+def fingerprint_file(file_path: Path, block_size: int = 1024 * 1024) -> dict:
+    """
+    Calcula la huella de un archivo
+
+    Returns:
+        Diccionario con sha256, size_bytes y mtime
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha256.update(block)
+
+    stat = file_path.stat()
+    return {
+        'sha256': sha256.hexdigest(),
+        'size_bytes': stat.st_size,
+        'mtime': datetime.fromtimestamp(stat.st_mtime)
+    }
+
+
+class SourceChangeDetector:
+    """Compara archivos fuente contra la ultima huella cargada en OLTP"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self):
+        """
+        Crea la tabla de control si no existe
+
+        La llaman a la vez las cargas en paralelo: dos CREATE TABLE IF NOT EXISTS
+        simultaneos pueden fallar en PostgreSQL (clave duplicada en pg_type).
+        """
+        with self._lock:
+            if self._table_ready:
+                return
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS etl_source_files (
+                        file_name VARCHAR(255) PRIMARY KEY,
+                        table_name VARCHAR(100) NOT NULL,
+                        sha256 CHAR(64) NOT NULL,
+                        size_bytes BIGINT NOT NULL,
+                        mtime TIMESTAMP NOT NULL,
+                        loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """))
+                conn.commit()
+            self._table_ready = True
+
+    def get_stored(self, file_name: str):
+        """Retorna la huella registrada de un archivo o None"""
+        self.ensure_table()
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT sha256, size_bytes, mtime FROM etl_source_files WHERE file_name = :file_name"),
+                {'file_name': file_name}
+            ).mappings().first()
+        return dict(row) if row else None
+
+    def check(self, file_path: Path) -> tuple:
+        """
+        Determina si un archivo cambio desde la ultima carga
+
+        Si tamano y mtime coinciden se asume sin cambios sin leer el archivo;
+        en otro caso se compara el hash del contenido.
+
+        Returns:
+            (cambio: bool, huella actual o None si no se calculo)
+        """
+        stored = self.get_stored(file_path.name)
+        if stored is None:
+            return True, None
+
+        stat = file_path.stat()
+        if (stat.st_size == stored['size_bytes']
+                and datetime.fromtimestamp(stat.st_mtime) == stored['mtime']):
+            return False, None
+
+        current = fingerprint_file(file_path)
+        if current['sha256'] == stored['sha256']:
+            # Mismo contenido con otro mtime (ej. archivo copiado de nuevo)
+            self.record(file_path, None, current)
+            return False, current
+
+        return True, current
+
+    def record(self, file_path: Path, table_name: str, fingerprint: dict = None):
+        """Registra la huella de un archivo cargado correctamente"""
+        self.ensure_table()
+        fingerprint = fingerprint or fingerprint_file(file_path)
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO etl_source_files (file_name, table_name, sha256, size_bytes, mtime, loaded_at)
+                VALUES (:file_name, COALESCE(:table_name, ''), :sha256, :size_bytes, :mtime, CURRENT_TIMESTAMP)
+                ON CONFLICT (file_name) DO UPDATE SET
+                    table_name = COALESCE(:table_name, etl_source_files.table_name),
+                    sha256 = EXCLUDED.sha256,
+                    size_bytes = EXCLUDED.size_bytes,
+                    mtime = EXCLUDED.mtime,
+                    loaded_at = EXCLUDED.loaded_at
+            """), {'file_name': file_path.name, 'table_name': table_name, **fingerprint})
+            conn.commit()
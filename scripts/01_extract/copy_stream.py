@@ -0,0 +1,92 @@
+"""
+Stream de lectura para PostgreSQL COPY alimentado por chunks
+Permite que el parseo del CSV y la escritura en la base de datos se solapen
+manteniendo la memoria acotada a unos pocos chunks
+"""
+import io
+import queue
+import threading
+from typing import Iterable
+
+_END = object()
+
+
+class ChunkedCopyStream(io.TextIOBase):
+    """
+    Objeto tipo archivo que entrega a COPY FROM STDIN los chunks de texto CSV
+    producidos por un hilo en segundo plano
+
+    El hilo productor consume el iterable de chunks y los deja en una cola
+    acotada (max_buffered_chunks); cuando la cola esta llena el productor
+    espera, por lo que el pico de memoria no depende del tamano del archivo.
+    """
+
+    def __init__(self, chunks: Iterable[str], max_buffered_chunks: int = 2):
+        self._queue = queue.Queue(maxsize=max_buffered_chunks)
+        self._current = ""
+        self._pos = 0
+        self._finished = False
+        self._closed_event = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _produce(self, chunks: Iterable[str]):
+        """Hilo productor: parsea chunks y los encola"""
+        try:
+            for chunk in chunks:
+                if not self._put(chunk):
+                    return
+            self._put(_END)
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item) -> bool:
+        """Encola un elemento; retorna False si el consumidor cerro el stream"""
+        while not self._closed_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        """Lee hasta size caracteres (usado por psycopg2 copy_expert)"""
+        parts = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            if self._pos >= len(self._current):
+                if not self._next_chunk():
+                    break
+                continue
+            end = len(self._current) if size < 0 else min(len(self._current), self._pos + remaining)
+            parts.append(self._current[self._pos:end])
+            remaining -= end - self._pos
+            self._pos = end
+        return "".join(parts)
+
+    def _next_chunk(self) -> bool:
+        """Toma el siguiente chunk de la cola; retorna False al terminar"""
+        if self._finished:
+            return False
+        item = self._queue.get()
+        if item is _END:
+            self._finished = True
+            return False
+        if isinstance(item, BaseException):
+            self._finished = True
+            raise item
+        self._current, self._pos = item, 0
+        return True
+
+    def readline(self, size: int = -1) -> str:
+        return self.read(size)
+
+    def close(self):
+        """Detiene el productor (por ejemplo si COPY falla a mitad de carga)"""
+        self._closed_event.set()
+        self._thread.join(timeout=5)
+        super().close()
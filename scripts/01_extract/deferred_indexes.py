@@ -0,0 +1,171 @@
+"""
+Construccion diferida de indices secundarios y foreign keys durante la carga masiva
+Captura las definiciones desde el catalogo, las elimina antes de cargar y las
+reconstruye despues en paralelo con maintenance_work_mem elevado
+"""
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+from sqlalchemy import text
+
+
+class DeferredIndexManager:
+    """
+    Maneja el ciclo captura -> eliminacion -> reconstruccion de indices y FKs
+
+    Las definiciones capturadas se guardan en la tabla etl_deferred_ddl antes de
+    eliminar nada; si una ejecucion se interrumpe, la siguiente las recupera y
+    las reconstruye. Las claves primarias no se tocan.
+    """
+
+    def __init__(self, engine, tables: list, maintenance_work_mem: str = '1GB',
+                 max_workers: int = 4):
+        """
+        Args:
+            engine: Engine de SQLAlchemy de la base OLTP
+            tables: Tablas cuyos indices y FKs se difieren
+            maintenance_work_mem: Memoria para CREATE INDEX / validacion de FKs
+            max_workers: Conexiones simultaneas para la reconstruccion
+        """
+        self.engine = engine
+        self.tables = list(tables)
+        self.maintenance_work_mem = maintenance_work_mem
+        self.max_workers = max(1, max_workers)
+        self.indexes = []
+        self.foreign_keys = []
+
+    def _ensure_table(self, conn):
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS etl_deferred_ddl (
+                object_name VARCHAR(255) PRIMARY KEY,
+                table_name VARCHAR(100) NOT NULL,
+                object_type VARCHAR(20) NOT NULL,
+                definition TEXT NOT NULL,
+                captured_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+    def capture(self):
+        """Lee del catalogo las definiciones de indices secundarios y foreign keys"""
+        with self.engine.connect() as conn:
+            self._ensure_table(conn)
+
+            # Indices que no respaldan una clave primaria / unique / exclusion
+            index_rows = conn.execute(text("""
+                SELECT ic.relname AS object_name, t.relname AS table_name,
+                       pg_get_indexdef(i.indexrelid) AS definition
+                FROM pg_index i
+                JOIN pg_class ic ON ic.oid = i.indexrelid
+                JOIN pg_class t ON t.oid = i.indrelid
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                WHERE n.nspname = current_schema()
+                  AND t.relname = ANY(:tables)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_constraint c
+                      WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u', 'x')
+                  )
+            """), {'tables': self.tables}).mappings().all()
+
+            fk_rows = conn.execute(text("""
+                SELECT c.conname AS object_name, t.relname AS table_name,
+                       pg_get_constraintdef(c.oid) AS definition
+                FROM pg_constraint c
+                JOIN pg_class t ON t.oid = c.conrelid
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                WHERE n.nspname = current_schema()
+                  AND c.contype = 'f'
+                  AND t.relname = ANY(:tables)
+            """), {'tables': self.tables}).mappings().all()
+
+            for row in index_rows:
+                self._save(conn, row, 'index')
+            for row in fk_rows:
+                self._save(conn, row, 'foreign_key')
+            conn.commit()
+
+            # Incluye definiciones pendientes de una ejecucion interrumpida
+            pending = conn.execute(text(
+                "SELECT object_name, table_name, object_type, definition FROM etl_deferred_ddl"
+            )).mappings().all()
+
+        self.indexes = [dict(row) for row in pending if row['object_type'] == 'index']
+        self.foreign_keys = [dict(row) for row in pending if row['object_type'] == 'foreign_key']
+        logger.info(f"Capturados {len(self.indexes)} indices y {len(self.foreign_keys)} foreign keys")
+
+    @staticmethod
+    def _save(conn, row, object_type: str):
+        conn.execute(text("""
+            INSERT INTO etl_deferred_ddl (object_name, table_name, object_type, definition)
+            VALUES (:object_name, :table_name, :object_type, :definition)
+            ON CONFLICT (object_name) DO UPDATE SET definition = EXCLUDED.definition
+        """), {**row, 'object_type': object_type})
+
+    def drop(self):
+        """Elimina foreign keys e indices secundarios capturados"""
+        logger.info("Eliminando foreign keys e indices secundarios antes de la carga...")
+        with self.engine.connect() as conn:
+            for fk in self.foreign_keys:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {fk['table_name']} DROP CONSTRAINT IF EXISTS {fk['object_name']}"
+                )
+            for index in self.indexes:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index['object_name']}")
+            conn.commit()
+
+    def rebuild(self) -> float:
+        """
+        Reconstruye indices (en paralelo) y luego foreign keys (en paralelo por tabla)
+
+        Returns:
+            Segundos empleados en la reconstruccion
+        """
+        logger.info(f"Reconstruyendo {len(self.indexes)} indices y {len(self.foreign_keys)} foreign keys "
+                    f"({self.max_workers} conexiones, maintenance_work_mem={self.maintenance_work_mem})...")
+        start_time = time.time()
+
+        index_statements = [[index['definition']] for index in self.indexes
+                            if not self._exists(index)]
+
+        # Las FKs de una misma tabla se agregan en serie (ALTER TABLE bloquea la tabla)
+        fk_by_table = defaultdict(list)
+        for fk in self.foreign_keys:
+            if not self._exists(fk):
+                fk_by_table[fk['table_name']].append(
+                    f"ALTER TABLE {fk['table_name']} ADD CONSTRAINT {fk['object_name']} {fk['definition']}"
+                )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="reindex") as executor:
+            list(executor.map(self._execute_batch, index_statements))
+            list(executor.map(self._execute_batch, fk_by_table.values()))
+
+        with self.engine.connect() as conn:
+            conn.execute(text("DELETE FROM etl_deferred_ddl"))
+            conn.commit()
+
+        elapsed = time.time() - start_time
+        logger.success(f"Indices y foreign keys reconstruidos en {elapsed:.2f} s")
+        return elapsed
+
+    def _exists(self, ddl_object: dict) -> bool:
+        """Verifica si el indice o constraint ya existe (ej. reconstruccion reintentada)"""
+        with self.engine.connect() as conn:
+            if ddl_object['object_type'] == 'index':
+                query = "SELECT to_regclass(:name) IS NOT NULL"
+            else:
+                query = "SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = :name)"
+            return conn.execute(text(query), {'name': ddl_object['object_name']}).scalar()
+
+    def _execute_batch(self, statements: list):
+        """Ejecuta sentencias DDL en una conexion propia con maintenance_work_mem elevado"""
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :value, false)"),
+                         {'value': self.maintenance_work_mem})
+            for statement in statements:
+                statement_start = time.time()
+                conn.exec_driver_sql(statement)
+                conn.commit()
+                logger.info(f"  {statement[:90]} ({time.time() - statement_start:.2f} s)")
+            conn.exec_driver_sql("RESET maintenance_work_mem")
+            conn.commit()
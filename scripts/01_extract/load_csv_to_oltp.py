@@ -5,6 +5,8 @@ Fase 1: Extracción - Simular base de datos transaccional
 import pandas as pd
 import sys
 import os
+import time
+from io import StringIO
 from pathlib import Path
 from sqlalchemy import text
 from tqdm import tqdm
@@ -12,20 +14,68 @@ from loguru import logger
 
 # Agregar el directorio raíz al path
 sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
 
 from config.db_config import DatabaseConfig
+from config.pipeline_config import load_pipeline_config, get_table_specs
+from copy_stream import ChunkedCopyStream
+from load_scheduler import DependencyLoadScheduler
+from change_detection import SourceChangeDetector, fingerprint_file
+from deferred_indexes import DeferredIndexManager
+from csv_ingestion import read_table_csv, iter_table_csv
+from seen_keys import SeenKeySet
 
 # Configurar logging
 logger.add("logs/01_load_csv_to_oltp.log", rotation="1 MB", level="INFO")
 
 
 class CSVToOLTPLoader:
-    """Clase para cargar CSVs a la base de datos OLTP"""
+    """
+    Clase para cargar CSVs a la base de datos OLTP
     
-    def __init__(self, data_path: str = "data/raw"):
+    Con incremental=True solo se procesan los archivos de data/raw cuya huella
+    (hash, tamano, mtime) cambio desde la ultima carga, y sus filas se combinan
+    con las existentes mediante INSERT ... ON CONFLICT.
+    
+    Con defer_indexes=True (carga masiva) los indices secundarios y foreign keys
+    se eliminan antes de cargar y se reconstruyen al final en paralelo.
+    """
+    
+    # Dependencias por foreign key: cada tabla se carga despues de las que referencia
+    TABLE_DEPENDENCIES = {
+        'customers': [],
+        'products': [],
+        'sellers': [],
+        'product_category_translation': [],
+        'geolocation': [],
+        'orders': ['customers'],
+        'order_items': ['orders', 'products', 'sellers'],
+        'order_payments': ['orders'],
+        'order_reviews': ['orders'],
+    }
+    
+    def __init__(self, data_path: str = "data/raw", stream_chunk_size: int = None,
+                 max_workers: int = 4, incremental: bool = False,
+                 defer_indexes: bool = False, maintenance_work_mem: str = '1GB',
+                 csv_engine: str = None):
+        pipeline_config = load_pipeline_config()
+        ingestion_config = pipeline_config.get('ingestion') or {}
+        self.table_specs = get_table_specs(pipeline_config)
+        # Motor de parseo CSV: 'pyarrow' (por defecto) o 'pandas'
+        self.csv_engine = csv_engine or ingestion_config.get('engine', 'pyarrow')
+        
         self.db_config = DatabaseConfig()
-        self.engine = self.db_config.get_oltp_engine()
+        # Una conexion del pool por carga simultanea
+        self.engine = self.db_config.get_oltp_engine(pool_size=max_workers, max_overflow=2)
         self.data_path = Path(data_path)
+        self.stream_chunk_size = stream_chunk_size or ingestion_config.get('stream_chunk_size', 100_000)
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.defer_indexes = defer_indexes
+        self.maintenance_work_mem = maintenance_work_mem
+        self.change_detector = SourceChangeDetector(self.engine)
+        self.load_stats = {}
+        self.load_report = {}
         
     def create_schema(self):
         """Crear schema de OLTP si no existe"""
@@ -52,207 +102,271 @@ class CSVToOLTPLoader:
         else:
             logger.warning("Archivo oltp_schema.sql no encontrado")
     
-    def load_customers(self):
-        """Cargar datos de clientes"""
-        logger.info("Cargando datos de clientes...")
-        
-        file_path = self.data_path / "olist_customers_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        # Eliminar duplicados basados en customer_id (primary key)
-        original_count = len(df)
-        df = df.drop_duplicates(subset=['customer_id'], keep='first')
-        duplicates_removed = original_count - len(df)
-        if duplicates_removed > 0:
-            logger.warning(f"Se eliminaron {duplicates_removed} clientes duplicados")
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        # Cargar a la base de datos
-        df.to_sql('customers', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
+    def copy_dataframe(self, table_name: str, df: pd.DataFrame, merge: bool = False) -> int:
+        """
+        Carga un DataFrame a PostgreSQL usando COPY FROM STDIN (formato CSV)
+        
+        Args:
+            table_name: Nombre de la tabla destino
+            df: DataFrame con columnas iguales a las de la tabla
+            merge: Si True, carga a una tabla temporal y hace merge por clave primaria
+        
+        Returns:
+            Numero de registros cargados
+        """
+        buffer = StringIO()
+        self._prepare_for_copy(df).to_csv(buffer, index=False, header=False, na_rep='')
+        buffer.seek(0)
         
-        logger.success(f"✓ {len(df)} clientes cargados exitosamente")
+        self._copy_from(table_name, list(df.columns), buffer, merge=merge)
         return len(df)
     
+    def _copy_from(self, table_name: str, columns: list, source, merge: bool = False):
+        """Ejecuta COPY FROM STDIN leyendo de un objeto tipo archivo con texto CSV"""
+        conn = self.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            if merge:
+                self._merge_copy(cur, table_name, columns, source)
+            else:
+                cur.copy_expert(
+                    f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH CSV",
+                    source
+                )
+            conn.commit()
+            cur.close()
+        finally:
+            conn.close()
+    
+    def _merge_copy(self, cur, table_name: str, columns: list, source):
+        """
+        Carga con COPY a una tabla temporal y hace merge sobre la tabla destino
+        
+        Con clave primaria: INSERT ... ON CONFLICT DO UPDATE, actualizando solo las
+        filas cuyo contenido cambio. Sin clave primaria (geolocation): se reemplaza
+        el contenido de la tabla dentro de la misma transaccion.
+        """
+        temp_table = f"tmp_{table_name}"
+        column_list = ", ".join(columns)
+        
+        cur.execute(f"CREATE TEMP TABLE {temp_table} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+        cur.copy_expert(f"COPY {temp_table} ({column_list}) FROM STDIN WITH CSV", source)
+        
+        primary_key = self.table_specs[table_name]['primary_key']
+        if not primary_key:
+            cur.execute(f"DELETE FROM {table_name}")
+            cur.execute(f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {temp_table}")
+            logger.info(f"Merge {table_name}: tabla reemplazada ({cur.rowcount} registros)")
+            return
+        
+        key_list = ", ".join(primary_key)
+        update_columns = [col for col in columns if col not in primary_key]
+        if update_columns:
+            set_clause = ", ".join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+            target_values = ", ".join(f"{table_name}.{col}" for col in update_columns)
+            new_values = ", ".join(f"EXCLUDED.{col}" for col in update_columns)
+            conflict_action = (f"DO UPDATE SET {set_clause} "
+                               f"WHERE ({target_values}) IS DISTINCT FROM ({new_values})")
+        else:
+            conflict_action = "DO NOTHING"
+        
+        cur.execute(f"""
+            INSERT INTO {table_name} ({column_list})
+            SELECT DISTINCT ON ({key_list}) {column_list} FROM {temp_table}
+            ORDER BY {key_list}
+            ON CONFLICT ({key_list}) {conflict_action}
+        """)
+        logger.info(f"Merge {table_name}: {cur.rowcount} registros insertados o actualizados")
+    
+    @staticmethod
+    def _prepare_for_copy(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Ajusta tipos para que el texto CSV sea aceptado por COPY
+        
+        Las columnas enteras con nulos llegan como float (ej. 2.0), lo que
+        PostgreSQL rechaza en columnas INTEGER; se convierten a Int64.
+        NaN/NaT se escriben como campo vacio, que COPY interpreta como NULL.
+        """
+        df = df.copy()
+        for col in df.select_dtypes(include='float').columns:
+            values = df[col].dropna()
+            if (values % 1 == 0).all():
+                df[col] = df[col].astype('Int64')
+        return df
+    
+    @staticmethod
+    def _convert_dates(df: pd.DataFrame, date_columns: list) -> pd.DataFrame:
+        """Convierte columnas de fecha (invalidas -> NaT, que se carga como NULL)"""
+        for col in date_columns or []:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+    
+    def _load_csv_table(self, table_name: str, streaming: bool = None) -> int:
+        """
+        Cargador comun CSV -> OLTP via COPY, guiado por la especificacion de config.yaml
+        
+        La especificacion de la tabla (seccion `tables`) define archivo, tipos de
+        columnas, columnas de fecha (invalidas -> NULL), clave primaria y si se
+        eliminan duplicados por esa clave.
+        
+        Args:
+            table_name: Tabla destino en OLTP
+            streaming: Fuerza (o desactiva) la carga por chunks; por defecto usa la especificacion
+        """
+        spec = self.table_specs[table_name]
+        label = spec['label']
+        logger.info(f"Cargando datos de {label}...")
+        start_time = time.time()
+        
+        file_path = self.data_path / spec['file']
+        
+        fingerprint = None
+        if self.incremental:
+            changed, fingerprint = self.change_detector.check(file_path)
+            if not changed:
+                logger.info(f"Sin cambios en {spec['file']}; se omite {table_name}")
+                self.load_stats[table_name] = {'rows': 0, 'seconds': round(time.time() - start_time, 3),
+                                               'rows_per_sec': 0.0, 'skipped': True}
+                return 0
+            # Huella del contenido que se carga (el archivo puede cambiar durante la carga)
+            fingerprint = fingerprint or fingerprint_file(file_path)
+        
+        dedup_key = spec['primary_key'] if spec['dedup'] else None
+        parse_metrics = {}
+        
+        if spec['streaming'] if streaming is None else streaming:
+            count = self._stream_csv_to_table(table_name, file_path, spec, dedup_key)
+        else:
+            df, parse_metrics = read_table_csv(file_path, spec['columns'], engine=self.csv_engine)
+            
+            logger.info(f"Registros encontrados: {len(df)}")
+            logger.info(f"Parseo [{parse_metrics['engine']}]: {parse_metrics['seconds']:.2f} s, "
+                        f"pico +{parse_metrics['peak_delta_mb']:.1f} MB, "
+                        f"DataFrame {parse_metrics['memory_mb']:.1f} MB")
+            
+            df = self._convert_dates(df, spec['date_columns'])
+            
+            # Eliminar duplicados basados en la clave primaria
+            if dedup_key:
+                original_count = len(df)
+                df = df.drop_duplicates(subset=dedup_key, keep='first')
+                duplicates_removed = original_count - len(df)
+                if duplicates_removed > 0:
+                    logger.warning(f"Se eliminaron {duplicates_removed} registros duplicados en {table_name}")
+            
+            count = self.copy_dataframe(table_name, df, merge=self.incremental)
+        
+        # Registrar la huella cargada para futuras ejecuciones incrementales
+        # (una carga completa no hashea los archivos: la primera incremental los carga todos)
+        if self.incremental:
+            self.change_detector.record(file_path, table_name, fingerprint)
+        
+        elapsed = time.time() - start_time
+        rows_per_sec = count / elapsed if elapsed > 0 else 0.0
+        self.load_stats[table_name] = {
+            'rows': count,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(rows_per_sec, 1),
+            **{f"parse_{key}": value for key, value in parse_metrics.items()}
+        }
+        
+        logger.success(f"✓ {count} registros de {label} cargados ({elapsed:.2f} s, {rows_per_sec:,.0f} registros/s)")
+        return count
+    
+    def _stream_csv_to_table(self, table_name: str, file_path: Path, spec: dict,
+                             dedup_key: list = None) -> int:
+        """
+        Carga en streaming: un hilo parsea chunks del CSV mientras COPY envia los anteriores
+        
+        Cada chunk pasa por lectura, conversion de tipos, eliminacion de duplicados y
+        escritura; la memoria queda acotada a unos pocos chunks, independiente del
+        tamano del archivo. Los duplicados entre chunks se detectan con SeenKeySet.
+        """
+        columns = list(pd.read_csv(file_path, encoding='utf-8', nrows=0).columns)
+        chunk_size = self.stream_chunk_size
+        counter = {'rows': 0, 'chunks': 0, 'duplicates': 0}
+        seen_keys = SeenKeySet() if dedup_key else None
+        
+        def csv_chunks():
+            for chunk in iter_table_csv(file_path, spec['columns'], chunk_size, engine=self.csv_engine):
+                chunk = self._convert_dates(chunk, spec['date_columns'])
+                if seen_keys is not None:
+                    new_rows = seen_keys.filter_new(chunk[dedup_key])
+                    counter['duplicates'] += int((~new_rows).sum())
+                    chunk = chunk[new_rows]
+                counter['rows'] += len(chunk)
+                counter['chunks'] += 1
+                yield self._prepare_for_copy(chunk).to_csv(index=False, header=False, na_rep='')
+        
+        stream = ChunkedCopyStream(csv_chunks())
+        try:
+            self._copy_from(table_name, columns, stream, merge=self.incremental)
+        finally:
+            stream.close()
+        
+        logger.info(f"Streaming [{self.csv_engine}]: {counter['rows']} registros en "
+                    f"{counter['chunks']} chunks de {chunk_size}")
+        if seen_keys is not None:
+            if counter['duplicates'] > 0:
+                logger.warning(f"Se eliminaron {counter['duplicates']} registros duplicados en {table_name}")
+            if seen_keys.collisions > 0:
+                logger.warning(f"{seen_keys.collisions} colisiones de hash en {table_name}: "
+                               f"las filas se conservaron (ver SeenKeySet)")
+            logger.info(f"Claves vistas: {len(seen_keys):,} ({seen_keys.nbytes / (1024 * 1024):.1f} MB)")
+        return counter['rows']
+    
+    def load_customers(self):
+        """Cargar datos de clientes"""
+        return self._load_csv_table('customers')
+    
     def load_products(self):
         """Cargar datos de productos"""
-        logger.info("Cargando datos de productos...")
-        
-        file_path = self.data_path / "olist_products_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        df.to_sql('products', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} productos cargados exitosamente")
-        return len(df)
+        return self._load_csv_table('products')
     
     def load_sellers(self):
         """Cargar datos de vendedores"""
-        logger.info("Cargando datos de vendedores...")
-        
-        file_path = self.data_path / "olist_sellers_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        df.to_sql('sellers', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} vendedores cargados exitosamente")
-        return len(df)
+        return self._load_csv_table('sellers')
     
     def load_orders(self):
         """Cargar datos de órdenes"""
-        logger.info("Cargando datos de órdenes...")
-        
-        file_path = self.data_path / "olist_orders_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        # Convertir columnas de fecha
-        date_columns = [
-            'order_purchase_timestamp',
-            'order_approved_at',
-            'order_delivered_carrier_date',
-            'order_delivered_customer_date',
-            'order_estimated_delivery_date'
-        ]
-        
-        for col in date_columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-            # Reemplazar NaT por None para compatibilidad con SQLAlchemy 2.0
-            df[col] = df[col].where(pd.notna(df[col]), None)
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        df.to_sql('orders', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} órdenes cargadas exitosamente")
-        return len(df)
+        return self._load_csv_table('orders')
     
     def load_order_items(self):
         """Cargar datos de items de órdenes"""
-        logger.info("Cargando datos de items de órdenes...")
-        
-        file_path = self.data_path / "olist_order_items_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        # Convertir fecha
-        df['shipping_limit_date'] = pd.to_datetime(df['shipping_limit_date'], errors='coerce')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        df.to_sql('order_items', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} items de órdenes cargados exitosamente")
-        return len(df)
+        return self._load_csv_table('order_items')
     
     def load_order_payments(self):
         """Cargar datos de pagos de órdenes"""
-        logger.info("Cargando datos de pagos...")
-        
-        file_path = self.data_path / "olist_order_payments_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        df.to_sql('order_payments', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} pagos cargados exitosamente")
-        return len(df)
+        return self._load_csv_table('order_payments')
     
     def load_order_reviews(self):
         """Cargar datos de reseñas de órdenes"""
-        logger.info("Cargando datos de reseñas...")
-        
-        file_path = self.data_path / "olist_order_reviews_dataset.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        # Convertir fechas
-        df['review_creation_date'] = pd.to_datetime(df['review_creation_date'], errors='coerce')
-        df['review_answer_timestamp'] = pd.to_datetime(df['review_answer_timestamp'], errors='coerce')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
-        
-        # Eliminar duplicados basados en review_id (primary key)
-        original_count = len(df)
-        df = df.drop_duplicates(subset=['review_id'], keep='first')
-        duplicates_removed = original_count - len(df)
-        
-        if duplicates_removed > 0:
-            logger.warning(f"Se eliminaron {duplicates_removed} reviews duplicadas")
-        
-        df.to_sql('order_reviews', self.engine, if_exists='append', index=False, method=None, chunksize=1000)
-        
-        logger.success(f"✓ {len(df)} reviews cargadas exitosamente")
-        return len(df)
+        return self._load_csv_table('order_reviews')
     
-    def load_geolocation(self):
-        """Cargar datos de geolocalización con PostgreSQL COPY (optimizado para 1M+ registros)"""
-        # VERSIÓN REESCRITA - USA COPY NO PANDAS
-        logger.info("Cargando datos de geolocalización con método COPY...")
-        
-        file_path = self.data_path / "olist_geolocation_dataset.csv"
-        import csv
-        from datetime import datetime
-        from io import StringIO
-        
-        # Leer CSV y preparar para COPY con timestamp
-        timestamp = datetime.now().isoformat()
-        buffer = StringIO()
-        writer = csv.writer(buffer)
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            count = 0
-            for row in reader:
-                # Escribir solo las columnas que existen en la tabla OLTP
-                writer.writerow([
-                    row['geolocation_zip_code_prefix'],
-                    row['geolocation_lat'],
-                    row['geolocation_lng'],
-                    row['geolocation_city'],
-                    row['geolocation_state'],
-                    timestamp
-                ])
-                count += 1
-        
-        buffer.seek(0)
-        logger.info(f"Registros encontrados: {count}")
-        
-        # Usar COPY de PostgreSQL (mucho más rápido que INSERT)
-        conn = self.engine.raw_connection()
-        try:
-            cur = conn.cursor()
-            cur.copy_expert(
-                "COPY geolocation (geolocation_zip_code_prefix, geolocation_lat, geolocation_lng, "
-                "geolocation_city, geolocation_state, created_at) FROM STDIN WITH CSV",
-                buffer
-            )
-            conn.commit()
-            cur.close()
-        finally:
-            conn.close()
-        
-        logger.success(f"✓ {count} registros de geolocalización cargados")
-        return count
+    def load_geolocation(self, streaming: bool = True):
+        """
+        Cargar datos de geolocalización (1M+ registros)
+        
+        Args:
+            streaming: Si True, parsea y envia a COPY en chunks de stream_chunk_size
+                       (memoria constante aunque el archivo crezca)
+        """
+        return self._load_csv_table('geolocation', streaming=streaming)
     
     def load_product_translation(self):
         """Cargar traducción de categorías de productos"""
-        logger.info("Cargando traducción de categorías...")
-        
-        file_path = self.data_path / "product_category_name_translation.csv"
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        logger.info(f"Registros encontrados: {len(df)}")
+        return self._load_csv_table('product_category_translation')
+    
+    def load_all(self, max_workers: int = None):
+        """
+        Cargar todos los archivos CSV
         
-        df.to_sql('product_category_translation', self.engine, if_exists='append', index=False, method=None)
+        Las tablas sin dependencias pendientes se cargan en paralelo, cada una
+        con su propia conexion del pool.
         
-        logger.success(f"✓ {len(df)} traducciones cargadas exitosamente")
-        return len(df)
-    
-    def load_all(self):
-        """Cargar todos los archivos CSV"""
+        Args:
+            max_workers: Cargas simultaneas (por defecto el valor del constructor; 1 = secuencial)
+        """
         logger.info("="*60)
         logger.info("INICIANDO CARGA DE CSVs A BASE DE DATOS OLTP")
         logger.info("="*60)
@@ -260,31 +374,82 @@ class CSVToOLTPLoader:
         # Crear schema (comentado porque ya existe)
         # self.create_schema()
         
-        # Orden de carga respetando las foreign keys
-        load_order = [
-            ("Clientes", self.load_customers),
-            ("Productos", self.load_products),
-            ("Vendedores", self.load_sellers),
-            ("Traducción de Categorías", self.load_product_translation),
-            ("Órdenes", self.load_orders),
-            ("Items de Órdenes", self.load_order_items),
-            ("Pagos", self.load_order_payments),
-            ("Reviews", self.load_order_reviews),
-            ("Geolocalización", self.load_geolocation),
-        ]
-        
-        total_records = 0
-        
-        for name, load_func in tqdm(load_order, desc="Cargando tablas"):
-            try:
-                records = load_func()
-                total_records += records
-            except Exception as e:
-                logger.error(f"Error cargando {name}: {e}")
-                raise
+        load_functions = {
+            'customers': ("Clientes", self.load_customers),
+            'products': ("Productos", self.load_products),
+            'sellers': ("Vendedores", self.load_sellers),
+            'product_category_translation': ("Traducción de Categorías", self.load_product_translation),
+            'orders': ("Órdenes", self.load_orders),
+            'order_items': ("Items de Órdenes", self.load_order_items),
+            'order_payments': ("Pagos", self.load_order_payments),
+            'order_reviews': ("Reviews", self.load_order_reviews),
+            'geolocation': ("Geolocalización", self.load_geolocation),
+        }
+        
+        def with_error_log(name, load_func):
+            def task():
+                try:
+                    return load_func()
+                except Exception as e:
+                    logger.error(f"Error cargando {name}: {e}")
+                    raise
+            return task
+        
+        max_workers = max_workers or self.max_workers
+        
+        # Carga masiva: diferir indices secundarios y FKs (no aplica a cargas incrementales)
+        index_manager = None
+        if self.defer_indexes and self.incremental:
+            logger.warning("defer_indexes se ignora en modo incremental")
+        elif self.defer_indexes:
+            index_manager = DeferredIndexManager(
+                self.engine, list(load_functions),
+                maintenance_work_mem=self.maintenance_work_mem,
+                max_workers=max_workers
+            )
+            index_manager.capture()
+            index_manager.drop()
+        
+        # Sin foreign keys activas todas las tablas pueden cargarse a la vez;
+        # la integridad se valida al reconstruir las FKs
+        scheduler = DependencyLoadScheduler(
+            tasks={table: with_error_log(name, func) for table, (name, func) in load_functions.items()},
+            dependencies={} if index_manager else self.TABLE_DEPENDENCIES,
+            max_workers=max_workers
+        )
+        
+        load_start = time.time()
+        try:
+            with tqdm(total=len(load_functions), desc="Cargando tablas") as progress:
+                results = scheduler.run(on_complete=lambda table, records: progress.update(1))
+        except Exception:
+            if index_manager:
+                logger.warning("Carga fallida: las definiciones de indices y FKs quedan en etl_deferred_ddl "
+                               "y se reconstruiran en la proxima carga")
+            raise
+        load_seconds = time.time() - load_start
+        
+        rebuild_seconds = index_manager.rebuild() if index_manager else 0.0
+        
+        total_records = sum(results.values())
+        self.load_report = dict(scheduler.timings)
+        self.load_report['__phases__'] = {
+            'load_seconds': round(load_seconds, 3),
+            'index_rebuild_seconds': round(rebuild_seconds, 3)
+        }
         
         logger.info("="*60)
         logger.success(f"✓ CARGA COMPLETADA: {total_records} registros totales")
+        for table, stats in self.load_stats.items():
+            if stats.get('skipped'):
+                logger.info(f"  {table}: sin cambios en el archivo fuente (omitida)")
+                continue
+            logger.info(f"  {table}: {stats['rows']:,} registros en {stats['seconds']:.2f} s "
+                        f"({stats['rows_per_sec']:,.0f} registros/s)")
+        scheduler.log_report()
+        if index_manager:
+            logger.info(f"  Tiempo de carga: {load_seconds:.2f} s | "
+                        f"Reconstruccion de indices y FKs: {rebuild_seconds:.2f} s")
         logger.info("="*60)
         
         # Verificar integridad
@@ -0,0 +1,142 @@
+"""
+Planificador de cargas con dependencias (foreign keys)
+Ejecuta en paralelo las tablas cuyas dependencias ya fueron cargadas
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List
+
+from loguru import logger
+
+
+class DependencyLoadScheduler:
+    """
+    Ejecuta tareas de carga respetando un grafo de dependencias
+
+    Cada tarea se lanza en cuanto todas sus dependencias terminaron, con un
+    maximo de max_workers tareas simultaneas. El tiempo total tiende al de la
+    cadena de dependencias mas lenta en lugar de la suma de todas las tablas.
+    """
+
+    def __init__(self, tasks: Dict[str, Callable[[], int]],
+                 dependencies: Dict[str, List[str]], max_workers: int = 4):
+        """
+        Args:
+            tasks: Diccionario tabla -> funcion de carga (retorna registros cargados)
+            dependencies: Diccionario tabla -> tablas que deben cargarse antes
+            max_workers: Numero maximo de cargas simultaneas
+        """
+        self.tasks = tasks
+        self.dependencies = {name: list(dependencies.get(name, [])) for name in tasks}
+        self.max_workers = max(1, max_workers)
+        self.timings = {}
+        self._validate()
+
+    def _validate(self):
+        """Verifica que las dependencias existan y que no haya ciclos"""
+        for name, deps in self.dependencies.items():
+            unknown = [dep for dep in deps if dep not in self.tasks]
+            if unknown:
+                raise ValueError(f"Dependencias desconocidas para {name}: {unknown}")
+
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependencias: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+    def run(self, on_complete: Callable[[str, int], None] = None) -> dict:
+        """
+        Ejecuta todas las tareas
+
+        Args:
+            on_complete: Callback opcional (tabla, registros) al terminar cada tabla
+
+        Returns:
+            Diccionario tabla -> registros cargados
+        """
+        results = {}
+        pending = dict(self.dependencies)
+        running = {}
+        start_time = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="loader") as executor:
+            while pending or running:
+                # Lanzar todas las tareas cuyas dependencias ya terminaron
+                ready = [name for name, deps in pending.items() if all(dep in results for dep in deps)]
+                for name in ready:
+                    del pending[name]
+                    running[executor.submit(self._run_task, name, start_time)] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        # No lanzar tareas nuevas; esperar a las que estan en curso
+                        pending.clear()
+                        for other in running:
+                            other.cancel()
+                        raise
+                    if on_complete:
+                        on_complete(name, results[name])
+
+        self.timings['__total__'] = {'seconds': round(time.time() - start_time, 3)}
+        return results
+
+    def _run_task(self, name: str, run_start: float) -> int:
+        """Ejecuta una tarea registrando inicio, fin y duracion relativos al inicio de la carga"""
+        started = time.time()
+        records = self.tasks[name]()
+        finished = time.time()
+        self.timings[name] = {
+            'records': records,
+            'start': round(started - run_start, 3),
+            'end': round(finished - run_start, 3),
+            'seconds': round(finished - started, 3),
+            'worker': threading.current_thread().name
+        }
+        return records
+
+    def critical_path(self) -> tuple:
+        """Retorna (cadena, segundos) de la cadena de dependencias mas lenta"""
+        memo = {}
+
+        def longest(name):
+            if name not in memo:
+                best_chain, best_time = [], 0.0
+                for dep in self.dependencies[name]:
+                    chain, seconds = longest(dep)
+                    if seconds > best_time:
+                        best_chain, best_time = chain, seconds
+                memo[name] = (best_chain + [name], best_time + self.timings[name]['seconds'])
+            return memo[name]
+
+        return max((longest(name) for name in self.tasks), key=lambda item: item[1])
+
+    def log_report(self):
+        """Muestra el reporte de tiempos por tabla"""
+        logger.info("Reporte de tiempos de carga:")
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].get('start', 0)):
+            if name == '__total__':
+                continue
+            logger.info(f"  {name:<30} {timing['start']:>8.2f}s -> {timing['end']:>8.2f}s "
+                        f"({timing['seconds']:.2f} s, {timing['records']:,} registros, {timing['worker']})")
+
+        chain, chain_seconds = self.critical_path()
+        total_seconds = self.timings['__total__']['seconds']
+        sum_seconds = sum(t['seconds'] for n, t in self.timings.items() if n != '__total__')
+        logger.info(f"  Tiempo total: {total_seconds:.2f} s (suma secuencial: {sum_seconds:.2f} s)")
+        logger.info(f"  Cadena critica: {' -> '.join(chain)} ({chain_seconds:.2f} s)")
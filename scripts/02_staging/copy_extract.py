@@ -0,0 +1,148 @@
+"""
+Extraccion de OLTP a Parquet con COPY (SELECT ...) TO STDOUT
+El CSV que envia PostgreSQL se parsea directamente a lotes Arrow (lector CSV de
+pyarrow en streaming) con el schema de information_schema: Python nunca
+materializa tuplas de filas ni objetos por valor
+"""
+import os
+import threading
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from scripts.parquet_profiles import writer_options
+
+# information_schema.columns.data_type -> tipo Arrow (el resto se lee como texto)
+PG_TYPE_TO_ARROW = {
+    'smallint': pa.int64(),
+    'integer': pa.int64(),
+    'bigint': pa.int64(),
+    'real': pa.float64(),
+    'double precision': pa.float64(),
+    'numeric': pa.float64(),
+    'boolean': pa.bool_(),
+    'date': pa.date32(),
+    'timestamp without time zone': pa.timestamp('us'),
+}
+
+
+def table_schema(conn, table_name: str) -> pa.Schema:
+    """Schema Arrow de una tabla segun information_schema.columns (conn: Connection de SQLAlchemy)"""
+    query = text("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = :table_name
+        ORDER BY ordinal_position
+    """)
+    columns = conn.execute(query, {'table_name': table_name}).fetchall()
+    if not columns:
+        raise ValueError(f"Tabla no encontrada en information_schema: {table_name}")
+    return pa.schema([pa.field(name, PG_TYPE_TO_ARROW.get(data_type, pa.string()))
+                      for name, data_type in columns])
+
+
+def _convert_options(schema: pa.Schema) -> pa_csv.ConvertOptions:
+    # En el CSV de COPY un campo vacio sin comillas es NULL y "" es texto vacio
+    return pa_csv.ConvertOptions(
+        column_types={field.name: field.type for field in schema},
+        null_values=[''],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+        true_values=['t'],
+        false_values=['f'],
+    )
+
+
+def copy_query_to_parquet(raw_connection, query: str, output_path: Path, schema: pa.Schema,
+                          batch_size: int = 50_000, write_profile: dict = None,
+                          rate_limiter=None) -> dict:
+    """
+    Ejecuta COPY (query) TO STDOUT y escribe el resultado en Parquet por lotes
+
+    Un hilo ejecuta copy_expert escribiendo en un pipe; el hilo principal lee el
+    otro extremo con pyarrow.csv.open_csv y agrupa los lotes en row groups de
+    ~batch_size filas. El archivo se escribe con sufijo .tmp y se renombra al final.
+
+    Args:
+        raw_connection: Conexion psycopg2 (engine.raw_connection())
+        query: SELECT a extraer
+        output_path: Archivo Parquet de salida
+        schema: Tipos esperados por columna (ver table_schema)
+        batch_size: Filas por row group
+        write_profile: Perfil de escritura Parquet (codec, diccionario, bloom filters)
+        rate_limiter: RateLimiter opcional; al leer mas lento, COPY se frena en el
+            servidor porque el pipe y el socket se llenan
+
+    Returns:
+        Diccionario con rows y row_groups escritos
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    read_fd, write_fd = os.pipe()
+    copy_errors = []
+
+    def run_copy():
+        cursor = raw_connection.cursor()
+        try:
+            with os.fdopen(write_fd, 'wb') as sink:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", sink)
+        except Exception as e:
+            copy_errors.append(e)
+        finally:
+            cursor.close()
+
+    copy_thread = threading.Thread(target=run_copy, name='staging-copy', daemon=True)
+    copy_thread.start()
+
+    rows_written = 0
+    row_groups = 0
+    writer = None
+    try:
+        with os.fdopen(read_fd, 'rb') as source:
+            reader = pa_csv.open_csv(
+                source,
+                # Los comentarios de reviews pueden contener saltos de linea
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=_convert_options(schema)
+            )
+            writer = pq.ParquetWriter(tmp_path, reader.schema,
+                                      **writer_options(write_profile, reader.schema, batch_size))
+            pending, pending_rows = [], 0
+            for batch in reader:
+                if rate_limiter is not None:
+                    rate_limiter.acquire(batch.num_rows)
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= batch_size:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+                    rows_written += pending_rows
+                    row_groups += 1
+                    pending, pending_rows = [], 0
+            if pending_rows or row_groups == 0:
+                writer.write_table(pa.Table.from_batches(pending, schema=reader.schema),
+                                   row_group_size=max(pending_rows, 1))
+                rows_written += pending_rows
+                row_groups += 1 if pending_rows else 0
+        writer.close()
+        writer = None
+        copy_thread.join()
+        if copy_errors:
+            raise copy_errors[0]
+        os.replace(tmp_path, output_path)
+    except Exception:
+        copy_thread.join()
+        # El error de COPY (p. ej. SQL invalido) explica mejor la falla que el del parser
+        if copy_errors:
+            raise copy_errors[0]
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+        raw_connection.rollback()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    return {'rows': rows_written, 'row_groups': row_groups}
@@ -0,0 +1,113 @@
+"""
+Extraccion en streaming de OLTP a Parquet con cursor del lado del servidor
+Cada lote de filas se convierte a Arrow y se escribe como un row group, de modo
+que la memoria depende del tamano del lote y no del tamano de la tabla
+"""
+import os
+from pathlib import Path
+
+import psycopg2.extensions
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts.parquet_profiles import writer_options
+
+# OID de tipo PostgreSQL -> tipo Arrow. NUMERIC se lee como float64, igual que
+# pd.read_sql(coerce_float=True); los tipos no listados se guardan como texto
+PG_TO_ARROW = {
+    16: pa.bool_(),            # boolean
+    20: pa.int64(),            # bigint
+    21: pa.int64(),            # smallint
+    23: pa.int64(),            # integer
+    700: pa.float64(),         # real
+    701: pa.float64(),         # double precision
+    1700: pa.float64(),        # numeric
+    1082: pa.date32(),         # date
+    1114: pa.timestamp('us'),  # timestamp
+    1184: pa.timestamp('us', tz='UTC'),  # timestamptz
+}
+
+# NUMERIC -> float sin pasar por decimal.Decimal
+_DECIMAL_AS_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, 'STAGING_DECIMAL_AS_FLOAT',
+    lambda value, cursor: float(value) if value is not None else None
+)
+
+
+def arrow_schema(description) -> pa.Schema:
+    """Schema Arrow a partir de cursor.description"""
+    return pa.schema([
+        pa.field(column.name, PG_TO_ARROW.get(column.type_code, pa.string()))
+        for column in description
+    ])
+
+
+def rows_to_table(rows: list, schema: pa.Schema) -> pa.Table:
+    """Convierte una lista de tuplas a una tabla Arrow columna por columna"""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def stream_query_to_parquet(raw_connection, query: str, output_path: Path,
+                            batch_size: int = 50_000, cursor_name: str = 'staging_cursor',
+                            write_profile: dict = None, rate_limiter=None) -> dict:
+    """
+    Ejecuta query con un cursor con nombre y escribe el resultado en Parquet por lotes
+
+    El archivo se escribe primero con sufijo .tmp y se renombra al terminar, para
+    que una extraccion fallida no deje un Parquet incompleto en staging.
+
+    Args:
+        raw_connection: Conexion psycopg2 (engine.raw_connection())
+        query: SELECT a extraer
+        output_path: Archivo Parquet de salida
+        batch_size: Filas por lote (y por row group)
+        cursor_name: Nombre del cursor del lado del servidor
+        write_profile: Perfil de escritura Parquet (codec, diccionario, bloom filters)
+        rate_limiter: RateLimiter opcional (se consulta antes de pedir cada lote)
+
+    Returns:
+        Diccionario con rows y row_groups escritos
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+
+    rows_written = 0
+    row_groups = 0
+    writer = None
+    cursor = raw_connection.cursor(name=cursor_name)
+    psycopg2.extensions.register_type(_DECIMAL_AS_FLOAT, cursor)
+    try:
+        cursor.itersize = batch_size
+        cursor.execute(query)
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(batch_size)
+            rows = cursor.fetchmany(batch_size)
+            if writer is None:
+                # La descripcion del cursor con nombre esta disponible tras el primer fetch
+                schema = arrow_schema(cursor.description)
+                writer = pq.ParquetWriter(tmp_path, schema, **writer_options(write_profile, schema, batch_size))
+            if not rows:
+                break
+            writer.write_table(rows_to_table(rows, schema), row_group_size=len(rows))
+            rows_written += len(rows)
+            row_groups += 1
+        if row_groups == 0:
+            # Tabla vacia: un archivo valido con el schema y sin filas
+            writer.write_table(rows_to_table([], schema))
+        writer.close()
+        writer = None
+        os.replace(tmp_path, output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        cursor.close()
+        raw_connection.rollback()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    return {'rows': rows_written, 'row_groups': row_groups}
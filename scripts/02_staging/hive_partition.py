@@ -0,0 +1,90 @@
+"""
+Particionado Hive year=/month= de tablas de staging por fecha de compra de la orden
+orders usa su propia order_purchase_timestamp; sus tablas hijas (items, pagos,
+reviews) toman el mes de su orden via order_id, de modo que un mes de ordenes y
+todo lo que cuelga de ellas queda en los mismos directorios
+"""
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scripts.parquet_profiles import writer_options
+from scripts.staging_io import ORDER_DATE_COLUMN, PARTITIONING, is_hive_partitioned, staging_table_path
+
+# Escritura: claves como texto con ceros (month=03) para un orden de archivos cronologico
+_WRITE_PARTITIONING = ds.partitioning(pa.schema([('year', pa.string()), ('month', pa.string())]),
+                                      flavor='hive')
+
+
+def month_keys(timestamps) -> tuple:
+    """Arrays (year, month) en texto con ceros; fechas nulas -> particion nula"""
+    return pc.strftime(timestamps, format='%Y'), pc.strftime(timestamps, format='%m')
+
+
+def order_months(staging_path) -> pa.Table:
+    """order_id, year y month de todas las ordenes en staging"""
+    path = staging_table_path(staging_path, 'orders')
+    partitioning = PARTITIONING if is_hive_partitioned(path) else None
+    orders = ds.dataset(path, format='parquet', partitioning=partitioning).to_table(
+        columns=['order_id', ORDER_DATE_COLUMN]
+    )
+    year, month = month_keys(orders[ORDER_DATE_COLUMN])
+    return pa.table({'order_id': orders['order_id'], 'year': year, 'month': month})
+
+
+def partition_file(source_path: Path, output_dir: Path, basename: str, months: pa.Table = None,
+                   batch_size: int = 250_000, write_profile: dict = None) -> int:
+    """
+    Reescribe un Parquet de staging en output_dir/year=YYYY/month=MM/
+
+    Se lee por lotes y el orden de las filas se conserva dentro de cada mes.
+    Los archivos se nombran <basename>-<i>.parquet y reemplazan a los de igual
+    nombre, por lo que repetir el particionado de un mismo archivo es idempotente.
+
+    Args:
+        source_path: Archivo Parquet sin particionar
+        output_dir: Directorio de la tabla
+        basename: Prefijo de los archivos escritos (p. ej. etl-00000012)
+        months: Tabla de order_months para tablas hijas; None si el archivo es de orders
+        write_profile: Perfil de escritura Parquet; row_group_size limita las filas
+            por row group de cada mes
+
+    Returns:
+        Filas escritas
+    """
+    source = pq.ParquetFile(source_path)
+    schema = source.schema_arrow.append(pa.field('year', pa.string())).append(pa.field('month', pa.string()))
+    rows_per_group = (write_profile or {}).get('row_group_size') or batch_size
+    rows = 0
+    if months is not None:
+        order_ids, years, month_values = (months[name].combine_chunks() for name in ('order_id', 'year', 'month'))
+
+    def batches():
+        nonlocal rows
+        for batch in source.iter_batches(batch_size=batch_size):
+            if months is None:
+                year, month = month_keys(batch.column(ORDER_DATE_COLUMN))
+            else:
+                # Filas sin orden conocida van a la particion nula
+                positions = pc.index_in(batch.column('order_id'), value_set=order_ids)
+                year, month = years.take(positions), month_values.take(positions)
+            rows += batch.num_rows
+            yield pa.RecordBatch.from_arrays(batch.columns + [year, month], schema=schema)
+
+    ds.write_dataset(
+        pa.RecordBatchReader.from_batches(schema, batches()),
+        output_dir,
+        format='parquet',
+        partitioning=_WRITE_PARTITIONING,
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        preserve_order=True,
+        max_rows_per_group=rows_per_group,
+        file_options=ds.ParquetFileFormat().make_write_options(
+            **writer_options(write_profile, source.schema_arrow, rows_per_group)
+        ),
+    )
+    return rows
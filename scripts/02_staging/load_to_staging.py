@@ -3,7 +3,13 @@ Script para extraer datos de OLTP y cargarlos al Data Lake local en formato Parq
 Fase 2: Staging - Almacenamiento intermedio
 """
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from sqlalchemy import text
 from tqdm import tqdm
@@ -12,63 +18,442 @@ import time
 
 # Agregar el directorio raiz al path
 sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
 
 from config.db_config import DatabaseConfig
+from config.pipeline_config import get_write_profile, load_pipeline_config
+from scripts.manifest import DatasetManifest
+from scripts.parquet_profiles import order_by_clause, write_parquet
+from scripts.profiling import PeakMemoryTracker
+from scripts.staging_io import is_hive_partitioned, list_staging_tables, parquet_files
+from cursor_extract import stream_query_to_parquet
+from copy_extract import copy_query_to_parquet, table_schema
+from hive_partition import order_months, partition_file
+from rate_limiter import RateLimiter
+from watermarks import WatermarkStore
 
 # Configurar logging
 logger.add("logs/02_load_to_staging.log", rotation="1 MB", level="INFO")
 
 
 class OLTPToStagingLoader:
-    """Clase para extraer datos de OLTP y guardarlos en formato Parquet"""
+    """
+    Clase para extraer datos de OLTP y guardarlos en formato Parquet
     
-    def __init__(self, staging_path: str = "data/staging"):
+    Modos de extraccion (staging.extract_mode en config.yaml):
+    - cursor: cursor del lado del servidor, cada lote se escribe como un row group
+      (la memoria depende de batch_size, no del tamano de la tabla)
+    - copy: COPY (SELECT ...) TO STDOUT parseado directo a Arrow, sin tuplas de Python
+    - read_sql: pd.read_sql de la tabla completa y to_parquet (modo original)
+    
+    load_all_to_staging extrae las tablas en paralelo (max_workers conexiones).
+    Con consistent_snapshot todas las conexiones importan el snapshot exportado
+    por una transaccion coordinadora (pg_export_snapshot), por lo que los Parquet
+    son un corte consistente de OLTP aunque reciba escrituras durante la
+    extraccion. max_rows_per_sec limita el caudal total para no afectar la carga
+    de produccion (modos cursor y copy).
+    
+    Las tablas de range_partitions (p. ej. geolocation) se dividen en rangos de
+    ctid que se extraen en paralelo como partes de un directorio Parquet
+    (staging/<tabla>/part-NNNNN.parquet), legible como una sola tabla.
+    
+    Con incremental=True las tablas de watermark_columns solo extraen las filas
+    nuevas desde la ultima marca de agua registrada en etl_control y las agregan
+    como un archivo mas de staging/<tabla>/; el resto se extrae completo.
+    
+    Al final, las tablas de date_partitioned_tables (orders y sus hijas) se
+    reorganizan en staging/<tabla>/year=YYYY/month=MM/ segun el mes de compra de
+    la orden, para que la transformacion de un rango de fechas lea solo esos meses.
+    """
+    
+    EXTRACT_MODES = ('cursor', 'copy', 'read_sql')
+    
+    def __init__(self, staging_path: str = "data/staging", extract_mode: str = None,
+                 batch_size: int = None, max_workers: int = None,
+                 max_rows_per_sec: float = None, consistent_snapshot: bool = None,
+                 range_partitions: dict = None, incremental: bool = None):
+        self.pipeline_config = load_pipeline_config()
+        staging_config = self.pipeline_config.get('staging') or {}
+        self.extract_mode = extract_mode or staging_config.get('extract_mode', 'copy')
+        if self.extract_mode not in self.EXTRACT_MODES:
+            raise ValueError(f"Modo de extraccion desconocido: {self.extract_mode}")
+        self.batch_size = batch_size or staging_config.get('batch_size', 50_000)
+        self.max_workers = max_workers or staging_config.get('max_workers', 4)
+        if consistent_snapshot is None:
+            consistent_snapshot = staging_config.get('consistent_snapshot', True)
+        self.consistent_snapshot = consistent_snapshot
+        # Tabla -> numero de rangos de ctid extraidos en paralelo
+        self.range_partitions = range_partitions if range_partitions is not None \
+            else (staging_config.get('range_partitions') or {})
+        # Staging incremental: tabla -> columna de marca de agua
+        self.incremental = incremental if incremental is not None else staging_config.get('incremental', False)
+        self.watermark_columns = staging_config.get('watermark_columns') or {}
+        # Tablas con layout Hive por mes de compra de la orden
+        self.date_partitioned_tables = staging_config.get('date_partitioned_tables') or []
+        
+        max_rows_per_sec = max_rows_per_sec or staging_config.get('max_rows_per_sec')
+        self.rate_limiter = RateLimiter(max_rows_per_sec) if max_rows_per_sec else None
+        if self.rate_limiter and self.extract_mode == 'read_sql':
+            logger.warning("max_rows_per_sec no aplica al modo read_sql; la extraccion no se limitara")
+        
         self.db_config = DatabaseConfig()
-        self.engine = self.db_config.get_oltp_engine()
+        # Una conexion por tabla en paralelo mas la transaccion que exporta el snapshot
+        self.engine = self.db_config.get_oltp_engine(pool_size=self.max_workers + 1, max_overflow=2)
+        self.watermarks = WatermarkStore(self.engine)
         self.staging_path = Path(staging_path)
+        # Metricas por tabla de la ultima extraccion (filas, segundos, bytes, memoria)
+        self.extract_stats = {}
         
         # Crear directorio si no existe
         self.staging_path.mkdir(parents=True, exist_ok=True)
+        # Filas, schema, estadisticas y checksums de lo escrito (staging/_manifest.json)
+        self.manifest = DatasetManifest(self.staging_path)
         
-    def extract_table_to_parquet(self, table_name: str, query: str = None):
+    def extract_table_to_parquet(self, table_name: str, query: str = None, snapshot_id: str = None,
+                                 partitions: int = None):
         """
         Extrae una tabla de OLTP y la guarda en formato Parquet
         
         Args:
             table_name: Nombre de la tabla
             query: Query SQL personalizada (opcional)
+            snapshot_id: Snapshot exportado a importar antes de leer (opcional)
+            partitions: Rangos de ctid en paralelo (por defecto segun range_partitions)
         """
+        partitions = partitions or self.range_partitions.get(table_name, 1)
+        if partitions > 1 and query is None:
+            if self.extract_mode == 'read_sql':
+                logger.warning(f"La extraccion por rangos no aplica al modo read_sql; {table_name} se extrae completa")
+            else:
+                return self._extract_table_ranges(table_name, partitions, snapshot_id)
+        
         try:
             logger.info(f"Extrayendo tabla {table_name} desde OLTP...")
             
             # Si no se proporciona query, extraer toda la tabla
             if query is None:
-                query = f"SELECT * FROM {table_name}"
+                query = f"SELECT * FROM {table_name}" + order_by_clause(self._write_profile(table_name))
             
-            # Extraer datos
-            df = pd.read_sql(query, self.engine)
+            output_path = self.staging_path / f"{table_name}.parquet"
+            with PeakMemoryTracker() as tracker, self.engine.connect() as conn:
+                if snapshot_id:
+                    self._import_snapshot(conn, snapshot_id)
+                records = self._extract_query(conn, table_name, query, output_path)
             
-            logger.info(f"Registros extraidos: {len(df)}")
+            logger.info(f"Registros extraidos: {records}")
             
-            # Guardar en formato Parquet
-            output_path = self.staging_path / f"{table_name}.parquet"
-            df.to_parquet(
-                output_path,
-                engine='pyarrow',
-                compression='snappy',
-                index=False
-            )
+            # Una extraccion previa por rangos dejaria dos copias de la tabla
+            shutil.rmtree(self.staging_path / table_name, ignore_errors=True)
+            self.manifest.record(table_name)
             
             # Calcular tamaño del archivo
             file_size_mb = output_path.stat().st_size / (1024 * 1024)
+            self.extract_stats[table_name] = {
+                'rows': records,
+                'seconds': round(tracker.seconds, 3),
+                'rows_per_sec': round(records / tracker.seconds) if tracker.seconds > 0 else None,
+                'bytes_written': output_path.stat().st_size,
+                'peak_delta_mb': round(tracker.delta_mb, 1),
+            }
             
             logger.success(f"Tabla {table_name} guardada en Parquet ({file_size_mb:.2f} MB)")
             
-            return len(df), file_size_mb
+            return records, file_size_mb
+            
+        except Exception as e:
+            logger.error(f"Error procesando tabla {table_name}: {e}")
+            raise
+    
+    def extract_table_incremental(self, table_name: str, snapshot_id: str = None, ceiling=None):
+        """
+        Extrae solo las filas nuevas de una tabla segun su marca de agua
+        
+        Cada ejecucion cubre el intervalo [ultima marca, ceiling) de la columna
+        configurada y agrega sus filas como staging/<tabla>/etl-<etl_id>.parquet,
+        sin reescribir lo ya extraido (si la tabla esta particionada por mes, la
+        parte se reparte luego en sus meses). Sin marca previa, o si staging no tiene
+        partes incrementales (p. ej. tras una extraccion completa), se extrae la
+        linea base: todas las filas anteriores a ceiling.
+        
+        Args:
+            table_name: Tabla con columna en watermark_columns
+            snapshot_id: Snapshot exportado a importar antes de leer (opcional)
+            ceiling: Limite superior de la marca (por defecto WatermarkStore.ceiling)
+        """
+        column = self.watermark_columns[table_name]
+        table_dir = self.staging_path / table_name
+        # Consultar el limite antes de que empiece la lectura (ver WatermarkStore.ceiling)
+        ceiling = ceiling or self.watermarks.ceiling()
+        
+        self._discard_uncommitted_runs(table_name)
+        last_mark = self.watermarks.last_watermark(table_name, column)
+        has_base = (not (self.staging_path / f"{table_name}.parquet").exists()
+                    and table_dir.is_dir() and any(table_dir.rglob("etl-*.parquet")))
+        baseline = last_mark is None or not has_base
+        if baseline:
+            where = f"{column} IS NULL OR {column} < '{ceiling}'::timestamp"
+            new_mark = ceiling
+        else:
+            where = f"{column} >= '{last_mark}'::timestamp AND {column} < '{ceiling}'::timestamp"
+            # Una transaccion larga puede bajar el limite; la marca nunca retrocede
+            new_mark = max(last_mark, ceiling)
+        query = f"SELECT * FROM {table_name} WHERE {where}" + order_by_clause(self._write_profile(table_name))
+        
+        etl_id = self.watermarks.start(table_name, column)
+        tmp_path = self.staging_path / f"{table_name}.etl-{etl_id}.tmp"
+        part_path = table_dir / f"etl-{etl_id:08d}.parquet"
+        try:
+            logger.info(f"Extrayendo tabla {table_name} desde OLTP "
+                        f"({'linea base' if baseline else f'{column} >= {last_mark}'}, hasta {ceiling})...")
+            with PeakMemoryTracker() as tracker, self.engine.connect() as conn:
+                if snapshot_id:
+                    self._import_snapshot(conn, snapshot_id)
+                records = self._extract_query(conn, table_name, query, tmp_path)
+            
+            if baseline:
+                # La linea base reemplaza cualquier version anterior de la tabla
+                (self.staging_path / f"{table_name}.parquet").unlink(missing_ok=True)
+                shutil.rmtree(table_dir, ignore_errors=True)
+            table_dir.mkdir(parents=True, exist_ok=True)
+            bytes_written = 0
+            if records or baseline:
+                bytes_written = tmp_path.stat().st_size
+                os.replace(tmp_path, part_path)
+            self.watermarks.finish(etl_id, records, new_mark)
+            self.manifest.record(table_name)
+        except Exception as e:
+            logger.error(f"Error procesando tabla {table_name}: {e}")
+            self.watermarks.fail(etl_id, e)
+            raise
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        
+        file_size_mb = bytes_written / (1024 * 1024)
+        self.extract_stats[table_name] = {
+            'rows': records,
+            'seconds': round(tracker.seconds, 3),
+            'rows_per_sec': round(records / tracker.seconds) if tracker.seconds > 0 else None,
+            'bytes_written': bytes_written,
+            'peak_delta_mb': round(tracker.delta_mb, 1),
+            'baseline': baseline,
+            'watermark': str(new_mark),
+        }
+        logger.success(f"Tabla {table_name}: {records} registros {'(linea base)' if baseline else 'nuevos'} "
+                       f"({file_size_mb:.2f} MB), marca de agua {new_mark}")
+        return records, file_size_mb
+    
+    def _discard_uncommitted_runs(self, table_name: str):
+        """Elimina partes incrementales cuya ejecucion no quedo registrada como SUCCESS"""
+        table_dir = self.staging_path / table_name
+        if not table_dir.is_dir():
+            return
+        committed = self.watermarks.committed_runs(table_name)
+        # etl-<etl_id>.parquet, o etl-<etl_id>-<i>.parquet dentro de year=/month=
+        for path in table_dir.rglob("etl-*.parquet"):
+            if int(path.stem.split('-')[1]) not in committed:
+                logger.warning(f"Se descarta {path.name}: su ejecucion no termino correctamente")
+                path.unlink()
+    
+    def partition_staging_tables(self, tables: list = None):
+        """
+        Reorganiza tablas de staging en particiones Hive year=YYYY/month=MM
+        
+        Toma los archivos sin particionar de cada tabla (el <tabla>.parquet de una
+        extraccion completa, las partes por rangos o las partes incrementales
+        etl-*.parquet) y los reparte por el mes de compra de la orden. orders se
+        procesa primero porque las tablas hijas toman el mes de su orden.
+        """
+        tables = tables if tables is not None else self.date_partitioned_tables
+        months = None
+        for table_name in sorted(tables, key=lambda table: table != 'orders'):
+            sources = self._unpartitioned_files(table_name)
+            if not sources:
+                continue
+            if table_name != 'orders' and months is None:
+                months = order_months(self.staging_path)
+            
+            table_dir = self.staging_path / table_name
+            with PeakMemoryTracker() as tracker:
+                rows = 0
+                for source in sources:
+                    if pq.ParquetFile(source).metadata.num_rows == 0 and not is_hive_partitioned(table_dir):
+                        # Sin filas no se escribe ningun mes; el archivo vacio conserva el schema
+                        continue
+                    basename = 'part' if source.stem == table_name else source.stem
+                    rows += partition_file(source, table_dir, basename,
+                                           months=None if table_name == 'orders' else months,
+                                           write_profile=self._write_profile(table_name))
+                    source.unlink()
+            self.manifest.record(table_name)
+            partitions = len(list(table_dir.glob("year=*/month=*")))
+            logger.info(f"Tabla {table_name} particionada por mes: {rows:,} registros en "
+                        f"{partitions} particiones ({tracker.seconds:.2f} s)")
+    
+    def _unpartitioned_files(self, table_name: str) -> list:
+        """Archivos de la tabla que aun no estan dentro de year=/month="""
+        file_path = self.staging_path / f"{table_name}.parquet"
+        if file_path.exists():
+            return [file_path]
+        table_dir = self.staging_path / table_name
+        return sorted(table_dir.glob("*.parquet")) if table_dir.is_dir() else []
+    
+    def _plan_ctid_ranges(self, conn, table_name: str, partitions: int) -> list:
+        """
+        Divide las paginas de la tabla en rangos de ctid contiguos
+        
+        Retorna una condicion WHERE por rango; el ultimo rango no tiene limite
+        superior para incluir paginas agregadas despues de medir la tabla.
+        """
+        pages = conn.execute(
+            text("SELECT pg_relation_size(to_regclass(:t)) / current_setting('block_size')::int"),
+            {'t': table_name}
+        ).scalar() or 0
+        partitions = max(1, min(partitions, pages))
+        step = -(-pages // partitions)
+        ranges = []
+        for index in range(partitions):
+            bounds = []
+            if index > 0:
+                bounds.append(f"ctid >= '({index * step},0)'::tid")
+            if index < partitions - 1:
+                bounds.append(f"ctid < '({(index + 1) * step},0)'::tid")
+            ranges.append(' AND '.join(bounds))
+        return ranges
+    
+    def _extract_table_ranges(self, table_name: str, partitions: int, snapshot_id: str = None):
+        """
+        Extrae una tabla en rangos de ctid en paralelo a un directorio de partes Parquet
+        
+        Todos los rangos leen el mismo snapshot (si no se recibe uno se exporta
+        aqui): sin el, una fila actualizada durante la extraccion podria cambiar de
+        ctid y aparecer en dos rangos o en ninguno.
+        """
+        output_dir = self.staging_path / table_name
+        tmp_dir = self.staging_path / f"{table_name}.parts.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        
+        def extract_range(index, where, range_snapshot_id):
+            query = (f"SELECT * FROM {table_name}" + (f" WHERE {where}" if where else "")
+                     + order_by_clause(self._write_profile(table_name)))
+            part_path = tmp_dir / f"part-{index:05d}.parquet"
+            with self.engine.connect() as conn:
+                if range_snapshot_id:
+                    self._import_snapshot(conn, range_snapshot_id)
+                return self._extract_query(conn, table_name, query, part_path)
+        
+        try:
+            snapshot = nullcontext(snapshot_id) if snapshot_id else self._exported_snapshot()
+            with PeakMemoryTracker() as tracker, snapshot as range_snapshot_id:
+                with self.engine.connect() as conn:
+                    ranges = self._plan_ctid_ranges(conn, table_name, partitions)
+                logger.info(f"Extrayendo tabla {table_name} desde OLTP en {len(ranges)} rangos de ctid...")
+                with ThreadPoolExecutor(max_workers=min(len(ranges), self.max_workers)) as executor:
+                    futures = [executor.submit(extract_range, index, where, range_snapshot_id)
+                               for index, where in enumerate(ranges)]
+                    records = sum(future.result() for future in futures)
             
+            # Reemplazar la version anterior (archivo unico o directorio)
+            (self.staging_path / f"{table_name}.parquet").unlink(missing_ok=True)
+            shutil.rmtree(output_dir, ignore_errors=True)
+            tmp_dir.rename(output_dir)
+            self.manifest.record(table_name)
         except Exception as e:
             logger.error(f"Error procesando tabla {table_name}: {e}")
             raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        
+        bytes_written = sum(path.stat().st_size for path in parquet_files(output_dir))
+        file_size_mb = bytes_written / (1024 * 1024)
+        self.extract_stats[table_name] = {
+            'rows': records,
+            'seconds': round(tracker.seconds, 3),
+            'rows_per_sec': round(records / tracker.seconds) if tracker.seconds > 0 else None,
+            'bytes_written': bytes_written,
+            'peak_delta_mb': round(tracker.delta_mb, 1),
+            'parts': len(ranges),
+        }
+        logger.success(f"Tabla {table_name} guardada en {len(ranges)} partes Parquet ({file_size_mb:.2f} MB)")
+        return records, file_size_mb
+    
+    def _write_profile(self, table_name: str) -> dict:
+        """Perfil de escritura Parquet de la tabla (seccion parquet de config.yaml)"""
+        return get_write_profile(table_name, self.pipeline_config)
+    
+    def _extract_query(self, conn, table_name: str, query: str, output_path: Path) -> int:
+        """Extrae query a output_path con el modo configurado"""
+        if self.extract_mode == 'cursor':
+            return self._extract_with_cursor(conn, table_name, query, output_path)
+        if self.extract_mode == 'copy':
+            return self._extract_with_copy(conn, table_name, query, output_path)
+        return self._extract_with_read_sql(conn, table_name, query, output_path)
+    
+    def _extract_with_cursor(self, conn, table_name: str, query: str, output_path: Path) -> int:
+        """Extrae en lotes (row_group_size del perfil o batch_size) con un cursor del lado del servidor"""
+        profile = self._write_profile(table_name)
+        batch_size = profile['row_group_size'] or self.batch_size
+        result = stream_query_to_parquet(
+            conn.connection, query, output_path,
+            batch_size=batch_size,
+            cursor_name=f"staging_{table_name}",
+            write_profile=profile,
+            rate_limiter=self.rate_limiter
+        )
+        logger.info(f"  {result['row_groups']} row groups de hasta {batch_size:,} filas")
+        return result['rows']
+    
+    def _extract_with_copy(self, conn, table_name: str, query: str, output_path: Path) -> int:
+        """Extrae con COPY TO STDOUT y el parser CSV de Arrow"""
+        profile = self._write_profile(table_name)
+        schema = table_schema(conn, table_name)
+        result = copy_query_to_parquet(
+            conn.connection, query, output_path, schema,
+            batch_size=profile['row_group_size'] or self.batch_size,
+            write_profile=profile,
+            rate_limiter=self.rate_limiter
+        )
+        logger.info(f"  {result['row_groups']} row groups via COPY")
+        return result['rows']
+    
+    def _extract_with_read_sql(self, conn, table_name: str, query: str, output_path: Path) -> int:
+        """Extrae la tabla completa con pd.read_sql (modo original)"""
+        df = pd.read_sql(query, conn)
+        write_parquet(pa.Table.from_pandas(df, preserve_index=False), output_path,
+                      self._write_profile(table_name))
+        return len(df)
+    
+    @staticmethod
+    def _import_snapshot(conn, snapshot_id: str):
+        """Hace que la transaccion de conn vea el snapshot exportado"""
+        conn.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        conn.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'")
+    
+    @contextmanager
+    def _exported_snapshot(self):
+        """
+        Abre una transaccion REPEATABLE READ y exporta su snapshot
+        
+        El snapshot solo puede importarse mientras esta transaccion siga abierta,
+        por eso se mantiene hasta que terminan todas las extracciones.
+        """
+        with self.engine.connect() as conn:
+            conn.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            snapshot_id = conn.exec_driver_sql("SELECT pg_export_snapshot()").scalar()
+            logger.info(f"Snapshot exportado para la extraccion: {snapshot_id}")
+            try:
+                yield snapshot_id
+            finally:
+                conn.rollback()
+    
+    def _order_by_size(self, tables: list) -> list:
+        """Ordena las tablas de mayor a menor (estimacion de pg_class) para repartir mejor"""
+        with self.engine.connect() as conn:
+            estimates = dict(conn.execute(
+                text("SELECT relname, reltuples FROM pg_class WHERE relname = ANY(:tables) AND relkind = 'r'"),
+                {'tables': tables}
+            ).fetchall())
+        return sorted(tables, key=lambda table: estimates.get(table, 0), reverse=True)
     
     def load_all_to_staging(self):
         """Extrae todas las tablas de OLTP al Data Lake"""
@@ -93,13 +478,55 @@ class OLTPToStagingLoader:
         total_size_mb = 0
         start_time = time.time()
         
-        # Procesar cada tabla
-        for table in tqdm(tables, desc="Extrayendo tablas"):
-            records, size_mb = self.extract_table_to_parquet(table)
-            total_records += records
-            total_size_mb += size_mb
+        # Tablas con marca de agua (solo filas nuevas); el limite se fija antes del snapshot
+        incremental_tables, ceiling = [], None
+        if self.incremental:
+            if self.extract_mode == 'read_sql':
+                logger.warning("El staging incremental no aplica al modo read_sql; se extraen las tablas completas")
+            else:
+                incremental_tables = [table for table in tables if table in self.watermark_columns]
+                self.watermarks.ensure_table()
+                ceiling = self.watermarks.ceiling()
+                logger.info(f"Staging incremental de {', '.join(incremental_tables)} hasta {ceiling}")
+        
+        # Procesar las tablas en paralelo, las mas grandes primero
+        tables = self._order_by_size(tables)
+        ranged_tables = [table for table in tables
+                         if self.range_partitions.get(table, 1) > 1 and self.extract_mode != 'read_sql'
+                         and table not in incremental_tables]
+        snapshot = self._exported_snapshot() if self.consistent_snapshot else nullcontext(None)
+        with snapshot as snapshot_id, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Las tablas por rangos primero, una a la vez: cada una ocupa todos los workers
+            for table in ranged_tables:
+                records, size_mb = self.extract_table_to_parquet(table, snapshot_id=snapshot_id)
+                total_records += records
+                total_size_mb += size_mb
+            
+            futures = {}
+            for table in tables:
+                if table in incremental_tables:
+                    future = executor.submit(self.extract_table_incremental, table, snapshot_id, ceiling)
+                elif table not in ranged_tables:
+                    future = executor.submit(self.extract_table_to_parquet, table, snapshot_id=snapshot_id)
+                else:
+                    continue
+                futures[future] = table
+            try:
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Extrayendo tablas"):
+                    records, size_mb = future.result()
+                    total_records += records
+                    total_size_mb += size_mb
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        self.partition_staging_tables([table for table in self.date_partitioned_tables if table in tables])
         
         elapsed_time = time.time() - start_time
+        if self.rate_limiter:
+            logger.info(f"Espera por limite de {self.rate_limiter.rows_per_second:,.0f} filas/s: "
+                        f"{self.rate_limiter.waited_seconds:.2f} s")
         
         logger.info("="*60)
         logger.success(f"EXTRACCION COMPLETADA: {total_records} registros totales")
@@ -110,23 +537,41 @@ class OLTPToStagingLoader:
         return total_records, total_size_mb
     
     def verify_staging_data(self):
-        """Verifica los datos en el Data Lake"""
+        """
+        Verifica los datos en el Data Lake contra staging/_manifest.json
+        
+        Solo se leen los footers Parquet (filas y schema de cada archivo); no se
+        decodifica ninguna pagina de datos.
+        
+        Returns:
+            True si todas las tablas coinciden con el manifest
+        """
         logger.info("Verificando datos en staging...")
         
-        parquet_files = list(self.staging_path.glob("*.parquet"))
+        tables = list_staging_tables(self.staging_path)
         
-        if not parquet_files:
+        if not tables:
             logger.warning("No se encontraron archivos Parquet en staging")
-            return
+            return False
         
-        logger.info(f"Archivos encontrados: {len(parquet_files)}")
+        logger.info(f"Tablas encontradas: {len(tables)}")
         
-        for file_path in parquet_files:
-            df = pd.read_parquet(file_path)
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
-            logger.info(f"  {file_path.name}: {len(df):,} registros ({file_size_mb:.2f} MB)")
+        problems = self.manifest.verify(tables=list(tables))
+        for table_name, path in tables.items():
+            entry = self.manifest.table(table_name)
+            if entry is None:
+                logger.warning(f"  {path.name}: sin entrada en el manifest")
+                continue
+            status = "OK" if not problems[table_name] else "; ".join(problems[table_name])
+            logger.info(f"  {path.name}: {entry['rows']:,} registros "
+                        f"({entry['bytes'] / (1024 * 1024):.2f} MB, {len(entry['files'])} archivos) - {status}")
         
-        logger.success("Verificacion de staging completada")
+        valid = not any(problems.values())
+        if valid:
+            logger.success("Verificacion de staging completada")
+        else:
+            logger.warning("Staging no coincide con el manifest")
+        return valid
 
 
 def main():
@@ -0,0 +1,36 @@
+"""
+Limitador de filas por segundo compartido entre hilos de extraccion
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Limita el caudal total (filas/segundo) sumado entre todos los hilos que lo usan
+
+    Cada llamada a acquire(n) reserva el siguiente intervalo de n / rate segundos y
+    espera hasta su inicio. `burst_seconds` permite adelantarse ese tiempo al
+    calendario (rafagas cortas sin espera).
+    """
+
+    def __init__(self, rows_per_second: float, burst_seconds: float = 1.0):
+        if rows_per_second <= 0:
+            raise ValueError("rows_per_second debe ser positivo")
+        self.rows_per_second = rows_per_second
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self.waited_seconds = 0.0
+
+    def acquire(self, rows: int):
+        """Bloquea hasta que se puedan procesar `rows` filas sin superar el limite"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_slot, now - self.burst_seconds)
+            self._next_slot = start + rows / self.rows_per_second
+            wait = start - now
+            if wait > 0:
+                self.waited_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,120 @@
+"""
+Marcas de agua del staging incremental
+Cada ejecucion incremental de una tabla se registra en etl_control (OLTP) con la
+columna de marca de agua y el valor hasta el que se extrajo. La siguiente
+ejecucion continua desde la ultima marca con estado SUCCESS
+"""
+import threading
+
+from sqlalchemy import text
+
+ETL_NAME = 'staging_incremental'
+
+
+class WatermarkStore:
+    """Lee y registra marcas de agua por tabla en etl_control"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self):
+        """Crea etl_control (ver sql/maintenance_queries.sql) y sus columnas de marca de agua"""
+        with self._lock:
+            if self._table_ready:
+                return
+            with self.engine.begin() as conn:
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS etl_control (
+                        etl_id SERIAL PRIMARY KEY,
+                        etl_name VARCHAR(100),
+                        start_time TIMESTAMP,
+                        end_time TIMESTAMP,
+                        status VARCHAR(20),
+                        records_processed INTEGER,
+                        error_message TEXT
+                    )
+                """))
+                conn.execute(text("""
+                    ALTER TABLE etl_control
+                        ADD COLUMN IF NOT EXISTS table_name VARCHAR(100),
+                        ADD COLUMN IF NOT EXISTS watermark_column VARCHAR(100),
+                        ADD COLUMN IF NOT EXISTS watermark_value TIMESTAMP
+                """))
+                conn.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_etl_control_watermark
+                    ON etl_control (etl_name, table_name, etl_id)
+                """))
+            self._table_ready = True
+
+    def last_watermark(self, table_name: str, watermark_column: str):
+        """Ultima marca exitosa de la tabla para esa columna, o None si no hay"""
+        self.ensure_table()
+        with self.engine.connect() as conn:
+            return conn.execute(text("""
+                SELECT watermark_value FROM etl_control
+                WHERE etl_name = :etl_name AND table_name = :table_name
+                  AND watermark_column = :column AND status = 'SUCCESS'
+                ORDER BY etl_id DESC
+                LIMIT 1
+            """), {'etl_name': ETL_NAME, 'table_name': table_name, 'column': watermark_column}).scalar()
+
+    def committed_runs(self, table_name: str) -> set:
+        """etl_id de las ejecuciones exitosas de la tabla"""
+        self.ensure_table()
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT etl_id FROM etl_control
+                WHERE etl_name = :etl_name AND table_name = :table_name AND status = 'SUCCESS'
+            """), {'etl_name': ETL_NAME, 'table_name': table_name}).fetchall()
+        return {row[0] for row in rows}
+
+    def start(self, table_name: str, watermark_column: str) -> int:
+        """Registra el inicio de una ejecucion y retorna su etl_id"""
+        self.ensure_table()
+        with self.engine.begin() as conn:
+            return conn.execute(text("""
+                INSERT INTO etl_control (etl_name, table_name, watermark_column, start_time, status)
+                VALUES (:etl_name, :table_name, :column, CURRENT_TIMESTAMP, 'RUNNING')
+                RETURNING etl_id
+            """), {'etl_name': ETL_NAME, 'table_name': table_name, 'column': watermark_column}).scalar()
+
+    def finish(self, etl_id: int, records: int, watermark_value):
+        """Marca la ejecucion como exitosa con la nueva marca de agua"""
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE etl_control
+                SET end_time = CURRENT_TIMESTAMP, status = 'SUCCESS',
+                    records_processed = :records, watermark_value = :watermark
+                WHERE etl_id = :etl_id
+            """), {'etl_id': etl_id, 'records': records, 'watermark': watermark_value})
+
+    def fail(self, etl_id: int, error: Exception):
+        """Marca la ejecucion como fallida; su marca no se usa en la siguiente"""
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE etl_control
+                SET end_time = CURRENT_TIMESTAMP, status = 'FAILED', error_message = :error
+                WHERE etl_id = :etl_id
+            """), {'etl_id': etl_id, 'error': str(error)[:1000]})
+
+    def ceiling(self) -> object:
+        """
+        Limite superior seguro para la marca de agua de esta ejecucion
+
+        created_at toma el inicio de la transaccion que inserta, por lo que una
+        transaccion abierta puede confirmar despues filas con created_at anterior
+        a ahora. El limite es el inicio de la transaccion abierta mas antigua (o
+        ahora si no hay): toda fila con created_at menor ya esta confirmada y sera
+        visible en el snapshot que se tome despues de esta consulta.
+        """
+        with self.engine.connect() as conn:
+            return conn.execute(text("""
+                SELECT LEAST(clock_timestamp()::timestamp, MIN(xact_start)::timestamp)
+                FROM pg_stat_activity
+                WHERE datname = current_database()
+                  AND backend_type = 'client backend'
+                  AND pid <> pg_backend_pid()
+                  AND xact_start IS NOT NULL
+            """)).scalar()
@@ -0,0 +1,392 @@
+"""
+Motor Arrow de la Fase 3 (transform.engine: arrow)
+Construye el modelo estrella sobre pa.Table con kernels de pyarrow.compute, sin
+pasar por pandas: las normalizaciones de DataCleaner (utf8_upper, utf8_lower +
+utf8_trim_whitespace, filtros de rango empujados al lector, duplicados con un
+group-by), las regiones y el tamano de producto de DimensionBuilder, y las
+agregaciones y foreign keys de fct_orders. Los kernels de Arrow liberan el GIL
+y trabajan sobre los buffers de las columnas; las tablas se escriben a Parquet
+tal cual.
+
+El resultado es el mismo que el del motor pandas: los group-by se ejecutan sin
+hilos para conservar el orden de lectura (primer item o pago de cada orden,
+duplicado que se conserva), las sumas de montos usan la suma compensada de
+groupby().sum() y las tablas se devuelven con el schema Arrow del motor pandas
+(ver dtype_policy.cast_to_star_schema).
+"""
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from loguru import logger
+
+from create_dimensions import REGIONS, SIZE_LABELS, SIZE_THRESHOLDS_G
+from dtype_policy import cast_to_star_schema
+from scripts.staging_io import read_staging_arrow
+
+_ROW = '_row'
+_MICROS_PER_DAY = 86_400_000_000.0
+
+
+def _row_numbers(table: pa.Table) -> pa.Array:
+    return pa.array(np.arange(table.num_rows, dtype=np.int64))
+
+
+def _surrogate_keys(table: pa.Table) -> pa.Array:
+    return pa.array(np.arange(1, table.num_rows + 1, dtype=np.int64))
+
+
+def replace_column(table: pa.Table, column: str, values) -> pa.Table:
+    """Reemplaza column en la misma posicion"""
+    return table.set_column(table.schema.get_field_index(column), column, values)
+
+
+def drop_duplicates(table: pa.Table, key: str) -> pa.Table:
+    """Primera fila de cada valor de key, en el orden original (drop_duplicates keep='first')"""
+    indexed = table.append_column(_ROW, _row_numbers(table))
+    first = indexed.group_by(key, use_threads=False).aggregate([(_ROW, 'min')])
+    rows = np.sort(first[f"{_ROW}_min"].to_numpy())
+    if len(rows) != table.num_rows:
+        logger.warning(f"Se eliminaron {table.num_rows - len(rows)} filas duplicadas por {key}")
+    return table.take(rows)
+
+
+def group_rows(table: pa.Table, key: str, aggregations: list = ()) -> tuple:
+    """
+    Group-by estable de table por key
+
+    Returns:
+        (grupos con key y aggregations, offsets de cada grupo, filas de table
+        ordenadas por grupo y, dentro del grupo, en el orden original)
+    """
+    indexed = table.append_column(_ROW, _row_numbers(table))
+    grouped = indexed.group_by(key, use_threads=False).aggregate([*aggregations, (_ROW, 'list')])
+    rows = grouped[f"{_ROW}_list"].combine_chunks()
+    return (grouped.drop_columns([f"{_ROW}_list"]),
+            rows.offsets.to_numpy(), rows.values.to_numpy())
+
+
+def compensated_group_sum(values: pa.ChunkedArray, offsets: np.ndarray, rows: np.ndarray) -> pa.Array:
+    """
+    Suma de cada grupo con la suma compensada (Kahan) de groupby().sum() de pandas
+
+    Los grupos se recorren a la vez: el paso k suma el k-esimo valor de todos
+    los grupos que lo tienen. Los nulos no suman.
+    """
+    values = values.take(pa.array(rows)).to_numpy(zero_copy_only=False)
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    totals = np.zeros(len(lengths))
+    compensation = np.zeros(len(lengths))
+    for k in range(int(lengths.max(initial=0))):
+        groups = np.flatnonzero(lengths > k)
+        value = values[starts[groups] + k]
+        valid = ~np.isnan(value)
+        groups, value = groups[valid], value[valid]
+        y = value - compensation[groups]
+        t = totals[groups] + y
+        # Con +/- infinito la compensacion es NaN y se reinicia, como en pandas
+        compensation[groups] = np.nan_to_num((t - totals[groups]) - y, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        totals[groups] = t
+    return pa.array(totals)
+
+
+def first_in_group(values: pa.ChunkedArray, offsets: np.ndarray, rows: np.ndarray) -> pa.Array:
+    """Valor de la primera fila de cada grupo, aunque sea nulo (first(skipna=False))"""
+    return values.take(pa.array(rows[offsets[:-1]]))
+
+
+def pandas_integer(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Entero con nulos como float64, como lo tiene pandas (NaN); el resto sin cambios"""
+    if values.null_count and pa.types.is_integer(values.type):
+        return values.cast(pa.float64())
+    return values
+
+
+def lookup(keys: pa.ChunkedArray, dimension: pa.Table, id_column: str, value_column: str) -> pa.ChunkedArray:
+    """Valor de la dimension para cada clave (nulo si no esta): join left por hash, en el orden de keys"""
+    positions = pc.index_in(keys, value_set=dimension[id_column])
+    return dimension[value_column].take(positions)
+
+
+def map_regions(states: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Region de cada estado ('Desconocido' si no esta en REGIONS o es nulo)"""
+    positions = pc.index_in(states, value_set=pa.array(list(REGIONS)))
+    return pc.fill_null(pa.array(list(REGIONS.values())).take(positions), 'Desconocido')
+
+
+def classify_product_size(weights: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Mismas condiciones que create_dimensions.classify_product_size (nulo -> 'grande')"""
+    labels = pa.scalar(SIZE_LABELS[-1])
+    for threshold, label in reversed(list(zip(SIZE_THRESHOLDS_G, SIZE_LABELS))):
+        labels = pc.if_else(pc.fill_null(pc.less(weights, threshold), False), label, labels)
+    return pc.if_else(pc.fill_null(pc.equal(weights, 0), False), 'desconocido', labels)
+
+
+def days_between(end: pa.ChunkedArray, start: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Dias completos entre dos timestamps, redondeados hacia abajo como .dt.days (float64 si hay nulos)"""
+    micros = pc.subtract(end, start).cast(pa.int64())
+    return pandas_integer(pc.floor(pc.divide(micros.cast(pa.float64()), _MICROS_PER_DAY)).cast(pa.int64()))
+
+
+def normalize_city(cities: pa.ChunkedArray) -> pa.ChunkedArray:
+    """str.lower().str.strip()"""
+    return pc.utf8_trim_whitespace(pc.utf8_lower(cities))
+
+
+class ArrowStarSchemaBuilder:
+    """
+    Construye las dimensiones y la tabla de hechos con pyarrow.compute
+
+    Los datos limpios y las dimensiones se calculan una vez por builder (como
+    la cache de DataCleaner) y se conservan como pa.Table.
+    """
+
+    def __init__(self, staging_path: str = "data/staging"):
+        self.staging_path = Path(staging_path)
+        self._tables = {}
+
+    def _memoized(self, name: str, build) -> pa.Table:
+        if name not in self._tables:
+            self._tables[name] = build()
+        return self._tables[name]
+
+    def _read(self, table_name: str, columns: list, filters: ds.Expression = None) -> pa.Table:
+        return read_staging_arrow(self.staging_path, table_name, columns=columns, filters=filters)
+
+    def _finish(self, table: pa.Table, table_name: str) -> pa.Table:
+        table = cast_to_star_schema(table, table_name)
+        logger.success(f"{table_name} creada con Arrow: {table.num_rows} registros "
+                       f"({table.nbytes / 1024 / 1024:.1f} MB)")
+        return table
+
+    # Limpieza (mismas reglas que DataCleaner)
+
+    def clean_customers(self) -> pa.Table:
+        def build():
+            table = drop_duplicates(self._read('customers', ['customer_id', 'customer_unique_id',
+                                                             'customer_zip_code_prefix', 'customer_city',
+                                                             'customer_state']), 'customer_id')
+            table = table.filter(pc.and_(pc.is_valid(table['customer_id']),
+                                         pc.is_valid(table['customer_zip_code_prefix'])))
+            table = replace_column(table, 'customer_state', pc.utf8_upper(table['customer_state']))
+            return replace_column(table, 'customer_city', normalize_city(table['customer_city']))
+        return self._memoized('clean_customers', build)
+
+    def clean_products(self) -> pa.Table:
+        def build():
+            numeric_cols = ['product_name_lenght', 'product_description_lenght', 'product_photos_qty',
+                            'product_weight_g', 'product_length_cm', 'product_height_cm', 'product_width_cm']
+            table = self._read('products', ['product_id', 'product_category_name', *numeric_cols])
+            # Un entero con nulos se lee como float64 en pandas y sigue float64 despues del fillna
+            for column in numeric_cols:
+                table = replace_column(table, column, pandas_integer(table[column]))
+            table = drop_duplicates(table, 'product_id')
+            # Rellenar valores nulos en dimensiones con 0
+            for column in numeric_cols:
+                table = replace_column(table, column, pc.fill_null(table[column], 0))
+            return replace_column(table, 'product_category_name',
+                                  pc.fill_null(table['product_category_name'], 'sin_categoria'))
+        return self._memoized('clean_products', build)
+
+    def clean_sellers(self) -> pa.Table:
+        def build():
+            table = drop_duplicates(self._read('sellers', ['seller_id', 'seller_zip_code_prefix',
+                                                           'seller_city', 'seller_state']), 'seller_id')
+            table = replace_column(table, 'seller_state', pc.utf8_upper(table['seller_state']))
+            return replace_column(table, 'seller_city', normalize_city(table['seller_city']))
+        return self._memoized('clean_sellers', build)
+
+    def clean_orders(self) -> pa.Table:
+        def build():
+            table = drop_duplicates(self._read('orders', [
+                'order_id', 'customer_id', 'order_status', 'order_purchase_timestamp',
+                'order_delivered_customer_date', 'order_estimated_delivery_date',
+            ]), 'order_id')
+            # Las fechas de staging ya son timestamp (to_datetime no las cambia)
+            return replace_column(table, 'order_status', pc.utf8_lower(table['order_status']))
+        return self._memoized('clean_orders', build)
+
+    def clean_order_items(self) -> pa.Table:
+        # Validar valores numericos positivos (filtro empujado al lector)
+        valid = (ds.field('price') >= 0) & (ds.field('freight_value') >= 0)
+        return self._memoized('clean_order_items', lambda: self._read(
+            'order_items', ['order_id', 'order_item_id', 'price', 'freight_value', 'product_id', 'seller_id'],
+            filters=valid))
+
+    def clean_order_payments(self) -> pa.Table:
+        def build():
+            valid = (ds.field('payment_value') >= 0) & (ds.field('payment_installments') > 0)
+            table = self._read('order_payments', ['order_id', 'payment_value', 'payment_installments',
+                                                  'payment_type'], filters=valid)
+            return replace_column(table, 'payment_type', pc.utf8_lower(table['payment_type']))
+        return self._memoized('clean_order_payments', build)
+
+    def clean_order_reviews(self) -> pa.Table:
+        def build():
+            # El score se valida despues de eliminar duplicados: no se empuja al lector
+            table = drop_duplicates(self._read('order_reviews', ['review_id', 'order_id', 'review_score']),
+                                    'review_id')
+            score = table['review_score']
+            return table.filter(pc.fill_null(pc.and_(pc.greater_equal(score, 1), pc.less_equal(score, 5)),
+                                              False))
+        return self._memoized('clean_order_reviews', build)
+
+    # Dimensiones
+
+    def create_dim_customers(self) -> pa.Table:
+        """Crea dimension de clientes"""
+        def build():
+            customers = self.clean_customers()
+            return self._finish(pa.table({
+                'customer_key': _surrogate_keys(customers),
+                **{column: customers[column] for column in customers.column_names},
+                'customer_region': map_regions(customers['customer_state']),
+            }), 'dim_customers')
+        return self._memoized('dim_customers', build)
+
+    def create_dim_products(self) -> pa.Table:
+        """Crea dimension de productos"""
+        def build():
+            products = self.clean_products()
+            translation = self._read('product_category_translation',
+                                     ['product_category_name', 'product_category_name_english'])
+            # Join left por hash; el orden del merge de pandas se restaura con las filas de cada lado
+            joined = products.append_column(_ROW, _row_numbers(products)).join(
+                translation.append_column(f"{_ROW}_right", _row_numbers(translation)),
+                keys='product_category_name', join_type='left outer',
+            ).sort_by([(_ROW, 'ascending'), (f"{_ROW}_right", 'ascending')])
+            volume = pc.multiply(pc.multiply(joined['product_length_cm'], joined['product_height_cm']),
+                                 joined['product_width_cm'])
+            return self._finish(pa.table({
+                'product_key': _surrogate_keys(joined),
+                **{column: joined[column] for column in products.column_names},
+                'product_category_name_english': pc.fill_null(joined['product_category_name_english'],
+                                                               'without_category'),
+                'product_volume_cm3': volume,
+                'product_size': classify_product_size(joined['product_weight_g']),
+            }), 'dim_products')
+        return self._memoized('dim_products', build)
+
+    def create_dim_sellers(self) -> pa.Table:
+        """Crea dimension de vendedores"""
+        def build():
+            sellers = self.clean_sellers()
+            return self._finish(pa.table({
+                'seller_key': _surrogate_keys(sellers),
+                **{column: sellers[column] for column in sellers.column_names},
+                'seller_region': map_regions(sellers['seller_state']),
+            }), 'dim_sellers')
+        return self._memoized('dim_sellers', build)
+
+    def create_dim_date(self) -> pa.Table:
+        """Crea dimension de fecha (dias entre la primera y la ultima compra)"""
+        def build():
+            bounds = pc.min_max(self.clean_orders()['order_purchase_timestamp'])
+            first_day, last_day = (np.datetime64(pc.floor_temporal(bounds[bound], unit='day').as_py(), 'D')
+                                   for bound in ('min', 'max'))
+            full_date = pa.array(np.arange(first_day, last_day + 1).astype('datetime64[s]'))
+            quarter = pc.quarter(full_date)
+            day_of_week = pc.day_of_week(full_date)
+            return self._finish(pa.table({
+                'date_key': _surrogate_keys(pa.table({'full_date': full_date})),
+                'full_date': full_date,
+                'year': pc.year(full_date),
+                'month': pc.month(full_date),
+                'day': pc.day(full_date),
+                'quarter': quarter,
+                'day_of_week': day_of_week,
+                'day_name': pc.strftime(full_date, format='%A', locale='C'),
+                'month_name': pc.strftime(full_date, format='%B', locale='C'),
+                'is_weekend': pc.greater_equal(day_of_week, 5),
+                'week_of_year': pc.iso_week(full_date),
+                'day_of_year': pc.day_of_year(full_date),
+                'quarter_name': pc.binary_join_element_wise('Q', quarter.cast(pa.string()), ''),
+            }), 'dim_date')
+        return self._memoized('dim_date', build)
+
+    # Tabla de hechos
+
+    def _aggregate_order_items(self) -> pa.Table:
+        """Cantidad, precio y flete totales, y producto y vendedor del primer item de cada orden"""
+        items = self.clean_order_items()
+        grouped, offsets, rows = group_rows(items, 'order_id', [('order_item_id', 'count')])
+        return pa.table({
+            'order_id': grouped['order_id'],
+            'items_count': grouped['order_item_id_count'],
+            'total_items_price': compensated_group_sum(items['price'], offsets, rows),
+            'total_freight': compensated_group_sum(items['freight_value'], offsets, rows),
+            'product_id': first_in_group(items['product_id'], offsets, rows),
+            'seller_id': first_in_group(items['seller_id'], offsets, rows),
+        })
+
+    def _aggregate_order_payments(self) -> pa.Table:
+        """Valor total, cuotas maximas y tipo del primer pago de cada orden"""
+        payments = self.clean_order_payments()
+        grouped, offsets, rows = group_rows(payments, 'order_id', [('payment_installments', 'max')])
+        return pa.table({
+            'order_id': grouped['order_id'],
+            'total_payment': compensated_group_sum(payments['payment_value'], offsets, rows),
+            'max_installments': grouped['payment_installments_max'],
+            'payment_type': first_in_group(payments['payment_type'], offsets, rows),
+        })
+
+    def create_fact_orders(self) -> pa.Table:
+        """Crea tabla de hechos de ordenes"""
+        orders = self.clean_orders()
+        dim_customers = self.create_dim_customers()
+        dim_products = self.create_dim_products()
+        dim_sellers = self.create_dim_sellers()
+        dim_date = self.create_dim_date()
+
+        items = self._aggregate_order_items()
+        payments = self._aggregate_order_payments()
+        reviews = self.clean_order_reviews().group_by('order_id', use_threads=False).aggregate(
+            [('review_score', 'mean')])
+
+        order_ids = orders['order_id']
+        purchased = orders['order_purchase_timestamp']
+        delivered = orders['order_delivered_customer_date']
+        estimated = orders['order_estimated_delivery_date']
+        # Lookups sin coincidencia: los enteros pasan a float64, como en el merge left de pandas
+        total_items_price = pc.fill_null(lookup(order_ids, items, 'order_id', 'total_items_price'), 0.0)
+        total_freight = pc.fill_null(lookup(order_ids, items, 'order_id', 'total_freight'), 0.0)
+        product_ids = lookup(order_ids, items, 'order_id', 'product_id')
+        seller_ids = lookup(order_ids, items, 'order_id', 'seller_id')
+        purchase_days = pc.floor_temporal(purchased, unit='day').cast(dim_date['full_date'].type)
+        fct_orders = pa.table({
+            'order_id': order_ids,
+            'customer_key': pandas_integer(lookup(orders['customer_id'], dim_customers, 'customer_id',
+                                                  'customer_key')),
+            'product_key': pandas_integer(lookup(product_ids, dim_products, 'product_id', 'product_key')),
+            'seller_key': pandas_integer(lookup(seller_ids, dim_sellers, 'seller_id', 'seller_key')),
+            'purchase_date_key': pandas_integer(lookup(purchase_days, dim_date, 'full_date', 'date_key')),
+            'order_status': orders['order_status'],
+            'items_count': pc.fill_null(pandas_integer(lookup(order_ids, items, 'order_id', 'items_count')), 0),
+            'total_items_price': total_items_price,
+            'total_freight': total_freight,
+            'total_payment': pc.fill_null(lookup(order_ids, payments, 'order_id', 'total_payment'), 0.0),
+            'order_total_value': pc.add(total_items_price, total_freight),
+            'max_installments': pc.fill_null(
+                pandas_integer(lookup(order_ids, payments, 'order_id', 'max_installments')), 1),
+            'payment_type': lookup(order_ids, payments, 'order_id', 'payment_type'),
+            'review_score': pc.fill_null(lookup(order_ids, reviews, 'order_id', 'review_score_mean'), 0.0),
+            'delivery_time_days': days_between(delivered, purchased),
+            'estimated_delivery_time_days': days_between(estimated, purchased),
+            'is_delayed': pc.fill_null(pc.greater(delivered, estimated), False),
+            'delay_days': pc.max_element_wise(pc.fill_null(days_between(delivered, estimated), 0), 0),
+        })
+
+        # Eliminar registros sin foreign keys validas
+        initial_count = fct_orders.num_rows
+        fct_orders = fct_orders.filter(pc.and_(pc.is_valid(fct_orders['customer_key']),
+                                               pc.is_valid(fct_orders['purchase_date_key'])))
+        if fct_orders.num_rows != initial_count:
+            logger.warning(f"Se eliminaron {initial_count - fct_orders.num_rows} ordenes sin foreign keys validas")
+
+        fct_orders = fct_orders.add_column(0, 'order_key', _surrogate_keys(fct_orders))
+        return self._finish(fct_orders, 'fct_orders')
+
+    def close(self):
+        self._tables.clear()
@@ -2,6 +2,7 @@
 Script para crear dimensiones del modelo estrella
 Genera tablas de dimensiones desde datos limpios
 """
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from loguru import logger
@@ -15,46 +16,96 @@ sys.path.insert(0, str(root_dir))
 os.chdir(str(root_dir))
 
 # Importar desde el mismo directorio
-from data_cleaning import DataCleaner
+from data_cleaning import DataCleaner, merge_columns
+from dtype_policy import to_star_schema_dtypes, widen_integer
+from id_codec import key_columns
+from transform_cache import memoized
+from scripts.staging_io import read_staging_table
 
 logger.add("logs/03_create_dimensions.log", rotation="1 MB", level="INFO")
 
+# Region de cada estado de Brasil (estados fuera del mapa: 'Desconocido')
+REGIONS = {
+    'SP': 'Sudeste', 'RJ': 'Sudeste', 'MG': 'Sudeste', 'ES': 'Sudeste',
+    'PR': 'Sur', 'SC': 'Sur', 'RS': 'Sur',
+    'BA': 'Nordeste', 'SE': 'Nordeste', 'AL': 'Nordeste', 'PE': 'Nordeste',
+    'PB': 'Nordeste', 'RN': 'Nordeste', 'CE': 'Nordeste', 'PI': 'Nordeste',
+    'MA': 'Nordeste',
+    'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'DF': 'Centro-Oeste',
+    'AM': 'Norte', 'RR': 'Norte', 'AP': 'Norte', 'PA': 'Norte',
+    'TO': 'Norte', 'RO': 'Norte', 'AC': 'Norte'
+}
+
+# Clasificacion de productos por peso: 0 -> desconocido, < 500 g, < 2000 g, resto
+SIZE_THRESHOLDS_G = [500, 2000]
+SIZE_LABELS = ['pequeno', 'mediano', 'grande']
+
+
+def classify_product_size(weights: pd.Series) -> pd.Series:
+    """
+    Clasifica el tamano del producto segun su peso en gramos (vectorizado)
+    
+    Las condiciones se evaluan en orden como en un if/elif: peso 0 es
+    'desconocido'; un peso nulo no cumple ninguna y queda como 'grande'.
+    """
+    conditions = [weights == 0] + [weights < threshold for threshold in SIZE_THRESHOLDS_G]
+    labels = np.select(conditions, ['desconocido'] + SIZE_LABELS[:-1], default=SIZE_LABELS[-1])
+    return pd.Series(labels, index=weights.index)
+
 
 class DimensionBuilder:
-    """Clase para construir dimensiones del modelo estrella"""
+    """
+    Clase para construir dimensiones del modelo estrella
+    
+    Las dimensiones se memoizan en la cache del cleaner; pasar un cleaner ya
+    creado comparte sus datos limpios y dimensiones con otros builders (su
+    columns debe incluir CONSUMED_COLUMNS). build_dim_* las construye y guarda
+    con los tipos compactos del cleaner (ids codificados, ver id_codec), que usa
+    la tabla de hechos para buscar surrogate keys; create_dim_* las devuelve con
+    los tipos del DWH.
+    """
     
-    def __init__(self, staging_path: str = "data/staging"):
+    # Columnas de staging que usan las dimensiones; el cleaner solo lee estas
+    CONSUMED_COLUMNS = {
+        'customers': ['customer_id', 'customer_unique_id', 'customer_zip_code_prefix',
+                      'customer_city', 'customer_state'],
+        'products': ['product_id', 'product_category_name', 'product_name_lenght',
+                     'product_description_lenght', 'product_photos_qty', 'product_weight_g',
+                     'product_length_cm', 'product_height_cm', 'product_width_cm'],
+        'sellers': ['seller_id', 'seller_zip_code_prefix', 'seller_city', 'seller_state'],
+        'orders': ['order_purchase_timestamp'],
+    }
+    
+    def __init__(self, staging_path: str = "data/staging", start_date=None, end_date=None,
+                 cleaner: DataCleaner = None, persistent_cache: bool = None, id_codec: bool = None):
         self.staging_path = Path(staging_path)
-        self.cleaner = DataCleaner(staging_path)
-        
+        # start_date/end_date: solo ordenes de ese rango (ver DataCleaner)
+        self.cleaner = cleaner or DataCleaner(staging_path, start_date, end_date, persistent_cache,
+                                              columns=merge_columns(self.CONSUMED_COLUMNS), id_codec=id_codec)
+        self.cache = self.cleaner.cache
+    
     def create_dim_customers(self) -> pd.DataFrame:
         """Crea dimension de clientes"""
+        return to_star_schema_dtypes(self.build_dim_customers(), 'dim_customers')
+    
+    @memoized('customers')
+    def build_dim_customers(self) -> pd.DataFrame:
+        """Dimension de clientes con los tipos compactos (ids codificados)"""
         logger.info("Creando dimension de clientes...")
         
         df_customers = self.cleaner.clean_customers()
         
         # Crear dimension con campos relevantes
         dim_customers = df_customers[[
-            'customer_id',
-            'customer_unique_id',
+            *key_columns(df_customers, 'customer_id'),
+            *key_columns(df_customers, 'customer_unique_id'),
             'customer_zip_code_prefix',
             'customer_city',
             'customer_state'
         ]].copy()
         
         # Agregar clasificacion por region
-        regiones = {
-            'SP': 'Sudeste', 'RJ': 'Sudeste', 'MG': 'Sudeste', 'ES': 'Sudeste',
-            'PR': 'Sur', 'SC': 'Sur', 'RS': 'Sur',
-            'BA': 'Nordeste', 'SE': 'Nordeste', 'AL': 'Nordeste', 'PE': 'Nordeste',
-            'PB': 'Nordeste', 'RN': 'Nordeste', 'CE': 'Nordeste', 'PI': 'Nordeste',
-            'MA': 'Nordeste',
-            'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'DF': 'Centro-Oeste',
-            'AM': 'Norte', 'RR': 'Norte', 'AP': 'Norte', 'PA': 'Norte',
-            'TO': 'Norte', 'RO': 'Norte', 'AC': 'Norte'
-        }
-        
-        dim_customers['customer_region'] = dim_customers['customer_state'].map(regiones)
+        dim_customers['customer_region'] = dim_customers['customer_state'].map(REGIONS)
         dim_customers['customer_region'] = dim_customers['customer_region'].fillna('Desconocido')
         
         # Agregar surrogate key
@@ -65,12 +116,18 @@ class DimensionBuilder:
     
     def create_dim_products(self) -> pd.DataFrame:
         """Crea dimension de productos"""
+        return to_star_schema_dtypes(self.build_dim_products(), 'dim_products')
+    
+    @memoized('products', 'product_category_translation')
+    def build_dim_products(self) -> pd.DataFrame:
+        """Dimension de productos con los tipos compactos (ids codificados)"""
         logger.info("Creando dimension de productos...")
         
         df_products = self.cleaner.clean_products()
         
         # Leer traduccion de categorias
-        df_translation = pd.read_parquet(self.staging_path / "product_category_translation.parquet")
+        df_translation = read_staging_table(self.staging_path, "product_category_translation",
+                                            columns=['product_category_name', 'product_category_name_english'])
         
         # Join con traduccion
         dim_products = df_products.merge(
@@ -84,7 +141,7 @@ class DimensionBuilder:
         
         # Seleccionar campos relevantes
         dim_products = dim_products[[
-            'product_id',
+            *key_columns(dim_products, 'product_id'),
             'product_category_name',
             'product_category_name_english',
             'product_name_lenght',
@@ -96,25 +153,15 @@ class DimensionBuilder:
             'product_width_cm'
         ]].copy()
         
-        # Calcular volumen del producto
+        # Calcular volumen del producto (en int64: las medidas compactas son int16 sin nulos en staging)
         dim_products['product_volume_cm3'] = (
-            dim_products['product_length_cm'] * 
-            dim_products['product_height_cm'] * 
-            dim_products['product_width_cm']
+            widen_integer(dim_products['product_length_cm']) * 
+            widen_integer(dim_products['product_height_cm']) * 
+            widen_integer(dim_products['product_width_cm'])
         )
         
         # Clasificar por tamaño
-        def classify_size(row):
-            if row['product_weight_g'] == 0:
-                return 'desconocido'
-            elif row['product_weight_g'] < 500:
-                return 'pequeno'
-            elif row['product_weight_g'] < 2000:
-                return 'mediano'
-            else:
-                return 'grande'
-        
-        dim_products['product_size'] = dim_products.apply(classify_size, axis=1)
+        dim_products['product_size'] = classify_product_size(dim_products['product_weight_g'])
         
         # Agregar surrogate key
         dim_products.insert(0, 'product_key', range(1, len(dim_products) + 1))
@@ -124,31 +171,25 @@ class DimensionBuilder:
     
     def create_dim_sellers(self) -> pd.DataFrame:
         """Crea dimension de vendedores"""
+        return to_star_schema_dtypes(self.build_dim_sellers(), 'dim_sellers')
+    
+    @memoized('sellers')
+    def build_dim_sellers(self) -> pd.DataFrame:
+        """Dimension de vendedores con los tipos compactos (ids codificados)"""
         logger.info("Creando dimension de vendedores...")
         
         df_sellers = self.cleaner.clean_sellers()
         
         # Seleccionar campos relevantes
         dim_sellers = df_sellers[[
-            'seller_id',
+            *key_columns(df_sellers, 'seller_id'),
             'seller_zip_code_prefix',
             'seller_city',
             'seller_state'
         ]].copy()
         
         # Agregar region
-        regiones = {
-            'SP': 'Sudeste', 'RJ': 'Sudeste', 'MG': 'Sudeste', 'ES': 'Sudeste',
-            'PR': 'Sur', 'SC': 'Sur', 'RS': 'Sur',
-            'BA': 'Nordeste', 'SE': 'Nordeste', 'AL': 'Nordeste', 'PE': 'Nordeste',
-            'PB': 'Nordeste', 'RN': 'Nordeste', 'CE': 'Nordeste', 'PI': 'Nordeste',
-            'MA': 'Nordeste',
-            'GO': 'Centro-Oeste', 'MT': 'Centro-Oeste', 'MS': 'Centro-Oeste', 'DF': 'Centro-Oeste',
-            'AM': 'Norte', 'RR': 'Norte', 'AP': 'Norte', 'PA': 'Norte',
-            'TO': 'Norte', 'RO': 'Norte', 'AC': 'Norte'
-        }
-        
-        dim_sellers['seller_region'] = dim_sellers['seller_state'].map(regiones)
+        dim_sellers['seller_region'] = dim_sellers['seller_state'].map(REGIONS)
         dim_sellers['seller_region'] = dim_sellers['seller_region'].fillna('Desconocido')
         
         # Agregar surrogate key
@@ -157,6 +198,7 @@ class DimensionBuilder:
         logger.success(f"Dimension vendedores creada: {len(dim_sellers)} registros")
         return dim_sellers
     
+    @memoized('orders')
     def create_dim_date(self) -> pd.DataFrame:
         """Crea dimension de fecha"""
         logger.info("Creando dimension de fecha...")
@@ -194,7 +236,7 @@ class DimensionBuilder:
         dim_date['quarter_name'] = 'Q' + dim_date['quarter'].astype(str)
         
         logger.success(f"Dimension fecha creada: {len(dim_date)} registros")
-        return dim_date
+        return to_star_schema_dtypes(dim_date, 'dim_date')
     
     def create_all_dimensions(self) -> dict:
         """Crea todas las dimensiones"""
@@ -15,19 +15,98 @@ sys.path.insert(0, str(root_dir))
 os.chdir(str(root_dir))
 
 # Importar desde el mismo directorio
-from data_cleaning import DataCleaner
+from data_cleaning import DataCleaner, merge_columns
 from create_dimensions import DimensionBuilder
+from dtype_policy import compact_frame, memory_mb, to_star_schema_dtypes
+from id_codec import key_columns
 
 logger.add("logs/03_create_fact_table.log", rotation="1 MB", level="INFO")
 
 
+def first_rows(df: pd.DataFrame, keys: list, columns: list) -> pd.DataFrame:
+    """
+    columns de la primera fila de cada grupo de keys, aunque sean nulos, indexado por keys
+
+    Equivale a groupby(keys)[columns].first(skipna=False), que no existe antes de
+    pandas 2.2.1. Las claves nulas no forman grupo (como en groupby).
+    """
+    first = df.drop_duplicates(keys, keep='first').dropna(subset=keys)
+    return first.set_index(keys)[columns]
+
+
+def aggregate_order_items(df_order_items: pd.DataFrame) -> pd.DataFrame:
+    """
+    Metricas de items por orden: cantidad, precio y flete totales, y producto y
+    vendedor del primer item (primera fila del grupo, aunque sea nula)
+    
+    Los ids pueden venir en hex o codificados (ver id_codec).
+    """
+    order_keys = key_columns(df_order_items, 'order_id')
+    grouped = df_order_items.groupby(order_keys)
+    order_items_agg = grouped.agg(
+        items_count=('order_item_id', 'count'),
+        total_items_price=('price', 'sum'),
+        total_freight=('freight_value', 'sum'),
+    )
+    first_columns = [*key_columns(df_order_items, 'product_id'), *key_columns(df_order_items, 'seller_id')]
+    return order_items_agg.join(first_rows(df_order_items, order_keys, first_columns)).reset_index()
+
+
+def aggregate_order_payments(df_order_payments: pd.DataFrame) -> pd.DataFrame:
+    """Metricas de pagos por orden: valor total, cuotas maximas y tipo del primer pago"""
+    order_keys = key_columns(df_order_payments, 'order_id')
+    order_payments_agg = df_order_payments.groupby(order_keys).agg(
+        total_payment=('payment_value', 'sum'),
+        max_installments=('payment_installments', 'max'),
+    )
+    return order_payments_agg.join(first_rows(df_order_payments, order_keys, ['payment_type'])).reset_index()
+
+
+def lookup_dimension_keys(df: pd.DataFrame, dimension: pd.DataFrame, id_column: str,
+                          key_column: str) -> pd.Series:
+    """
+    Surrogate key de la dimension para el id de cada fila (NaN si no esta)
+    
+    Es un merge sobre la clave del id, no un dict de strings de Python: con ids
+    codificados se unen los enteros (hi, lo) de la dimension compacta
+    (DimensionBuilder.build_dim_*), sin volver a codificar sus ids.
+    """
+    keys = key_columns(df, id_column)
+    matched = df[keys].merge(dimension[[*keys, key_column]], on=keys, how='left')
+    return pd.Series(matched[key_column].to_numpy(), index=df.index)
+
+
 class FactTableBuilder:
-    """Clase para construir tabla de hechos"""
+    """
+    Clase para construir tabla de hechos
+    
+    Los intermedios usan tipos compactos (ver dtype_policy) y la tabla final se
+    devuelve con los tipos del DWH.
+    """
+    
+    # Columnas de staging que usa la tabla de hechos; junto con las de
+    # DimensionBuilder son las unicas que lee el cleaner
+    CONSUMED_COLUMNS = {
+        'orders': ['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp',
+                   'order_delivered_customer_date', 'order_estimated_delivery_date'],
+        'order_items': ['order_id', 'order_item_id', 'price', 'freight_value', 'product_id', 'seller_id'],
+        'order_payments': ['order_id', 'payment_value', 'payment_installments', 'payment_type'],
+        'order_reviews': ['order_id', 'review_score'],
+    }
     
-    def __init__(self, staging_path: str = "data/staging"):
+    def __init__(self, staging_path: str = "data/staging", start_date=None, end_date=None,
+                 persistent_cache: bool = None, id_codec: bool = None):
         self.staging_path = Path(staging_path)
-        self.cleaner = DataCleaner(staging_path)
-        self.dim_builder = DimensionBuilder(staging_path)
+        # start_date/end_date: solo ordenes de ese rango (ver DataCleaner)
+        # persistent_cache: reutilizar datos limpios de otras ejecuciones (por defecto config.yaml)
+        # id_codec: joins sobre ids codificados como enteros (por defecto config.yaml)
+        self.cleaner = DataCleaner(
+            staging_path, start_date, end_date, persistent_cache,
+            columns=merge_columns(self.CONSUMED_COLUMNS, DimensionBuilder.CONSUMED_COLUMNS),
+            id_codec=id_codec
+        )
+        # Mismo cleaner: datos limpios y dimensiones se calculan una vez por ejecucion
+        self.dim_builder = DimensionBuilder(staging_path, start_date, end_date, cleaner=self.cleaner)
         
     def create_fact_orders(self) -> pd.DataFrame:
         """Crea tabla de hechos de ordenes"""
@@ -38,54 +117,40 @@ class FactTableBuilder:
         df_order_items = self.cleaner.clean_order_items()
         df_order_payments = self.cleaner.clean_order_payments()
         df_order_reviews = self.cleaner.clean_order_reviews()
+        inputs_mb = sum(memory_mb(df) for df in (df_orders, df_order_items, df_order_payments, df_order_reviews))
+        logger.info(f"Memoria de datos limpios: {inputs_mb:.1f} MB")
         
-        # Cargar dimensiones
+        # Cargar dimensiones (compactas: las keys se buscan sobre los ids codificados)
         logger.info("Cargando dimensiones...")
-        dim_customers = self.dim_builder.create_dim_customers()
-        dim_products = self.dim_builder.create_dim_products()
-        dim_sellers = self.dim_builder.create_dim_sellers()
+        dim_customers = self.dim_builder.build_dim_customers()
+        dim_products = self.dim_builder.build_dim_products()
+        dim_sellers = self.dim_builder.build_dim_sellers()
         dim_date = self.dim_builder.create_dim_date()
         
         # Agregar metricas de items por orden
         logger.info("Agregando metricas de items...")
-        order_items_agg = df_order_items.groupby('order_id').agg({
-            'order_item_id': 'count',
-            'price': 'sum',
-            'freight_value': 'sum',
-            'product_id': lambda x: x.iloc[0],  # Tomar primer producto
-            'seller_id': lambda x: x.iloc[0]    # Tomar primer vendedor
-        }).reset_index()
-        
-        order_items_agg.columns = ['order_id', 'items_count', 'total_items_price', 
-                                   'total_freight', 'product_id', 'seller_id']
+        # Los enteros compactos pasan a float64 si el merge left deja ordenes sin items (como en el DWH)
+        order_items_agg = compact_frame(aggregate_order_items(df_order_items), 'order_items_agg')
         
         # Agregar metricas de pagos por orden
         logger.info("Agregando metricas de pagos...")
-        order_payments_agg = df_order_payments.groupby('order_id').agg({
-            'payment_value': 'sum',
-            'payment_installments': 'max',
-            'payment_type': lambda x: x.iloc[0]  # Tomar primer tipo de pago
-        }).reset_index()
-        
-        order_payments_agg.columns = ['order_id', 'total_payment', 
-                                     'max_installments', 'payment_type']
+        order_payments_agg = compact_frame(aggregate_order_payments(df_order_payments), 'order_payments_agg')
         
         # Agregar review score
         logger.info("Agregando reviews...")
-        order_reviews_agg = df_order_reviews.groupby('order_id').agg({
-            'review_score': 'mean'
-        }).reset_index()
-        
-        order_reviews_agg.columns = ['order_id', 'review_score']
+        order_reviews_agg = df_order_reviews.groupby(key_columns(df_order_reviews, 'order_id')).agg(
+            review_score=('review_score', 'mean')
+        ).reset_index()
         
         # Construir tabla de hechos base
         logger.info("Construyendo tabla de hechos...")
-        fct_orders = df_orders.copy()
+        fct_orders = df_orders
+        order_keys = key_columns(df_orders, 'order_id')
         
         # Join con agregaciones
-        fct_orders = fct_orders.merge(order_items_agg, on='order_id', how='left')
-        fct_orders = fct_orders.merge(order_payments_agg, on='order_id', how='left')
-        fct_orders = fct_orders.merge(order_reviews_agg, on='order_id', how='left')
+        fct_orders = fct_orders.merge(order_items_agg, on=order_keys, how='left')
+        fct_orders = fct_orders.merge(order_payments_agg, on=order_keys, how='left')
+        fct_orders = fct_orders.merge(order_reviews_agg, on=order_keys, how='left')
         
         # Rellenar valores nulos
         fct_orders['items_count'] = fct_orders['items_count'].fillna(0)
@@ -125,28 +190,22 @@ class FactTableBuilder:
         # Agregar foreign keys a dimensiones
         logger.info("Agregando foreign keys...")
         
-        # Customer key
-        customer_mapping = dim_customers.set_index('customer_id')['customer_key'].to_dict()
-        fct_orders['customer_key'] = fct_orders['customer_id'].map(customer_mapping)
-        
-        # Product key
-        product_mapping = dim_products.set_index('product_id')['product_key'].to_dict()
-        fct_orders['product_key'] = fct_orders['product_id'].map(product_mapping)
+        # Customer, product y seller keys
+        fct_orders['customer_key'] = lookup_dimension_keys(fct_orders, dim_customers, 'customer_id', 'customer_key')
+        fct_orders['product_key'] = lookup_dimension_keys(fct_orders, dim_products, 'product_id', 'product_key')
+        fct_orders['seller_key'] = lookup_dimension_keys(fct_orders, dim_sellers, 'seller_id', 'seller_key')
         
-        # Seller key
-        seller_mapping = dim_sellers.set_index('seller_id')['seller_key'].to_dict()
-        fct_orders['seller_key'] = fct_orders['seller_id'].map(seller_mapping)
-        
-        # Date key
-        dim_date['full_date'] = pd.to_datetime(dim_date['full_date'])
-        date_mapping = dim_date.set_index('full_date')['date_key'].to_dict()
-        fct_orders['purchase_date'] = fct_orders['order_purchase_timestamp'].dt.date
-        fct_orders['purchase_date'] = pd.to_datetime(fct_orders['purchase_date'])
-        fct_orders['purchase_date_key'] = fct_orders['purchase_date'].map(date_mapping)
+        # Date key: posicion del dia de compra en dim_date (-1 si no esta)
+        # normalize() trunca al dia sin crear objetos date de Python por fila
+        date_index = pd.DatetimeIndex(pd.to_datetime(dim_date['full_date']))
+        positions = date_index.get_indexer(fct_orders['order_purchase_timestamp'].dt.normalize())
+        fct_orders['purchase_date_key'] = pd.Series(
+            dim_date['date_key'].to_numpy()[positions], index=fct_orders.index
+        ).where(positions >= 0)
         
         # Seleccionar columnas finales
         fct_orders = fct_orders[[
-            'order_id',
+            *order_keys,
             'customer_key',
             'product_key',
             'seller_key',
@@ -164,7 +223,7 @@ class FactTableBuilder:
             'estimated_delivery_time_days',
             'is_delayed',
             'delay_days'
-        ]].copy()
+        ]]
         
         # Eliminar registros sin foreign keys validas
         initial_count = len(fct_orders)
@@ -178,7 +237,7 @@ class FactTableBuilder:
         fct_orders.insert(0, 'order_key', range(1, len(fct_orders) + 1))
         
         logger.success(f"Tabla de hechos creada: {len(fct_orders)} registros")
-        return fct_orders
+        return to_star_schema_dtypes(fct_orders, 'fct_orders')
     
     def create_fact_table(self) -> pd.DataFrame:
         """Crea la tabla de hechos completa"""
@@ -5,21 +5,161 @@ Lee archivos Parquet de staging y aplica transformaciones basicas
 import pandas as pd
 from pathlib import Path
 from loguru import logger
+import sys
+
+# Agregar directorio raiz al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from config.pipeline_config import load_pipeline_config
+from scripts.manifest import source_fingerprint
+from scripts.staging_io import ORDER_DATE_COLUMN, month_partition_filter, read_staging_table
+from dtype_policy import compact_frame
+from id_codec import encode_id_columns
+from transform_cache import RunCache, memoized
 
 logger.add("logs/03_data_cleaning.log", rotation="1 MB", level="INFO")
 
 
+def merge_columns(*declarations) -> dict:
+    """Une declaraciones tabla -> columnas consumidas de varios builders (sin repetir)"""
+    merged = {}
+    for declaration in declarations:
+        for table_name, columns in declaration.items():
+            current = merged.setdefault(table_name, [])
+            current.extend(column for column in columns if column not in current)
+    return merged
+
+
 class DataCleaner:
-    """Clase para limpiar y validar datos de staging"""
+    """
+    Clase para limpiar y validar datos de staging
+    
+    Con start_date/end_date solo se procesan las ordenes compradas en
+    [start_date, end_date) y los items, pagos y reviews de esas ordenes. Si
+    staging esta particionado por mes (year=/month=) solo se leen los meses del
+    rango; los filtros se empujan al lector de pyarrow.
     
-    def __init__(self, staging_path: str = "data/staging"):
+    Cada tabla limpia se memoiza en self.cache durante la ejecucion (ver
+    RunCache); limpiar dos veces la misma tabla sin cambios en staging no relee.
+    Con persistent_cache ademas se guarda en transform.cleaned_cache_path y otra
+    ejecucion la reutiliza si ni staging ni el codigo de limpieza cambiaron.
+    
+    columns (tabla -> columnas, ver CONSUMED_COLUMNS de los builders) limita
+    cada tabla a lo que usan sus consumidores: solo esas columnas, mas las que
+    necesitan las reglas de limpieza, se leen de Parquet. Cada clean_* acepta
+    ademas columns y filters (expresion de pyarrow) propios; los filtros se
+    empujan al lector y se aplican antes de las reglas de limpieza.
+    
+    Las tablas limpias se devuelven con tipos compactos (ver dtype_policy):
+    ids como strings Arrow, textos de baja cardinalidad como categoricos y
+    enteros reducidos. Con id_codec (por defecto transform.id_codec de
+    config.yaml) cada id hex se devuelve como dos columnas uint64
+    <id>_hi/<id>_lo (ver id_codec).
+    """
+    
+    def __init__(self, staging_path: str = "data/staging", start_date=None, end_date=None,
+                 persistent_cache: bool = None, columns: dict = None, id_codec: bool = None):
         self.staging_path = Path(staging_path)
-        
-    def clean_customers(self) -> pd.DataFrame:
+        self.columns = columns or {}
+        self.start_date = pd.Timestamp(start_date) if start_date is not None else None
+        self.end_date = pd.Timestamp(end_date) if end_date is not None else None
+        self._range_order_ids = None
+        
+        transform_config = load_pipeline_config().get('transform') or {}
+        if persistent_cache is None:
+            persistent_cache = transform_config.get('persistent_cache', False)
+        self.id_codec = transform_config.get('id_codec', False) if id_codec is None else id_codec
+        self.cache = RunCache(
+            self.staging_path,
+            cache_dir=transform_config.get('cleaned_cache_path', 'data/cleaned') if persistent_cache else None,
+            code_version=self.code_version(),
+            scope=f"{self.start_date}|{self.end_date}|{sorted(self.columns.items())}|{self.id_codec}",
+        )
+    
+    @staticmethod
+    def code_version() -> str:
+        """Version del codigo de limpieza: fuentes que definen el resultado y versiones de pandas/pyarrow"""
+        root = Path(__file__).parent.parent.parent
+        sources = source_fingerprint([
+            Path(__file__),
+            Path(__file__).parent / "transform_cache.py",
+            Path(__file__).parent / "dtype_policy.py",
+            Path(__file__).parent / "id_codec.py",
+            root / "scripts" / "staging_io.py",
+        ])
+        return f"{sources}-pandas{pd.__version__}-pyarrow{pa.__version__}"
+    
+    @property
+    def has_date_range(self) -> bool:
+        return self.start_date is not None or self.end_date is not None
+    
+    def _order_date_filter(self) -> ds.Expression:
+        """Filtro de filas de orders por fecha de compra dentro del rango"""
+        expression = ds.scalar(True)
+        if self.start_date is not None:
+            expression = expression & (ds.field(ORDER_DATE_COLUMN) >= self.start_date.to_pydatetime())
+        if self.end_date is not None:
+            expression = expression & (ds.field(ORDER_DATE_COLUMN) < self.end_date.to_pydatetime())
+        return expression
+    
+    def _projection(self, table_name: str, columns: list, required: list) -> tuple:
+        """
+        Columnas a leer y a retornar de una tabla; (None, None) = todas
+        
+        Se retornan las pedidas (o las declaradas en el constructor) y se leen
+        ademas las que necesitan las reglas de limpieza (claves de duplicados,
+        columnas validadas).
+        """
+        wanted = columns if columns is not None else self.columns.get(table_name)
+        if wanted is None:
+            return None, None
+        return list(dict.fromkeys([*wanted, *required])), list(wanted)
+    
+    @staticmethod
+    def _select(df: pd.DataFrame, wanted: list) -> pd.DataFrame:
+        """Descarta las columnas leidas solo para las reglas de limpieza"""
+        return df if wanted is None else df[wanted]
+    
+    def _finish(self, df: pd.DataFrame, wanted: list, table_name: str) -> pd.DataFrame:
+        """Columnas a retornar, ids codificados (si id_codec) y tipos compactos"""
+        df = self._select(df, wanted)
+        if self.id_codec:
+            df = encode_id_columns(df)
+        return compact_frame(df, table_name)
+    
+    def _read_orders_in_range(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
+        """Lee orders completa o solo el rango de fechas (meses podados + filtro de filas)"""
+        if not self.has_date_range:
+            return read_staging_table(self.staging_path, "orders", columns=columns, filters=filters)
+        date_filter = self._order_date_filter()
+        return read_staging_table(
+            self.staging_path, "orders", columns=columns,
+            filters=date_filter if filters is None else filters & date_filter,
+            partition_filter=month_partition_filter(self.start_date, self.end_date)
+        )
+    
+    def _read_order_child(self, table_name: str, columns: list = None,
+                          filters: ds.Expression = None) -> pd.DataFrame:
+        """Lee una tabla hija de orders; con rango, solo las filas de ordenes del rango"""
+        if not self.has_date_range:
+            return read_staging_table(self.staging_path, table_name, columns=columns, filters=filters)
+        df = read_staging_table(self.staging_path, table_name, columns=columns, filters=filters,
+                                partition_filter=month_partition_filter(self.start_date, self.end_date))
+        # Los meses del rango pueden incluir dias fuera de el
+        if self._range_order_ids is None:
+            self._range_order_ids = self._read_orders_in_range(columns=['order_id'])['order_id']
+        return df[df['order_id'].isin(self._range_order_ids)]
+    
+    @memoized('customers', persist=True)
+    def clean_customers(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de clientes"""
         logger.info("Limpiando datos de clientes...")
         
-        df = pd.read_parquet(self.staging_path / "customers.parquet")
+        read_columns, wanted = self._projection('customers', columns, ['customer_id', 'customer_zip_code_prefix'])
+        df = read_staging_table(self.staging_path, "customers", columns=read_columns, filters=filters)
         
         # Eliminar duplicados por customer_id
         original_count = len(df)
@@ -32,19 +172,23 @@ class DataCleaner:
         df = df.dropna(subset=['customer_id', 'customer_zip_code_prefix'])
         
         # Normalizar estado (mayusculas)
-        df['customer_state'] = df['customer_state'].str.upper()
+        if 'customer_state' in df.columns:
+            df['customer_state'] = df['customer_state'].str.upper()
         
         # Normalizar ciudad (minusculas)
-        df['customer_city'] = df['customer_city'].str.lower().str.strip()
+        if 'customer_city' in df.columns:
+            df['customer_city'] = df['customer_city'].str.lower().str.strip()
         
         logger.success(f"Clientes limpiados: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'customers')
     
-    def clean_products(self) -> pd.DataFrame:
+    @memoized('products', persist=True)
+    def clean_products(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de productos"""
         logger.info("Limpiando datos de productos...")
         
-        df = pd.read_parquet(self.staging_path / "products.parquet")
+        read_columns, wanted = self._projection('products', columns, ['product_id'])
+        df = read_staging_table(self.staging_path, "products", columns=read_columns, filters=filters)
         
         # Eliminar duplicados
         df = df.drop_duplicates(subset=['product_id'], keep='first')
@@ -59,34 +203,41 @@ class DataCleaner:
                 df[col] = df[col].fillna(0)
         
         # Rellenar categoria nula con 'sin_categoria'
-        df['product_category_name'] = df['product_category_name'].fillna('sin_categoria')
+        if 'product_category_name' in df.columns:
+            df['product_category_name'] = df['product_category_name'].fillna('sin_categoria')
         
         logger.success(f"Productos limpiados: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'products')
     
-    def clean_sellers(self) -> pd.DataFrame:
+    @memoized('sellers', persist=True)
+    def clean_sellers(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de vendedores"""
         logger.info("Limpiando datos de vendedores...")
         
-        df = pd.read_parquet(self.staging_path / "sellers.parquet")
+        read_columns, wanted = self._projection('sellers', columns, ['seller_id'])
+        df = read_staging_table(self.staging_path, "sellers", columns=read_columns, filters=filters)
         
         # Eliminar duplicados
         df = df.drop_duplicates(subset=['seller_id'], keep='first')
         
         # Normalizar estado
-        df['seller_state'] = df['seller_state'].str.upper()
+        if 'seller_state' in df.columns:
+            df['seller_state'] = df['seller_state'].str.upper()
         
         # Normalizar ciudad
-        df['seller_city'] = df['seller_city'].str.lower().str.strip()
+        if 'seller_city' in df.columns:
+            df['seller_city'] = df['seller_city'].str.lower().str.strip()
         
         logger.success(f"Vendedores limpiados: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'sellers')
     
-    def clean_orders(self) -> pd.DataFrame:
+    @memoized('orders', persist=True)
+    def clean_orders(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de ordenes"""
         logger.info("Limpiando datos de ordenes...")
         
-        df = pd.read_parquet(self.staging_path / "orders.parquet")
+        read_columns, wanted = self._projection('orders', columns, ['order_id'])
+        df = self._read_orders_in_range(columns=read_columns, filters=filters)
         
         # Eliminar duplicados
         df = df.drop_duplicates(subset=['order_id'], keep='first')
@@ -101,61 +252,71 @@ class DataCleaner:
                 df[col] = pd.to_datetime(df[col], errors='coerce')
         
         # Normalizar estado
-        df['order_status'] = df['order_status'].str.lower()
+        if 'order_status' in df.columns:
+            df['order_status'] = df['order_status'].str.lower()
         
         logger.success(f"Ordenes limpiadas: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'orders')
     
-    def clean_order_items(self) -> pd.DataFrame:
+    @memoized('order_items', 'orders', persist=True)
+    def clean_order_items(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de items de ordenes"""
         logger.info("Limpiando datos de items de ordenes...")
         
-        df = pd.read_parquet(self.staging_path / "order_items.parquet")
+        # Validar valores numericos positivos (filtro empujado al lector)
+        valid = (ds.field('price') >= 0) & (ds.field('freight_value') >= 0)
+        read_columns, wanted = self._projection('order_items', columns, ['order_id'])
+        df = self._read_order_child("order_items", columns=read_columns,
+                                    filters=valid if filters is None else filters & valid)
         
         # Convertir fechas
-        df['shipping_limit_date'] = pd.to_datetime(df['shipping_limit_date'], errors='coerce')
-        
-        # Validar valores numericos positivos
-        df = df[df['price'] >= 0]
-        df = df[df['freight_value'] >= 0]
+        if 'shipping_limit_date' in df.columns:
+            df['shipping_limit_date'] = pd.to_datetime(df['shipping_limit_date'], errors='coerce')
         
         logger.success(f"Items limpiados: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'order_items')
     
-    def clean_order_payments(self) -> pd.DataFrame:
+    @memoized('order_payments', 'orders', persist=True)
+    def clean_order_payments(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de pagos"""
         logger.info("Limpiando datos de pagos...")
         
-        df = pd.read_parquet(self.staging_path / "order_payments.parquet")
+        # Validar valores positivos (filtro empujado al lector)
+        valid = (ds.field('payment_value') >= 0) & (ds.field('payment_installments') > 0)
+        read_columns, wanted = self._projection('order_payments', columns, ['order_id'])
+        df = self._read_order_child("order_payments", columns=read_columns,
+                                    filters=valid if filters is None else filters & valid)
         
         # Normalizar tipo de pago
-        df['payment_type'] = df['payment_type'].str.lower()
-        
-        # Validar valores positivos
-        df = df[df['payment_value'] >= 0]
-        df = df[df['payment_installments'] > 0]
+        if 'payment_type' in df.columns:
+            df['payment_type'] = df['payment_type'].str.lower()
         
         logger.success(f"Pagos limpiados: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'order_payments')
     
-    def clean_order_reviews(self) -> pd.DataFrame:
+    @memoized('order_reviews', 'orders', persist=True)
+    def clean_order_reviews(self, columns: list = None, filters: ds.Expression = None) -> pd.DataFrame:
         """Limpia datos de reviews"""
         logger.info("Limpiando datos de reviews...")
         
-        df = pd.read_parquet(self.staging_path / "order_reviews.parquet")
+        # El score se valida despues de eliminar duplicados: no se empuja al lector
+        read_columns, wanted = self._projection('order_reviews', columns,
+                                                ['order_id', 'review_id', 'review_score'])
+        df = self._read_order_child("order_reviews", columns=read_columns, filters=filters)
         
         # Eliminar duplicados por review_id
         df = df.drop_duplicates(subset=['review_id'], keep='first')
         
         # Convertir fechas
-        df['review_creation_date'] = pd.to_datetime(df['review_creation_date'], errors='coerce')
-        df['review_answer_timestamp'] = pd.to_datetime(df['review_answer_timestamp'], errors='coerce')
+        for col in ['review_creation_date', 'review_answer_timestamp']:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
         
         # Validar score entre 1 y 5
         df = df[(df['review_score'] >= 1) & (df['review_score'] <= 5)]
         
         logger.success(f"Reviews limpiadas: {len(df)} registros")
-        return df
+        return self._finish(df, wanted, 'order_reviews')
     
     def clean_all(self) -> dict:
         """Limpia todos los datasets"""
@@ -0,0 +1,160 @@
+"""
+Politica de tipos compactos de la transformacion
+Los datos limpios y los intermedios de la tabla de hechos usan tipos compactos:
+ids de Olist como strings Arrow, textos de baja cardinalidad (estados, ciudades,
+order_status, payment_type) como categoricos y enteros reducidos al menor tipo
+que contiene sus valores. Los floats (montos y medidas) se mantienen en float64:
+en float32 cambiarian sumas y volumenes.
+
+Las tablas del modelo estrella se devuelven con los tipos que espera el DWH
+(STAR_SCHEMA_DTYPES), por lo que el Parquet escrito no cambia.
+"""
+import json
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype, is_object_dtype, is_string_dtype
+
+from id_codec import ID_COLUMNS, ID_DTYPE, ID_KEY_COLUMNS, decode_id_columns
+
+# Un texto es categorico si tiene a lo sumo esta proporcion de valores distintos
+CATEGORY_MAX_RATIO = 0.5
+
+# Tipo de texto por defecto de pandas ('str' en pandas 3, object en pandas 2)
+TEXT_DTYPE = pd.Series(['']).dtype
+
+# Tipo de pd.date_range sobre fechas (datetime64[ns] en pandas 2, [s] en pandas 3)
+DATE_RANGE_DTYPE = pd.date_range(start=date(2000, 1, 1), periods=1, freq='D').dtype
+
+# Tipos del Parquet que carga el DWH. Los enteros son el tipo sin faltantes: como
+# en pandas, una columna entera que tuvo faltantes (nulos de staging, merge left
+# sin coincidencia, NaT) se escribe como float64 aunque luego se rellenen o se
+# eliminen esas filas
+STAR_SCHEMA_DTYPES = {
+    'dim_customers': {
+        'customer_key': 'int64', 'customer_id': TEXT_DTYPE, 'customer_unique_id': TEXT_DTYPE,
+        'customer_zip_code_prefix': TEXT_DTYPE, 'customer_city': TEXT_DTYPE,
+        'customer_state': TEXT_DTYPE, 'customer_region': TEXT_DTYPE,
+    },
+    'dim_products': {
+        'product_key': 'int64', 'product_id': TEXT_DTYPE, 'product_category_name': TEXT_DTYPE,
+        'product_category_name_english': TEXT_DTYPE, 'product_name_lenght': 'int64',
+        'product_description_lenght': 'int64', 'product_photos_qty': 'int64',
+        'product_weight_g': 'int64', 'product_length_cm': 'int64', 'product_height_cm': 'int64',
+        'product_width_cm': 'int64', 'product_volume_cm3': 'int64', 'product_size': TEXT_DTYPE,
+    },
+    'dim_sellers': {
+        'seller_key': 'int64', 'seller_id': TEXT_DTYPE, 'seller_zip_code_prefix': TEXT_DTYPE,
+        'seller_city': TEXT_DTYPE, 'seller_state': TEXT_DTYPE, 'seller_region': TEXT_DTYPE,
+    },
+    'dim_date': {
+        'date_key': 'int64', 'full_date': DATE_RANGE_DTYPE, 'year': 'int32', 'month': 'int32',
+        'day': 'int32', 'quarter': 'int32', 'day_of_week': 'int32', 'day_name': TEXT_DTYPE,
+        'month_name': TEXT_DTYPE, 'is_weekend': 'bool', 'week_of_year': 'UInt32',
+        'day_of_year': 'int32', 'quarter_name': TEXT_DTYPE,
+    },
+    'fct_orders': {
+        'order_key': 'int64', 'order_id': TEXT_DTYPE, 'customer_key': 'int64',
+        'product_key': 'int64', 'seller_key': 'int64', 'purchase_date_key': 'int64',
+        'order_status': TEXT_DTYPE, 'items_count': 'int64', 'total_items_price': 'float64',
+        'total_freight': 'float64', 'total_payment': 'float64', 'order_total_value': 'float64',
+        'max_installments': 'int64', 'payment_type': TEXT_DTYPE, 'review_score': 'float64',
+        'delivery_time_days': 'int64', 'estimated_delivery_time_days': 'int64',
+        'is_delayed': 'bool', 'delay_days': 'int64',
+    },
+}
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    """Memoria del DataFrame en MB (memory_usage(deep=True), incluye el indice)"""
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def compact_dtype(series: pd.Series):
+    """
+    Tipo compacto de una columna (None si se deja como esta)
+
+    Los enteros se reducen sin volverse enteros con nulos (Int8...): en un merge
+    left sin coincidencias pasan a float64, como en el Parquet del DWH.
+    """
+    # Ids hex de alta cardinalidad: strings Arrow; sus claves uint64 (id_codec) no se reducen
+    if series.name in ID_COLUMNS:
+        return ID_DTYPE
+    if series.name in ID_KEY_COLUMNS:
+        return None
+    if isinstance(series.dtype, pd.CategoricalDtype) or is_bool_dtype(series.dtype):
+        return None
+    if is_string_dtype(series.dtype) or is_object_dtype(series.dtype):
+        if len(series) and series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            return 'category'
+        return None
+    if is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer').dtype
+    return None
+
+
+def compact_frame(df: pd.DataFrame, label: str) -> pd.DataFrame:
+    """Aplica la politica de tipos compactos y registra la memoria antes y despues"""
+    before = memory_mb(df)
+    dtypes = {column: dtype for column in df.columns
+              if (dtype := compact_dtype(df[column])) is not None and dtype != df[column].dtype}
+    if dtypes:
+        df = df.astype(dtypes)
+    logger.info(f"Memoria {label}: {before:.1f} MB -> {memory_mb(df):.1f} MB (tipos compactos)")
+    return df
+
+
+def to_star_schema_dtypes(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """
+    Restaura los tipos del DWH (STAR_SCHEMA_DTYPES) de una tabla del modelo estrella
+
+    Los ids codificados (ver id_codec) vuelven a hex aqui. Un entero que pandas
+    tiene como float (tuvo faltantes) o con nulos se escribe como float64.
+    """
+    before = memory_mb(df)
+    df = decode_id_columns(df)
+    dtypes = {}
+    for column, dtype in STAR_SCHEMA_DTYPES[table_name].items():
+        if is_integer_dtype(dtype) and (is_float_dtype(df[column].dtype) or df[column].isna().any()):
+            dtype = 'float64'
+        if df[column].dtype != dtype:
+            dtypes[column] = dtype
+    if dtypes:
+        df = df.astype(dtypes)
+    logger.info(f"Memoria {table_name}: {before:.1f} MB -> {memory_mb(df):.1f} MB (tipos del DWH)")
+    return df
+
+
+def widen_integer(series: pd.Series) -> pd.Series:
+    """Entero compacto como int64 (para operar sin desbordar, p. ej. multiplicar int16)"""
+    return series.astype('int64') if is_integer_dtype(series.dtype) else series
+
+
+def star_schema_arrow_schema(table_name: str, num_rows: int = 0, float_columns=()) -> pa.Schema:
+    """
+    Schema Arrow (con metadatos pandas) con el que pandas escribe la tabla con los
+    tipos de STAR_SCHEMA_DTYPES, num_rows filas y los enteros de float_columns como float64
+    """
+    dtypes = {column: 'float64' if column in float_columns and is_integer_dtype(dtype) else dtype
+              for column, dtype in STAR_SCHEMA_DTYPES[table_name].items()}
+    empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+    schema = pa.Schema.from_pandas(empty)
+    # El indice (RangeIndex) se guarda solo en los metadatos, con el numero de filas real
+    metadata = schema.pandas_metadata
+    metadata['index_columns'][0]['stop'] = num_rows
+    return schema.with_metadata({b'pandas': json.dumps(metadata).encode('utf-8')})
+
+
+def cast_to_star_schema(table: pa.Table, table_name: str) -> pa.Table:
+    """
+    Tabla Arrow de otro motor con los tipos, orden de columnas y metadatos del motor pandas
+
+    Igual que en to_star_schema_dtypes, un entero que el motor entrega como
+    float (tuvo faltantes) o con nulos se escribe como float64.
+    """
+    float_columns = [name for name in STAR_SCHEMA_DTYPES[table_name]
+                     if table[name].null_count or pa.types.is_floating(table[name].type)]
+    schema = star_schema_arrow_schema(table_name, table.num_rows, float_columns)
+    return table.select(schema.names).cast(schema)
@@ -0,0 +1,355 @@
+"""
+Motor DuckDB de la Fase 3 (transform.engine: duckdb)
+Construye el modelo estrella con SQL en un DuckDB en proceso que lee directo los
+Parquet de staging: las reglas de limpieza de DataCleaner, las dimensiones
+(regiones, tamano de producto, traduccion de categorias) y la agregacion de
+fct_orders. DuckDB paraleliza cada consulta en todos los nucleos y derrama a
+disco (transform.duckdb.temp_directory) lo que no entra en memory_limit.
+
+El resultado es el mismo que el del motor pandas: el orden de las filas de
+staging (archivo y fila dentro del archivo) se conserva en la columna _ord, que
+decide que duplicado se conserva, el primer item o pago de cada orden y las
+surrogate keys; las tablas se devuelven con el schema Arrow del motor pandas
+(ver dtype_policy.cast_to_star_schema).
+"""
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+from loguru import logger
+
+from config.pipeline_config import load_pipeline_config
+from create_dimensions import REGIONS, SIZE_LABELS, SIZE_THRESHOLDS_G
+from dtype_policy import cast_to_star_schema
+from scripts.staging_io import parquet_files, staging_table_path
+
+# Columnas de staging que lee cada tabla
+STAGING_COLUMNS = {
+    'customers': ['customer_id', 'customer_unique_id', 'customer_zip_code_prefix',
+                  'customer_city', 'customer_state'],
+    'products': ['product_id', 'product_category_name', 'product_name_lenght',
+                 'product_description_lenght', 'product_photos_qty', 'product_weight_g',
+                 'product_length_cm', 'product_height_cm', 'product_width_cm'],
+    'sellers': ['seller_id', 'seller_zip_code_prefix', 'seller_city', 'seller_state'],
+    'product_category_translation': ['product_category_name', 'product_category_name_english'],
+    'orders': ['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp',
+               'order_delivered_customer_date', 'order_estimated_delivery_date'],
+    'order_items': ['order_id', 'order_item_id', 'price', 'freight_value', 'product_id', 'seller_id'],
+    'order_payments': ['order_id', 'payment_value', 'payment_installments', 'payment_type'],
+    'order_reviews': ['review_id', 'order_id', 'review_score'],
+}
+
+# Medidas de productos (nulos -> 0 en DataCleaner)
+PRODUCT_NUMERIC_COLUMNS = ['product_name_lenght', 'product_description_lenght', 'product_photos_qty',
+                           'product_weight_g', 'product_length_cm', 'product_height_cm', 'product_width_cm']
+
+# Enteros de fct_orders que pasan a float64 en pandas si alguna orden no tiene valor
+FACT_INTEGER_COLUMNS = ['customer_key', 'product_key', 'seller_key', 'purchase_date_key', 'items_count',
+                        'max_installments', 'delivery_time_days', 'estimated_delivery_time_days', 'delay_days']
+
+# Filas por archivo reservadas en _ord (posicion del archivo * 2^40 + fila)
+_FILE_STRIDE = 2 ** 40
+# Equivalente a str.strip() de Python: espacios y separadores Unicode
+_STRIP = r"'^[\s\pZ]+|[\s\pZ]+$'"
+_MICROS_PER_DAY = 86_400_000_000
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _days(end: str, start: str) -> str:
+    """Dias completos entre dos timestamps, redondeados hacia abajo como Timedelta.days"""
+    return f"floor((epoch_us({end}) - epoch_us({start})) / {_MICROS_PER_DAY}.0)::BIGINT"
+
+
+def _pandas_integer(column: str, missing: bool, fill=None) -> str:
+    """
+    Entero como lo deja pandas: DOUBLE si la columna tuvo faltantes (NaN), aunque
+    luego se rellenen con fill
+    """
+    expression = f"{column}::DOUBLE" if missing else column
+    return expression if fill is None else f"coalesce({expression}, {fill})"
+
+
+def _region(state: str) -> str:
+    cases = " ".join(f"WHEN {_quote(code)} THEN {_quote(region)}" for code, region in REGIONS.items())
+    return f"CASE {state} {cases} ELSE 'Desconocido' END"
+
+
+def _product_size(weight: str) -> str:
+    cases = " ".join(f"WHEN {weight} < {threshold} THEN {_quote(label)}"
+                     for threshold, label in zip(SIZE_THRESHOLDS_G, SIZE_LABELS))
+    return f"CASE WHEN {weight} = 0 THEN 'desconocido' {cases} ELSE {_quote(SIZE_LABELS[-1])} END"
+
+
+class DuckDBStarSchemaBuilder:
+    """
+    Construye las dimensiones y la tabla de hechos con DuckDB
+
+    Los datos limpios y las dimensiones se materializan como tablas temporales
+    de la conexion (una vez por ejecucion, como la cache de DataCleaner).
+
+    Args:
+        staging_path: Directorio de staging
+        threads: Hilos de DuckDB (por defecto transform.duckdb.threads; null = todos los nucleos)
+        memory_limit: Limite de memoria, p. ej. "4GB" (por defecto transform.duckdb.memory_limit)
+        temp_directory: Directorio para derramar a disco (por defecto transform.duckdb.temp_directory)
+    """
+
+    def __init__(self, staging_path: str = "data/staging", threads: int = None,
+                 memory_limit: str = None, temp_directory: str = None):
+        self.staging_path = Path(staging_path)
+        duckdb_config = (load_pipeline_config().get('transform') or {}).get('duckdb') or {}
+        threads = threads or duckdb_config.get('threads')
+        memory_limit = memory_limit or duckdb_config.get('memory_limit')
+        temp_directory = temp_directory or duckdb_config.get('temp_directory', 'data/duckdb_tmp')
+
+        self.connection = duckdb.connect()
+        Path(temp_directory).mkdir(parents=True, exist_ok=True)
+        self.connection.execute(f"SET temp_directory = {_quote(Path(temp_directory).as_posix())}")
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.connection.execute(f"SET memory_limit = {_quote(str(memory_limit))}")
+        settings = self.connection.execute(
+            "SELECT current_setting('threads'), current_setting('memory_limit')"
+        ).fetchone()
+        logger.info(f"DuckDB: {settings[0]} hilos, memory_limit {settings[1]}, derrame en {temp_directory}")
+        self._created = set()
+
+    def _staging(self, table_name: str) -> str:
+        """Subconsulta con las columnas de staging de la tabla y su orden de lectura (_ord)"""
+        files = [path.resolve().as_posix()
+                 for path in parquet_files(staging_table_path(self.staging_path, table_name))]
+        if not files:
+            raise FileNotFoundError(f"No hay archivos Parquet de {table_name} en {self.staging_path}")
+        file_list = "[" + ", ".join(_quote(path) for path in files) + "]"
+        columns = ", ".join(STAGING_COLUMNS[table_name])
+        return (f"(SELECT {columns}, "
+                f"list_position({file_list}, filename)::BIGINT * {_FILE_STRIDE} + file_row_number AS _ord "
+                f"FROM read_parquet({file_list}, filename = true, file_row_number = true, "
+                f"union_by_name = true, hive_partitioning = false))")
+
+    def _first_by(self, table_name: str, key: str) -> str:
+        """Staging sin duplicados de key: se conserva la primera fila (drop_duplicates keep='first')"""
+        return (f"(SELECT * FROM {self._staging(table_name)} "
+                f"QUALIFY row_number() OVER (PARTITION BY {key} ORDER BY _ord) = 1)")
+
+    def _create(self, name: str, query: str):
+        """Materializa la consulta como tabla temporal (una vez por conexion)"""
+        if name not in self._created:
+            self.connection.execute(f"CREATE TEMP TABLE {name} AS {query}")
+            self._created.add(name)
+
+    def _fetch(self, query: str, table_name: str) -> pa.Table:
+        table = cast_to_star_schema(self.connection.sql(query).fetch_arrow_table(), table_name)
+        logger.success(f"{table_name} creada con DuckDB: {table.num_rows} registros")
+        return table
+
+    # Limpieza (mismas reglas que DataCleaner)
+
+    def _clean_customers(self):
+        self._create('clean_customers', f"""
+            SELECT customer_id, customer_unique_id, customer_zip_code_prefix,
+                   regexp_replace(lower(customer_city), {_STRIP}, '', 'g') AS customer_city,
+                   upper(customer_state) AS customer_state, _ord
+            FROM {self._first_by('customers', 'customer_id')}
+            WHERE customer_id IS NOT NULL AND customer_zip_code_prefix IS NOT NULL
+        """)
+
+    def _missing(self, relation: str, columns: list) -> dict:
+        """Si cada columna tiene nulos en relation"""
+        counts = ", ".join(f"count(*) > count({column})" for column in columns)
+        return dict(zip(columns, self.connection.execute(f"SELECT {counts} FROM {relation}").fetchone()))
+
+    def _clean_products(self):
+        if 'clean_products' in self._created:
+            return
+        # Un entero con nulos se lee como float64 en pandas (antes de eliminar duplicados)
+        missing = self._missing(self._staging('products'), PRODUCT_NUMERIC_COLUMNS)
+        numeric = ",\n                   ".join(f"{_pandas_integer(column, missing[column], 0)} AS {column}"
+                                              for column in PRODUCT_NUMERIC_COLUMNS)
+        self._create('clean_products', f"""
+            SELECT product_id,
+                   coalesce(product_category_name, 'sin_categoria') AS product_category_name,
+                   {numeric},
+                   _ord
+            FROM {self._first_by('products', 'product_id')}
+        """)
+
+    def _clean_sellers(self):
+        self._create('clean_sellers', f"""
+            SELECT seller_id, seller_zip_code_prefix,
+                   regexp_replace(lower(seller_city), {_STRIP}, '', 'g') AS seller_city,
+                   upper(seller_state) AS seller_state, _ord
+            FROM {self._first_by('sellers', 'seller_id')}
+        """)
+
+    def _clean_orders(self):
+        self._create('clean_orders', f"""
+            SELECT order_id, customer_id, lower(order_status) AS order_status,
+                   TRY_CAST(order_purchase_timestamp AS TIMESTAMP) AS order_purchase_timestamp,
+                   TRY_CAST(order_delivered_customer_date AS TIMESTAMP) AS order_delivered_customer_date,
+                   TRY_CAST(order_estimated_delivery_date AS TIMESTAMP) AS order_estimated_delivery_date,
+                   _ord
+            FROM {self._first_by('orders', 'order_id')}
+        """)
+
+    # Dimensiones
+
+    def _dim_customers(self):
+        self._clean_customers()
+        self._create('dim_customers', f"""
+            SELECT row_number() OVER (ORDER BY _ord) AS customer_key,
+                   customer_id, customer_unique_id, customer_zip_code_prefix, customer_city,
+                   customer_state, {_region('customer_state')} AS customer_region
+            FROM clean_customers
+        """)
+
+    def create_dim_customers(self) -> pa.Table:
+        """Crea dimension de clientes"""
+        self._dim_customers()
+        return self._fetch("SELECT * FROM dim_customers ORDER BY customer_key", 'dim_customers')
+
+    def _dim_products(self):
+        self._clean_products()
+        self._create('dim_products', f"""
+            SELECT row_number() OVER (ORDER BY p._ord, t._ord) AS product_key,
+                   p.product_id, p.product_category_name,
+                   coalesce(t.product_category_name_english, 'without_category') AS product_category_name_english,
+                   p.product_name_lenght, p.product_description_lenght, p.product_photos_qty,
+                   p.product_weight_g, p.product_length_cm, p.product_height_cm, p.product_width_cm,
+                   p.product_length_cm * p.product_height_cm * p.product_width_cm AS product_volume_cm3,
+                   {_product_size('p.product_weight_g')} AS product_size
+            FROM clean_products p
+            LEFT JOIN {self._staging('product_category_translation')} t
+                ON p.product_category_name = t.product_category_name
+        """)
+
+    def create_dim_products(self) -> pa.Table:
+        """Crea dimension de productos"""
+        self._dim_products()
+        return self._fetch("SELECT * FROM dim_products ORDER BY product_key", 'dim_products')
+
+    def _dim_sellers(self):
+        self._clean_sellers()
+        self._create('dim_sellers', f"""
+            SELECT row_number() OVER (ORDER BY _ord) AS seller_key,
+                   seller_id, seller_zip_code_prefix, seller_city, seller_state,
+                   {_region('seller_state')} AS seller_region
+            FROM clean_sellers
+        """)
+
+    def create_dim_sellers(self) -> pa.Table:
+        """Crea dimension de vendedores"""
+        self._dim_sellers()
+        return self._fetch("SELECT * FROM dim_sellers ORDER BY seller_key", 'dim_sellers')
+
+    def _dim_date(self):
+        self._clean_orders()
+        self._create('dim_date', """
+            WITH days AS (
+                SELECT unnest(generate_series(min(order_purchase_timestamp)::DATE::TIMESTAMP,
+                                              max(order_purchase_timestamp)::DATE::TIMESTAMP,
+                                              INTERVAL 1 DAY)) AS full_date
+                FROM clean_orders
+            )
+            SELECT row_number() OVER (ORDER BY full_date) AS date_key, full_date,
+                   year(full_date) AS year, month(full_date) AS month, day(full_date) AS day,
+                   quarter(full_date) AS quarter, isodow(full_date) - 1 AS day_of_week,
+                   dayname(full_date) AS day_name, monthname(full_date) AS month_name,
+                   isodow(full_date) IN (6, 7) AS is_weekend, week(full_date) AS week_of_year,
+                   dayofyear(full_date) AS day_of_year, 'Q' || quarter(full_date) AS quarter_name
+            FROM days
+        """)
+
+    def create_dim_date(self) -> pa.Table:
+        """Crea dimension de fecha (dias entre la primera y la ultima compra)"""
+        self._dim_date()
+        return self._fetch("SELECT * FROM dim_date ORDER BY date_key", 'dim_date')
+
+    # Tabla de hechos
+
+    def create_fact_orders(self) -> pa.Table:
+        """Crea tabla de hechos de ordenes"""
+        self._dim_customers()
+        self._dim_products()
+        self._dim_sellers()
+        self._dim_date()
+        self._create('fact_orders_all', f"""
+            WITH items AS (
+                SELECT order_id,
+                       count(order_item_id) AS items_count,
+                       fsum(price ORDER BY _ord) AS total_items_price,
+                       fsum(freight_value ORDER BY _ord) AS total_freight,
+                       first(product_id ORDER BY _ord) AS product_id,
+                       first(seller_id ORDER BY _ord) AS seller_id
+                FROM {self._staging('order_items')}
+                WHERE price >= 0 AND freight_value >= 0
+                GROUP BY order_id
+            ),
+            payments AS (
+                SELECT order_id,
+                       fsum(payment_value ORDER BY _ord) AS total_payment,
+                       max(payment_installments) AS max_installments,
+                       first(lower(payment_type) ORDER BY _ord) AS payment_type
+                FROM {self._staging('order_payments')}
+                WHERE payment_value >= 0 AND payment_installments > 0
+                GROUP BY order_id
+            ),
+            reviews AS (
+                SELECT order_id, avg(review_score) AS review_score
+                FROM {self._first_by('order_reviews', 'review_id')}
+                WHERE review_score >= 1 AND review_score <= 5
+                GROUP BY order_id
+            ),
+            fact AS (
+                SELECT o._ord, o.order_id, c.customer_key, p.product_key, s.seller_key,
+                       d.date_key AS purchase_date_key, o.order_status, i.items_count,
+                       coalesce(i.total_items_price, 0) AS total_items_price,
+                       coalesce(i.total_freight, 0) AS total_freight,
+                       coalesce(pay.total_payment, 0) AS total_payment,
+                       coalesce(i.total_items_price, 0) + coalesce(i.total_freight, 0) AS order_total_value,
+                       pay.max_installments,
+                       pay.payment_type,
+                       coalesce(r.review_score, 0) AS review_score,
+                       {_days('o.order_delivered_customer_date', 'o.order_purchase_timestamp')} AS delivery_time_days,
+                       {_days('o.order_estimated_delivery_date', 'o.order_purchase_timestamp')} AS estimated_delivery_time_days,
+                       coalesce(o.order_delivered_customer_date > o.order_estimated_delivery_date, false) AS is_delayed,
+                       {_days('o.order_delivered_customer_date', 'o.order_estimated_delivery_date')} AS delay_days
+                FROM clean_orders o
+                LEFT JOIN items i ON i.order_id = o.order_id
+                LEFT JOIN payments pay ON pay.order_id = o.order_id
+                LEFT JOIN reviews r ON r.order_id = o.order_id
+                LEFT JOIN dim_customers c ON c.customer_id = o.customer_id
+                LEFT JOIN dim_products p ON p.product_id = i.product_id
+                LEFT JOIN dim_sellers s ON s.seller_id = i.seller_id
+                LEFT JOIN dim_date d ON d.full_date = date_trunc('day', o.order_purchase_timestamp)
+            )
+            SELECT * FROM fact
+        """)
+
+        # Como en pandas, los faltantes se cuentan sobre todas las ordenes, antes de filtrar
+        missing = self._missing('fact_orders_all', FACT_INTEGER_COLUMNS)
+        integer = {column: _pandas_integer(column, missing[column]) for column in FACT_INTEGER_COLUMNS}
+        integer.update(items_count=_pandas_integer('items_count', missing['items_count'], 0),
+                       max_installments=_pandas_integer('max_installments', missing['max_installments'], 1),
+                       delay_days=f"greatest({_pandas_integer('delay_days', missing['delay_days'], 0)}, 0)")
+        query = f"""
+            SELECT row_number() OVER (ORDER BY _ord) AS order_key, order_id,
+                   {integer['customer_key']} AS customer_key, {integer['product_key']} AS product_key,
+                   {integer['seller_key']} AS seller_key, {integer['purchase_date_key']} AS purchase_date_key,
+                   order_status, {integer['items_count']} AS items_count, total_items_price, total_freight,
+                   total_payment, order_total_value, {integer['max_installments']} AS max_installments,
+                   payment_type, review_score, {integer['delivery_time_days']} AS delivery_time_days,
+                   {integer['estimated_delivery_time_days']} AS estimated_delivery_time_days,
+                   is_delayed, {integer['delay_days']} AS delay_days
+            FROM fact_orders_all
+            WHERE customer_key IS NOT NULL AND purchase_date_key IS NOT NULL
+            ORDER BY _ord
+        """
+        return self._fetch(query, 'fct_orders')
+
+    def close(self):
+        self.connection.close()
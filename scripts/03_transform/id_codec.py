@@ -0,0 +1,112 @@
+"""
+Codec de ids hexadecimales de Olist a claves enteras de 128 bits
+Cada id (32 caracteres hex en minusculas) se guarda como dos columnas uint64,
+<columna>_hi y <columna>_lo, con los 16 primeros y los 16 ultimos caracteres.
+Los merges, groupbys y busquedas de dimensiones comparan enteros en vez de
+hashear strings de Python por fila, y cada id ocupa 16 bytes en vez de ~40.
+
+La conversion es vectorizada (numpy sobre los bytes del arreglo Arrow) y sin
+perdida: el orden de (hi, lo) es el orden de los ids hex. Los ids vuelven a hex
+solo al devolver las tablas del modelo estrella (ver dtype_policy).
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Ids de Olist que se codifican
+ID_COLUMNS = frozenset({
+    'order_id', 'customer_id', 'customer_unique_id', 'product_id', 'seller_id', 'review_id',
+})
+ID_DTYPE = pd.StringDtype('pyarrow')
+
+HEX_ID_LENGTH = 32
+KEY_SUFFIXES = ('_hi', '_lo')
+ID_KEY_COLUMNS = frozenset(f"{column}{suffix}" for column in ID_COLUMNS for suffix in KEY_SUFFIXES)
+
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+# Byte ASCII -> valor del digito hex (255 = no es un digito hex en minusculas)
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+_HEX_VALUES[_HEX_DIGITS] = np.arange(16, dtype=np.uint8)
+
+
+def key_columns(df: pd.DataFrame, column: str) -> list:
+    """Columnas que identifican column en df: [<column>_hi, <column>_lo] si esta codificado"""
+    pair = [f"{column}{suffix}" for suffix in KEY_SUFFIXES]
+    return pair if pair[0] in df.columns else [column]
+
+
+def encode_hex_ids(values: pd.Series) -> tuple:
+    """
+    Convierte ids hex a (hi, lo) uint64; los nulos quedan como <NA> (UInt64)
+
+    Raises:
+        ValueError: Si algun id no tiene 32 caracteres hex en minusculas
+    """
+    array = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    try:
+        fixed = array.cast(pa.binary(HEX_ID_LENGTH))
+    except pa.ArrowInvalid:
+        raise ValueError(f"{values.name}: hay ids que no tienen {HEX_ID_LENGTH} caracteres") from None
+    data = np.frombuffer(fixed.buffers()[1], dtype=np.uint8,
+                         count=len(fixed) * HEX_ID_LENGTH, offset=fixed.offset * HEX_ID_LENGTH)
+    digits = _HEX_VALUES[data.reshape(-1, HEX_ID_LENGTH)]
+    valid = array.is_valid().to_numpy(zero_copy_only=False)
+    if (digits[valid] == 255).any():
+        raise ValueError(f"{values.name}: hay ids que no son hex en minusculas")
+
+    # Dos digitos por byte; 16 bytes big-endian = (hi, lo)
+    packed = np.ascontiguousarray((digits[:, 0::2] << 4) | digits[:, 1::2])
+    halves = packed.view('>u8').astype(np.uint64)
+    hi, lo = halves[:, 0], halves[:, 1]
+    if valid.all():
+        return hi, lo
+    return (pd.arrays.IntegerArray(hi, ~valid), pd.arrays.IntegerArray(lo, ~valid))
+
+
+def decode_hex_ids(hi, lo) -> pd.Series:
+    """Reconstruye los ids hex desde (hi, lo); los <NA> vuelven como nulos"""
+    hi, lo = pd.Series(hi), pd.Series(lo)
+    missing = hi.isna().to_numpy()
+    halves = np.empty((len(hi), 2), dtype='>u8')
+    halves[:, 0] = hi.to_numpy(dtype=np.uint64, na_value=0)
+    halves[:, 1] = lo.to_numpy(dtype=np.uint64, na_value=0)
+    packed = halves.view(np.uint8)
+    data = np.empty((len(hi), HEX_ID_LENGTH), dtype=np.uint8)
+    data[:, 0::2] = _HEX_DIGITS[packed >> 4]
+    data[:, 1::2] = _HEX_DIGITS[packed & 15]
+    offsets = np.arange(0, (len(data) + 1) * HEX_ID_LENGTH, HEX_ID_LENGTH, dtype=np.int64)
+    validity = pa.array(~missing).buffers()[1] if missing.any() else None
+    array = pa.Array.from_buffers(pa.large_string(), len(data),
+                                  [validity, pa.py_buffer(offsets), pa.py_buffer(data.tobytes())])
+    return pd.Series(ID_DTYPE.__from_arrow__(array), index=hi.index)
+
+
+def encode_id_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Reemplaza cada columna de ID_COLUMNS por su par <columna>_hi/_lo en la misma posicion"""
+    if not ID_COLUMNS.intersection(df.columns):
+        return df
+    columns = {}
+    for column in df.columns:
+        if column in ID_COLUMNS:
+            hi, lo = encode_hex_ids(df[column])
+            columns[f"{column}_hi"] = pd.Series(hi, index=df.index)
+            columns[f"{column}_lo"] = pd.Series(lo, index=df.index)
+        else:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index)
+
+
+def decode_id_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Reemplaza cada par <columna>_hi/_lo por la columna hex en la posicion de _hi"""
+    if not ID_KEY_COLUMNS.intersection(df.columns):
+        return df
+    columns = {}
+    for column in df.columns:
+        if column in ID_KEY_COLUMNS and column.endswith(KEY_SUFFIXES[0]):
+            name = column[:-len(KEY_SUFFIXES[0])]
+            columns[name] = decode_hex_ids(df[column], df[f"{name}{KEY_SUFFIXES[1]}"])
+        elif column not in ID_KEY_COLUMNS:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index)
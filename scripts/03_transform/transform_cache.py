@@ -0,0 +1,189 @@
+"""
+Cache de datos limpios y dimensiones de la transformacion
+En memoria, cada entrada guarda la huella de las tablas de staging de las que
+depende (tamano y mtime de sus archivos y checksum de staging/_manifest.json);
+si staging cambia, la entrada se recalcula. Las entradas persistentes (datos
+limpios) se guardan ademas en disco (data/cleaned/) con la huella del contenido
+de staging y la version del codigo, y se reutilizan entre ejecuciones
+"""
+import functools
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from scripts.manifest import DatasetManifest
+from scripts.staging_io import parquet_files, staging_table_path
+
+# Clave de la metadata Parquet con el tiempo que costo calcular la entrada
+_SECONDS_KEY = b'transform_cache.seconds'
+
+
+def copy_on_write_enabled() -> bool:
+    """Copy-on-Write activo: siempre en pandas 3, opcional (mode.copy_on_write) en pandas 2"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def detached_copy(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copia que el llamador puede modificar sin alterar data
+
+    Con Copy-on-Write basta una copia superficial (los buffers se copian al
+    escribir); sin CoW una edicion in-place llegaria a data, asi que se copia todo.
+    """
+    return data.copy(deep=not copy_on_write_enabled())
+
+
+class RunCache:
+    """
+    Memoiza DataFrames por nombre mientras viva la instancia (una ejecucion)
+
+    Se devuelve una copia (ver detached_copy): modificar el resultado no altera
+    la entrada guardada. Con Copy-on-Write (pandas 3) la copia es superficial;
+    en pandas 2 sin CoW es profunda.
+
+    Args:
+        staging_path: Directorio de staging del que dependen las entradas
+        cache_dir: Directorio de las entradas persistentes (None = solo memoria)
+        code_version: Version del codigo que produce las entradas persistentes
+        scope: Distingue entradas de un mismo metodo con otros parametros
+            (p. ej. el rango de fechas del DataCleaner)
+    """
+
+    def __init__(self, staging_path, cache_dir=None, code_version: str = "", scope: str = ""):
+        self.staging_path = Path(staging_path)
+        self.manifest = DatasetManifest(staging_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.code_version = code_version
+        self.scope = scope
+        self._entries = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _file_stamps(self, table_name: str) -> tuple:
+        """(archivo relativo a staging, tamano, mtime) de cada archivo de la tabla"""
+        stamps = []
+        for path in parquet_files(staging_table_path(self.staging_path, table_name)):
+            if path.exists():
+                stat = path.stat()
+                stamps.append((path.relative_to(self.staging_path).as_posix(), stat.st_size, stat.st_mtime_ns))
+        return tuple(stamps)
+
+    def fingerprint(self, tables) -> tuple:
+        """Huella de las tablas de staging: (archivo, tamano, mtime) y checksum del manifest"""
+        checksums = self.manifest.checksums(tables)
+        return tuple((table_name, checksums[table_name], self._file_stamps(table_name)) for table_name in tables)
+
+    def content_fingerprint(self, tables) -> tuple:
+        """
+        Huella estable entre ejecuciones: el checksum del manifest si el manifest
+        describe los archivos actuales (mismo tamano y mtime), o los (archivo,
+        tamano, mtime) si no hay manifest o esta desactualizado
+        """
+        registered = self.manifest.load()['tables']
+        stamp = []
+        for table_name in tables:
+            stamps = self._file_stamps(table_name)
+            entry = registered.get(table_name)
+            recorded = tuple((f['path'], f['bytes'], f['mtime']) for f in entry['files']) if entry else None
+            stamp.append((table_name, entry['checksum']) if recorded == stamps else (table_name, stamps))
+        return tuple(stamp)
+
+    def _disk_path(self, key: str, tables) -> Path:
+        digest = hashlib.sha256(json.dumps(
+            [key, self.scope, self.code_version, self.content_fingerprint(tables)]
+        ).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{key}-{digest}.parquet"
+
+    def get(self, key: str, tables, compute, persist: bool = False) -> pd.DataFrame:
+        """
+        Resultado de compute() memoizado en key mientras las tablas no cambien
+
+        Con persist=True y cache_dir, un miss en memoria busca primero la entrada
+        en disco, y lo calculado se guarda en disco para otras ejecuciones.
+        """
+        fingerprint = self.fingerprint(tables)
+        entry = self._entries.get(key)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            self.hits += 1
+            self.saved_seconds += entry['seconds']
+            logger.info(f"Cache {key}: hit (se evitan {entry['seconds']:.2f} s)")
+            return detached_copy(entry['data'])
+
+        disk_path = self._disk_path(key, tables) if persist and self.cache_dir else None
+        if disk_path is not None and disk_path.exists():
+            start = time.perf_counter()
+            table = pq.read_table(disk_path)
+            data = table.to_pandas()
+            load_seconds = time.perf_counter() - start
+            seconds = float((table.schema.metadata or {}).get(_SECONDS_KEY, 0))
+            self.disk_hits += 1
+            self.saved_seconds += max(seconds - load_seconds, 0)
+            logger.info(f"Cache {key}: hit en disco {disk_path.name} "
+                        f"(lectura {load_seconds:.2f} s, calculo {seconds:.2f} s)")
+            self._entries[key] = {'fingerprint': fingerprint, 'data': data, 'seconds': seconds}
+            return detached_copy(data)
+
+        start = time.perf_counter()
+        data = compute()
+        seconds = time.perf_counter() - start
+        self.misses += 1
+        reason = "staging cambio" if entry is not None else "primera vez"
+        logger.info(f"Cache {key}: miss, {reason} ({seconds:.2f} s)")
+        self._entries[key] = {'fingerprint': fingerprint, 'data': data, 'seconds': seconds}
+        if disk_path is not None:
+            self._write_disk_entry(key, disk_path, data, seconds)
+        return detached_copy(data)
+
+    def _write_disk_entry(self, key: str, path: Path, data: pd.DataFrame, seconds: float):
+        """Guarda la entrada (con su indice) y elimina versiones anteriores de key"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(data)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               _SECONDS_KEY: str(seconds).encode('utf-8')})
+        tmp_path = path.with_suffix('.tmp')
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        for stale in self.cache_dir.glob(f"{key}-{'?' * 16}.parquet"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+    def clear(self):
+        """Descarta todas las entradas en memoria"""
+        self._entries.clear()
+
+    def log_summary(self):
+        """Registra aciertos, fallos y tiempo ahorrado"""
+        logger.info(f"Cache de transformacion: {self.hits} hits, {self.disk_hits} hits en disco, "
+                    f"{self.misses} misses, {self.saved_seconds:.2f} s ahorrados")
+
+
+def memoized(*tables, persist: bool = False):
+    """
+    Memoiza un metodo en self.cache (RunCache)
+
+    tables son las tablas de staging de las que depende el resultado; con
+    persist=True el resultado tambien se guarda en el directorio de la cache.
+    Cada combinacion de argumentos (p. ej. columns/filters) es una entrada aparte.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = method.__name__
+            arguments = [*map(str, args), *(f"{name}={value}" for name, value in sorted(kwargs.items())
+                                            if value is not None)]
+            if arguments:
+                key += '-' + hashlib.sha256(repr(arguments).encode('utf-8')).hexdigest()[:8]
+            return self.cache.get(key, tables, lambda: method(self, *args, **kwargs), persist=persist)
+        return wrapper
+    return decorator
@@ -17,6 +17,7 @@ sys.path.insert(0, str(root_dir))
 os.chdir(str(root_dir))
 
 from config.db_config import get_olap_connection_string
+from scripts.profiling import PeakMemoryTracker
 
 logger.add("logs/04_load_to_dwh.log", rotation="1 MB", level="INFO")
 
@@ -28,6 +29,8 @@ class DWHLoader:
         self.transformed_path = Path(transformed_path)
         self.engine = None
         self.connection_string = get_olap_connection_string()
+        # Metricas por tabla de la ultima carga (filas, segundos, memoria)
+        self.load_stats = {}
         
     def connect(self):
         """Establece conexion con la base de datos OLAP"""
@@ -65,6 +68,15 @@ class DWHLoader:
             logger.error(f"Error al limpiar tablas OLAP: {e}")
             return False
     
+    def _record_stats(self, table_name: str, rows: int, tracker: PeakMemoryTracker):
+        """Guarda las metricas de carga de una tabla"""
+        self.load_stats[table_name] = {
+            'rows': rows,
+            'seconds': round(tracker.seconds, 3),
+            'rows_per_sec': round(rows / tracker.seconds) if tracker.seconds > 0 else None,
+            'peak_delta_mb': round(tracker.delta_mb, 1),
+        }
+    
     def load_dimension(self, dimension_name: str, table_name: str):
         """
         Carga una dimension al DWH
@@ -76,22 +88,24 @@ class DWHLoader:
         logger.info(f"Cargando dimension {dimension_name}...")
         
         try:
-            # Leer archivo Parquet
-            parquet_file = self.transformed_path / f"{dimension_name}.parquet"
-            df = pd.read_parquet(parquet_file)
-            
-            initial_count = len(df)
-            logger.info(f"Registros leidos: {initial_count}")
-            
-            # Cargar a base de datos
-            df.to_sql(
-                table_name,
-                self.engine,
-                if_exists='append',
-                index=False,
-                method=None,
-                chunksize=5000
-            )
+            with PeakMemoryTracker() as tracker:
+                # Leer archivo Parquet
+                parquet_file = self.transformed_path / f"{dimension_name}.parquet"
+                df = pd.read_parquet(parquet_file)
+                
+                initial_count = len(df)
+                logger.info(f"Registros leidos: {initial_count}")
+                
+                # Cargar a base de datos
+                df.to_sql(
+                    table_name,
+                    self.engine,
+                    if_exists='append',
+                    index=False,
+                    method=None,
+                    chunksize=5000
+                )
+            self._record_stats(table_name, initial_count, tracker)
             
             # Verificar carga
             with self.engine.connect() as conn:
@@ -114,26 +128,28 @@ class DWHLoader:
         logger.info("Cargando tabla de hechos fct_orders...")
         
         try:
-            # Leer archivo Parquet
-            parquet_file = self.transformed_path / "fct_orders.parquet"
-            df = pd.read_parquet(parquet_file)
-            
-            initial_count = len(df)
-            logger.info(f"Registros leidos: {initial_count}")
-            
-            # Convertir columnas booleanas a texto para evitar problemas
-            if 'is_delayed' in df.columns:
-                df['is_delayed'] = df['is_delayed'].astype(bool)
-            
-            # Cargar a base de datos en chunks mas pequenos por ser tabla grande
-            df.to_sql(
-                'fct_orders',
-                self.engine,
-                if_exists='append',
-                index=False,
-                method=None,
-                chunksize=1000
-            )
+            with PeakMemoryTracker() as tracker:
+                # Leer archivo Parquet
+                parquet_file = self.transformed_path / "fct_orders.parquet"
+                df = pd.read_parquet(parquet_file)
+                
+                initial_count = len(df)
+                logger.info(f"Registros leidos: {initial_count}")
+                
+                # Convertir columnas booleanas a texto para evitar problemas
+                if 'is_delayed' in df.columns:
+                    df['is_delayed'] = df['is_delayed'].astype(bool)
+                
+                # Cargar a base de datos en chunks mas pequenos por ser tabla grande
+                df.to_sql(
+                    'fct_orders',
+                    self.engine,
+                    if_exists='append',
+                    index=False,
+                    method=None,
+                    chunksize=1000
+                )
+            self._record_stats('fct_orders', initial_count, tracker)
             
             # Verificar carga
             with self.engine.connect() as conn:
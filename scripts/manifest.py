@@ -0,0 +1,238 @@
+"""
+Manifest de un directorio de datos Parquet (staging o transformed)
+Por tabla registra filas, hash del schema, min/max/nulos por columna (de las
+estadisticas de los footers), y por archivo tamano, mtime y sha256 del contenido.
+La verificacion compara los footers con el manifest sin decodificar paginas de
+datos, y los checksums permiten decidir si un paso posterior puede omitirse
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from scripts.staging_io import parquet_files, staging_table_path
+
+MANIFEST_FILE = "_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def schema_hash(schema) -> str:
+    """Hash del schema Arrow (nombres y tipos, sin metadata de pandas)"""
+    return hashlib.sha256(schema.remove_metadata().to_string().encode('utf-8')).hexdigest()[:16]
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 de los bytes del archivo (no se decodifica el Parquet)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(paths) -> str:
+    """Hash del contenido de archivos de codigo/configuracion (version de un paso)"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def column_stats(metadata) -> dict:
+    """
+    min/max/nulos por columna combinando las estadisticas de todos los row groups
+
+    min/max quedan en None si algun row group no tiene estadisticas.
+    """
+    stats = {}
+    schema = metadata.schema.to_arrow_schema()
+    for index, field in enumerate(schema):
+        column = {'type': str(field.type), 'null_count': 0, 'min': None, 'max': None}
+        has_min_max = metadata.num_row_groups > 0
+        for rg in range(metadata.num_row_groups):
+            chunk_stats = metadata.row_group(rg).column(index).statistics
+            if chunk_stats is None:
+                has_min_max = False
+                column['null_count'] = None
+                continue
+            if column['null_count'] is not None and chunk_stats.has_null_count:
+                column['null_count'] += chunk_stats.null_count
+            if not chunk_stats.has_min_max:
+                # Un row group con solo nulos no tiene min/max
+                if chunk_stats.has_null_count and chunk_stats.null_count == chunk_stats.num_values:
+                    continue
+                has_min_max = False
+                continue
+            column['min'] = chunk_stats.min if column['min'] is None else min(column['min'], chunk_stats.min)
+            column['max'] = chunk_stats.max if column['max'] is None else max(column['max'], chunk_stats.max)
+        if not has_min_max:
+            column['min'] = column['max'] = None
+        column['min'], column['max'] = _json_value(column['min']), _json_value(column['max'])
+        stats[field.name] = column
+    return stats
+
+
+def _merge_column_stats(total: dict, stats: dict) -> dict:
+    """Combina las estadisticas de un archivo con las acumuladas de la tabla"""
+    if total is None:
+        return {name: dict(column) for name, column in stats.items()}
+    for name, column in stats.items():
+        current = total.get(name)
+        if current is None:
+            continue
+        for bound, pick in (('min', min), ('max', max)):
+            values = [value for value in (current[bound], column[bound]) if value is not None]
+            current[bound] = pick(values) if values else None
+        current['null_count'] = (None if current['null_count'] is None or column['null_count'] is None
+                                 else current['null_count'] + column['null_count'])
+    return total
+
+
+class DatasetManifest:
+    """
+    Manifest (_manifest.json) de las tablas de un directorio de datos
+
+    Uso:
+        manifest = DatasetManifest("data/staging")
+        manifest.record("orders")
+        problems = manifest.verify()
+    """
+
+    def __init__(self, dataset_path):
+        self.dataset_path = Path(dataset_path)
+        self.path = self.dataset_path / MANIFEST_FILE
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """Contenido del manifest (vacio si no existe o es de otra version)"""
+        if not self.path.exists():
+            return {'version': MANIFEST_VERSION, 'tables': {}}
+        data = json.loads(self.path.read_text(encoding='utf-8'))
+        if data.get('version') != MANIFEST_VERSION:
+            return {'version': MANIFEST_VERSION, 'tables': {}}
+        return data
+
+    def table(self, table_name: str) -> dict:
+        """Entrada de una tabla o None"""
+        return self.load()['tables'].get(table_name)
+
+    def record(self, table_name: str, **extra) -> dict:
+        """
+        Calcula y guarda la entrada de una tabla a partir de los footers de sus archivos
+
+        El sha256 de un archivo se reutiliza de la entrada anterior si su tamano y
+        mtime no cambiaron (las partes incrementales ya registradas no se releen).
+        extra se guarda tal cual en la entrada (p. ej. inputs de un paso).
+        """
+        path = staging_table_path(self.dataset_path, table_name)
+        with self._lock:
+            data = self.load()
+            previous = {f['path']: f for f in (data['tables'].get(table_name) or {}).get('files', [])}
+            entry = self._table_entry(table_name, path, previous)
+            entry.update(extra)
+            data['tables'][table_name] = entry
+            self._save(data)
+        return entry
+
+    def remove(self, table_name: str):
+        """Elimina la entrada de una tabla"""
+        with self._lock:
+            data = self.load()
+            if data['tables'].pop(table_name, None) is not None:
+                self._save(data)
+
+    def _table_entry(self, table_name: str, path: Path, previous: dict) -> dict:
+        files, stats, schema_hashes, rows = [], None, set(), 0
+        for file_path in parquet_files(path):
+            relative = file_path.relative_to(self.dataset_path).as_posix()
+            stat = file_path.stat()
+            metadata = pq.read_metadata(file_path)
+            known = previous.get(relative)
+            sha256 = (known['sha256'] if known and known['bytes'] == stat.st_size
+                      and known['mtime'] == stat.st_mtime_ns else file_sha256(file_path))
+            files.append({'path': relative, 'rows': metadata.num_rows, 'bytes': stat.st_size,
+                          'mtime': stat.st_mtime_ns, 'sha256': sha256})
+            schema_hashes.add(schema_hash(metadata.schema.to_arrow_schema()))
+            stats = _merge_column_stats(stats, column_stats(metadata))
+            rows += metadata.num_rows
+        checksum = hashlib.sha256(
+            ''.join(f"{f['path']}:{f['sha256']};" for f in files).encode('utf-8')
+        ).hexdigest()
+        return {
+            'path': path.relative_to(self.dataset_path).as_posix(),
+            'rows': rows,
+            'bytes': sum(f['bytes'] for f in files),
+            # Varios hashes indican partes con schemas distintos
+            'schema_hash': sorted(schema_hashes)[0] if len(schema_hashes) == 1 else sorted(schema_hashes),
+            'columns': stats or {},
+            'files': files,
+            'checksum': checksum,
+            'written_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def _save(self, data: dict):
+        tmp_path = self.path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+    def checksums(self, tables) -> dict:
+        """Checksum registrado por tabla (None si la tabla no esta en el manifest)"""
+        registered = self.load()['tables']
+        return {table: (registered.get(table) or {}).get('checksum') for table in tables}
+
+    def verify(self, tables=None, checksums: bool = False) -> dict:
+        """
+        Compara los archivos actuales con el manifest leyendo solo footers
+
+        Se comprueba que existan los mismos archivos, con el mismo tamano, numero
+        de filas y schema. Con checksums=True tambien se recalcula el sha256 de
+        los bytes de cada archivo (sigue sin decodificar datos).
+
+        Returns:
+            Diccionario tabla -> lista de problemas (vacia si la tabla coincide)
+        """
+        registered = self.load()['tables']
+        problems = {}
+        for table_name in tables if tables is not None else sorted(registered):
+            entry = registered.get(table_name)
+            if entry is None:
+                problems[table_name] = ["sin entrada en el manifest"]
+                continue
+            table_problems = []
+            expected = {f['path']: f for f in entry['files']}
+            path = staging_table_path(self.dataset_path, table_name)
+            actual = {p.relative_to(self.dataset_path).as_posix(): p for p in parquet_files(path) if p.exists()}
+            for missing in sorted(set(expected) - set(actual)):
+                table_problems.append(f"falta {missing}")
+            for extra in sorted(set(actual) - set(expected)):
+                table_problems.append(f"archivo no registrado {extra}")
+            for relative in sorted(set(expected) & set(actual)):
+                known, file_path = expected[relative], actual[relative]
+                if file_path.stat().st_size != known['bytes']:
+                    table_problems.append(f"{relative}: tamano {file_path.stat().st_size} != {known['bytes']}")
+                    continue
+                metadata = pq.read_metadata(file_path)
+                if metadata.num_rows != known['rows']:
+                    table_problems.append(f"{relative}: {metadata.num_rows} filas != {known['rows']}")
+                file_schema = schema_hash(metadata.schema.to_arrow_schema())
+                if file_schema != entry['schema_hash'] and file_schema not in entry['schema_hash']:
+                    table_problems.append(f"{relative}: schema distinto")
+                if checksums and file_sha256(file_path) != known['sha256']:
+                    table_problems.append(f"{relative}: checksum distinto")
+            problems[table_name] = table_problems
+        return problems
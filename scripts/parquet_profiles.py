@@ -0,0 +1,112 @@
+"""
+Aplicacion de perfiles de escritura Parquet (ver get_write_profile en config)
+Traduce un perfil (codec, nivel, row group, diccionario, orden y bloom filters)
+a las opciones de los escritores de pyarrow usados en staging y transformacion
+"""
+import inspect
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+
+from config.pipeline_config import DEFAULT_WRITE_PROFILE
+
+# NDV por defecto del bloom filter cuando no se conoce el tamano del row group
+DEFAULT_BLOOM_NDV = 1_048_576
+
+
+@lru_cache(maxsize=None)
+def supported_writer_options() -> frozenset:
+    """
+    Opciones opcionales del perfil que soporta el pyarrow instalado
+
+    sorting_columns (SortingColumn.from_ordering) y bloom_filter_options llegaron
+    en versiones de pyarrow posteriores al minimo de requirements.txt; deben
+    aceptarlas tanto pq.ParquetWriter como make_write_options de datasets.
+    """
+    writer_parameters = inspect.signature(pq.ParquetWriter.__init__).parameters
+    candidates = {
+        'sorting_columns': ([], hasattr(getattr(pq, 'SortingColumn', None), 'from_ordering')),
+        'bloom_filter_options': ({}, True),
+    }
+    supported = set()
+    for option, (empty_value, available) in candidates.items():
+        if not available or option not in writer_parameters:
+            continue
+        try:
+            ds.ParquetFileFormat().make_write_options(**{option: empty_value})
+        except TypeError:
+            continue
+        supported.add(option)
+    return frozenset(supported)
+
+
+@lru_cache(maxsize=None)
+def _warn_unsupported(option: str):
+    logger.warning(f"pyarrow {pa.__version__} no soporta {option}: se escribe sin esa opcion del perfil")
+
+
+def writer_options(profile: dict, schema: pa.Schema, rows_per_group: int = None) -> dict:
+    """
+    Opciones comunes a pq.ParquetWriter, pq.write_table y make_write_options
+
+    Los bloom filters son por row group, por lo que su NDV se dimensiona con las
+    filas por row group: el NDV por defecto de pyarrow (1M) ocuparia ~1 MB por
+    columna y row group aunque el row group tenga pocas filas. Las opciones que
+    el pyarrow instalado no soporta se omiten con un warning.
+    """
+    profile = profile or DEFAULT_WRITE_PROFILE
+    options = {
+        'compression': profile['compression'],
+        'compression_level': profile.get('compression_level'),
+        'use_dictionary': profile.get('use_dictionary', True),
+    }
+    sort_by = [column for column in profile.get('sort_by') or [] if column in schema.names]
+    if sort_by and 'sorting_columns' not in supported_writer_options():
+        _warn_unsupported('sorting_columns')
+    elif sort_by:
+        options['sorting_columns'] = pq.SortingColumn.from_ordering(
+            schema, [(column, 'ascending') for column in sort_by]
+        )
+    bloom_columns = [column for column in profile.get('bloom_filter_columns') or [] if column in schema.names]
+    if bloom_columns and 'bloom_filter_options' not in supported_writer_options():
+        _warn_unsupported('bloom_filter_options')
+    elif bloom_columns:
+        ndv = rows_per_group or profile.get('row_group_size') or DEFAULT_BLOOM_NDV
+        options['bloom_filter_options'] = {
+            column: {'ndv': ndv, 'fpp': profile.get('bloom_filter_fpp', 0.05)} for column in bloom_columns
+        }
+    return options
+
+
+def order_by_clause(profile: dict) -> str:
+    """ORDER BY para que la extraccion SQL entregue las filas ya ordenadas ('' si no aplica)"""
+    sort_by = profile.get('sort_by') or []
+    return f" ORDER BY {', '.join(sort_by)}" if sort_by else ""
+
+
+def write_parquet(data, output_path: Path, profile: dict) -> int:
+    """
+    Escribe un DataFrame o tabla Arrow con el perfil dado
+
+    Las filas se ordenan por sort_by antes de escribir, para que las estadisticas
+    min/max de cada row group permitan saltar datos al filtrar por esas columnas.
+
+    Returns:
+        Bytes escritos
+    """
+    table = pa.Table.from_pandas(data) if isinstance(data, pd.DataFrame) else data
+    sort_by = [column for column in profile.get('sort_by') or [] if column in table.column_names]
+    if sort_by:
+        table = table.sort_by([(column, 'ascending') for column in sort_by])
+    rows_per_group = profile.get('row_group_size') or min(table.num_rows, DEFAULT_BLOOM_NDV) or None
+    pq.write_table(
+        table, output_path,
+        row_group_size=profile.get('row_group_size'),
+        **writer_options(profile, table.schema, rows_per_group)
+    )
+    return Path(output_path).stat().st_size
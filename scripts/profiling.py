@@ -0,0 +1,65 @@
+"""
+Utilidades de medicion de tiempo y memoria para el pipeline
+"""
+import threading
+import time
+
+import psutil
+
+
+class PeakMemoryTracker:
+    """
+    Context manager que mide duracion y pico de memoria residente (RSS) del proceso
+
+    Un hilo muestrea el RSS cada `interval` segundos mientras el bloque se ejecuta.
+    El RSS es del proceso completo: si otras cargas corren en paralelo su memoria
+    tambien se incluye en la medicion.
+
+    Uso:
+        with PeakMemoryTracker() as tracker:
+            ...
+        tracker.seconds, tracker.peak_mb, tracker.delta_mb
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+        self.start_rss = 0
+        self.peak_rss = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self._process.memory_info().rss
+        self._start_time = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self._update()
+        self.seconds = time.perf_counter() - self._start_time
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._update()
+
+    def _update(self):
+        rss = self._process.memory_info().rss
+        if rss > self.peak_rss:
+            self.peak_rss = rss
+
+    @property
+    def peak_mb(self) -> float:
+        """Pico de RSS del proceso durante el bloque (MB)"""
+        return self.peak_rss / (1024 * 1024)
+
+    @property
+    def delta_mb(self) -> float:
+        """Incremento del pico de RSS respecto al inicio del bloque (MB)"""
+        return (self.peak_rss - self.start_rss) / (1024 * 1024)
@@ -0,0 +1,116 @@
+"""
+Lectura de tablas del Data Lake de staging
+Una tabla puede estar en un archivo (customers.parquet), en un directorio de
+partes Parquet (geolocation/part-00000.parquet, ...) escrito por la extraccion
+por rangos, o en un layout Hive por mes de compra de la orden
+(orders/year=2017/month=03/...); todas se leen como una sola tabla
+"""
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Fecha que define la particion year=/month= de orders y de sus tablas hijas
+ORDER_DATE_COLUMN = 'order_purchase_timestamp'
+PARTITION_COLUMNS = ('year', 'month')
+# Los directorios se escriben como texto con ceros (month=03) para que el orden
+# de los archivos sea cronologico; al leer se interpretan como enteros
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int32()), ('month', pa.int32())]), flavor='hive')
+
+
+def staging_table_path(staging_path, table_name: str) -> Path:
+    """Archivo <tabla>.parquet o, si no existe, directorio <tabla>/ con las partes"""
+    file_path = Path(staging_path) / f"{table_name}.parquet"
+    dir_path = Path(staging_path) / table_name
+    if not file_path.exists() and dir_path.is_dir():
+        return dir_path
+    return file_path
+
+
+def parquet_files(path: Path) -> list:
+    """Archivos Parquet de una tabla (el archivo mismo o las partes del directorio)"""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(path.rglob("*.parquet"))
+    return [path]
+
+
+def is_hive_partitioned(path: Path) -> bool:
+    """True si la tabla esta en un directorio con particiones year=/month="""
+    path = Path(path)
+    return path.is_dir() and any(path.glob("year=*"))
+
+
+def list_staging_tables(staging_path) -> dict:
+    """Tablas presentes en staging: nombre -> ruta (archivo o directorio)"""
+    staging_path = Path(staging_path)
+    tables = {path.stem: path for path in staging_path.glob("*.parquet")}
+    for path in staging_path.iterdir():
+        if path.is_dir() and path.name not in tables and any(path.rglob("*.parquet")):
+            tables[path.name] = path
+    return dict(sorted(tables.items()))
+
+
+def month_partition_filter(start_date=None, end_date=None) -> ds.Expression:
+    """
+    Filtro sobre year/month con los meses que tocan el rango [start_date, end_date)
+
+    Solo referencia columnas de particion, por lo que pyarrow descarta los
+    directorios fuera del rango sin abrir sus archivos.
+    """
+    year, month = ds.field('year'), ds.field('month')
+    conditions = []
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        conditions.append((year > start.year) | ((year == start.year) & (month >= start.month)))
+    if end_date is not None:
+        # Ultimo instante incluido: el mes de end_date solo cuenta si el rango entra en el
+        last = pd.Timestamp(end_date) - pd.Timedelta(microseconds=1)
+        conditions.append((year < last.year) | ((year == last.year) & (month <= last.month)))
+    expression = ds.scalar(True)
+    for condition in conditions:
+        expression = expression & condition
+    return expression
+
+
+def _read_arguments(staging_path, table_name: str, filters: ds.Expression,
+                    partition_filter: ds.Expression, kwargs: dict) -> tuple:
+    """Ruta y argumentos de lectura (pq.read_table) de una tabla de staging"""
+    path = staging_table_path(staging_path, table_name)
+    if is_hive_partitioned(path):
+        dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+        if partition_filter is not None:
+            filters = partition_filter if filters is None else filters & partition_filter
+        # Las columnas de particion no son parte de la tabla
+        if kwargs.get('columns') is None:
+            kwargs['columns'] = [name for name in dataset.schema.names if name not in PARTITION_COLUMNS]
+        kwargs['partitioning'] = PARTITIONING
+    if filters is not None:
+        kwargs['filters'] = filters
+    return path, kwargs
+
+
+def read_staging_table(staging_path, table_name: str, filters: ds.Expression = None,
+                       partition_filter: ds.Expression = None, **kwargs) -> pd.DataFrame:
+    """
+    Lee una tabla de staging (kwargs se pasan a pd.read_parquet)
+
+    Args:
+        filters: Filtro de filas sobre columnas de la tabla (se empuja al lector)
+        partition_filter: Filtro sobre year/month; solo se aplica si la tabla
+            esta particionada (ver month_partition_filter)
+    """
+    path, kwargs = _read_arguments(staging_path, table_name, filters, partition_filter, kwargs)
+    return pd.read_parquet(path, **kwargs)
+
+
+def read_staging_arrow(staging_path, table_name: str, filters: ds.Expression = None,
+                       partition_filter: ds.Expression = None, **kwargs) -> pa.Table:
+    """
+    Lee una tabla de staging como pa.Table, sin pasar por pandas (kwargs se
+    pasan a pq.read_table); mismas filas y orden que read_staging_table
+    """
+    path, kwargs = _read_arguments(staging_path, table_name, filters, partition_filter, kwargs)
+    return pq.read_table(path, **kwargs)
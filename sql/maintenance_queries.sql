@@ -154,7 +154,11 @@ CREATE TABLE IF NOT EXISTS etl_control (
     end_time TIMESTAMP,
     status VARCHAR(20),
     records_processed INTEGER,
-    error_message TEXT
+    error_message TEXT,
+    -- Staging incremental (etl_name = 'staging_incremental'): marca de agua por tabla
+    table_name VARCHAR(100),
+    watermark_column VARCHAR(100),
+    watermark_value TIMESTAMP
 );
 
 -- Registrar inicio de ETL
@@ -180,6 +184,17 @@ FROM etl_control
 ORDER BY etl_id DESC
 LIMIT 10;
 
+-- Ultima marca de agua del staging incremental por tabla
+SELECT DISTINCT ON (table_name)
+    table_name,
+    watermark_column,
+    watermark_value,
+    records_processed,
+    end_time
+FROM etl_control
+WHERE etl_name = 'staging_incremental' AND status = 'SUCCESS'
+ORDER BY table_name, etl_id DESC;
+
 -- ============================================
 -- 7. OPTIMIZACIÓN DE QUERIES
 -- ============================================
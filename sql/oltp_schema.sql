@@ -131,6 +131,16 @@ CREATE TABLE IF NOT EXISTS product_category_translation (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Tabla de control de archivos fuente (carga incremental)
+CREATE TABLE IF NOT EXISTS etl_source_files (
+    file_name VARCHAR(255) PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    mtime TIMESTAMP NOT NULL,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- ============================================
 -- Vistas útiles para OLTP
 -- ============================================
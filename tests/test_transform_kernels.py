@@ -0,0 +1,91 @@
+"""
+Comportamiento de las agregaciones de la tabla de hechos (primer valor por grupo)
+Mismos resultados que la implementacion anterior con lambda x: x.iloc[0]: el
+primer item o pago de cada orden se toma aunque tenga valores nulos.
+
+Uso:
+    python -m pytest -q tests
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts" / "03_transform"))
+
+from create_fact_table import aggregate_order_items, aggregate_order_payments
+
+
+def items(rows: list) -> pd.DataFrame:
+    columns = ['order_id', 'order_item_id', 'price', 'freight_value', 'product_id', 'seller_id']
+    return pd.DataFrame(rows, columns=columns).astype({'price': 'float64', 'freight_value': 'float64'})
+
+
+def payments(rows: list) -> pd.DataFrame:
+    columns = ['order_id', 'payment_value', 'payment_installments', 'payment_type']
+    return pd.DataFrame(rows, columns=columns).astype({'payment_value': 'float64'})
+
+
+def test_items_first_value_keeps_nulls():
+    result = aggregate_order_items(items([
+        ('b', 1, 10.0, 1.0, 'p1', 's1'),
+        ('a', 1, 1.0, 0.5, None, None),
+        ('a', 2, 2.0, 0.5, 'p2', 's2'),
+        ('b', 2, 5.0, 1.0, 'p3', None),
+    ]))
+    assert result['order_id'].tolist() == ['a', 'b']
+    assert result['items_count'].tolist() == [2, 2]
+    assert result['total_items_price'].tolist() == [3.0, 15.0]
+    assert result['total_freight'].tolist() == [1.0, 2.0]
+    assert result['product_id'].isna().tolist() == [True, False]
+    assert result['seller_id'].isna().tolist() == [True, False]
+    assert result.loc[1, 'product_id'] == 'p1'
+    assert result.loc[1, 'seller_id'] == 's1'
+
+
+def test_items_first_value_all_null_group():
+    result = aggregate_order_items(items([
+        ('a', 1, 1.0, 0.0, None, None),
+        ('a', 2, 1.0, 0.0, None, None),
+    ]))
+    assert len(result) == 1
+    assert result[['product_id', 'seller_id']].isna().all(axis=None)
+
+
+def test_items_empty():
+    result = aggregate_order_items(items([]))
+    assert result.empty
+    assert list(result.columns) == ['order_id', 'items_count', 'total_items_price', 'total_freight',
+                                    'product_id', 'seller_id']
+
+
+def test_items_null_order_id_is_not_a_group():
+    result = aggregate_order_items(items([
+        (None, 1, 1.0, 0.0, 'p0', 's0'),
+        ('a', 1, 2.0, 0.0, 'p1', 's1'),
+    ]))
+    assert result['order_id'].tolist() == ['a']
+    assert result['product_id'].tolist() == ['p1']
+
+
+def test_payments_first_value_keeps_nulls():
+    result = aggregate_order_payments(payments([
+        ('a', 1.0, 1, None),
+        ('a', 2.0, 3, 'voucher'),
+        ('b', np.nan, 2, 'boleto'),
+        ('b', 4.0, 1, 'credit_card'),
+    ]))
+    assert result['order_id'].tolist() == ['a', 'b']
+    assert result['total_payment'].tolist() == [3.0, 4.0]
+    assert result['max_installments'].tolist() == [3, 2]
+    assert pd.isna(result.loc[0, 'payment_type'])
+    assert result.loc[1, 'payment_type'] == 'boleto'
+
+
+def test_payments_empty():
+    result = aggregate_order_payments(payments([]))
+    assert result.empty
+    assert list(result.columns) == ['order_id', 'total_payment', 'max_installments', 'payment_type']
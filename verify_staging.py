@@ -1,57 +1,102 @@
 """
 Script para verificar los datos en el Data Lake Parquet
-Muestra informacion sobre los archivos y su contenido
+Muestra informacion sobre los archivos y su contenido a partir de los footers
+Parquet y de staging/_manifest.json, sin decodificar paginas de datos
+
+Uso:
+    python verify_staging.py
+    python verify_staging.py --checksums   # recalcula el sha256 de cada archivo
+    python verify_staging.py --sample 3    # muestra filas (lee la primera pagina)
 """
-import pandas as pd
+import argparse
 from pathlib import Path
+
+import pyarrow.parquet as pq
 from loguru import logger
 
+from scripts.manifest import DatasetManifest, column_stats
+from scripts.staging_io import list_staging_tables, parquet_files
+
 logger.add("logs/verify_staging.log", rotation="1 MB", level="INFO")
 
 
-def verify_parquet_files(staging_path: str = "data/staging"):
-    """Verifica los archivos Parquet en staging"""
+def verify_parquet_files(staging_path: str = "data/staging", checksums: bool = False, sample: int = 0):
+    """
+    Verifica los archivos Parquet en staging
+
+    Args:
+        checksums: Recalcular el sha256 de los archivos y compararlo con el manifest
+        sample: Filas de muestra por tabla (0 = no leer datos)
+
+    Returns:
+        True si todas las tablas coinciden con el manifest
+    """
     staging_path = Path(staging_path)
-    
+
     if not staging_path.exists():
         logger.error(f"Directorio {staging_path} no existe")
-        return
-    
-    parquet_files = list(staging_path.glob("*.parquet"))
-    
-    if not parquet_files:
+        return False
+
+    # Tablas en un archivo o en un directorio de partes (extraccion por rangos)
+    tables = list_staging_tables(staging_path)
+
+    if not tables:
         logger.warning("No se encontraron archivos Parquet")
-        return
-    
+        return False
+
+    manifest = DatasetManifest(staging_path)
+    problems = manifest.verify(tables=list(tables), checksums=checksums)
+
     logger.info("="*80)
-    logger.info(f"VERIFICACION DE DATA LAKE - {len(parquet_files)} archivos encontrados")
+    logger.info(f"VERIFICACION DE DATA LAKE - {len(tables)} tablas encontradas")
     logger.info("="*80)
-    
+
     total_size = 0
     total_records = 0
-    
-    for file_path in sorted(parquet_files):
-        df = pd.read_parquet(file_path)
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+
+    for table_name, file_path in tables.items():
+        files = parquet_files(file_path)
+        footers = [pq.read_metadata(f) for f in files]
+        records = sum(footer.num_rows for footer in footers)
+        file_size_mb = sum(f.stat().st_size for f in files) / (1024 * 1024)
         total_size += file_size_mb
-        total_records += len(df)
-        
+        total_records += records
+
+        # Estadisticas del manifest; sin entrada, las del footer del primer archivo
+        entry = manifest.table(table_name)
+        stats = entry['columns'] if entry else column_stats(footers[0])
+
         logger.info(f"\n{file_path.name}")
-        logger.info(f"  Registros: {len(df):,}")
-        logger.info(f"  Columnas: {len(df.columns)}")
+        logger.info(f"  Registros: {records:,}")
+        logger.info(f"  Columnas: {len(stats)}")
         logger.info(f"  Tamaño: {file_size_mb:.2f} MB")
-        logger.info(f"  Columnas: {', '.join(df.columns.tolist())}")
-        
-        # Mostrar primeras filas
-        logger.info(f"  Muestra de datos:")
-        logger.info(f"\n{df.head(3).to_string()}\n")
-    
+        if file_path.is_dir():
+            logger.info(f"  Partes: {len(files)}")
+        logger.info(f"  Manifest: {'OK' if not problems[table_name] else '; '.join(problems[table_name])}")
+        for column, column_stat in stats.items():
+            logger.info(f"    {column:<32} {column_stat['type']:<20} nulos={column_stat['null_count']} "
+                        f"min={column_stat['min']} max={column_stat['max']}")
+
+        if sample:
+            rows = next(pq.ParquetFile(files[0]).iter_batches(batch_size=sample), None)
+            if rows is not None:
+                logger.info(f"  Muestra de datos:")
+                logger.info(f"\n{rows.to_pandas().head(sample).to_string()}\n")
+
+    valid = not any(problems.values())
     logger.info("="*80)
     logger.info(f"RESUMEN TOTAL")
     logger.info(f"  Total registros: {total_records:,}")
     logger.info(f"  Tamaño total: {total_size:.2f} MB")
+    logger.info(f"  Manifest: {'OK' if valid else 'con diferencias'}")
     logger.info("="*80)
+    return valid
 
 
 if __name__ == "__main__":
-    verify_parquet_files()
+    parser = argparse.ArgumentParser(description="Verificacion del Data Lake de staging")
+    parser.add_argument('--staging', type=str, default="data/staging", help="Directorio de staging")
+    parser.add_argument('--checksums', action='store_true', help="Recalcular el sha256 de cada archivo")
+    parser.add_argument('--sample', type=int, default=0, help="Filas de muestra por tabla")
+    args = parser.parse_args()
+    verify_parquet_files(args.staging, checksums=args.checksums, sample=args.sample)
@@ -1,10 +1,14 @@
 """
 Script para verificar el modelo estrella creado en la fase de transformacion
 Muestra estadisticas y samples de las dimensiones y tabla de hechos
+Las dimensiones se verifican con los footers Parquet y data/transformed/_manifest.json
 """
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 
+from scripts.manifest import DatasetManifest
+
 def verify_transformed_data():
     """Verifica los datos transformados en data/transformed/"""
     
@@ -19,6 +23,16 @@ def verify_transformed_data():
     print("VERIFICACION DEL MODELO ESTRELLA")
     print("="*80)
     
+    manifest = DatasetManifest(transformed_path)
+    problems = manifest.verify()
+    if not problems:
+        print("\nManifest: NO ENCONTRADO")
+    else:
+        print(f"\nManifest: {'OK' if not any(problems.values()) else 'con diferencias'}")
+        for table_name, table_problems in problems.items():
+            for problem in table_problems:
+                print(f"  {table_name}: {problem}")
+    
     # Verificar dimensiones
     dimensions = [
         ('dim_customers.parquet', 'Dimension Clientes'),
@@ -34,14 +48,14 @@ def verify_transformed_data():
     for filename, name in dimensions:
         filepath = transformed_path / filename
         if filepath.exists():
-            df = pd.read_parquet(filepath)
-            total_dim_records += len(df)
+            # Solo el footer: filas y columnas sin decodificar datos
+            metadata = pq.read_metadata(filepath)
+            columns = metadata.schema.to_arrow_schema().names
+            total_dim_records += metadata.num_rows
             print(f"\n{name}: {filename}")
-            print(f"  Registros: {len(df):,}")
-            print(f"  Columnas: {len(df.columns)}")
-            print(f"  Campos: {', '.join(df.columns.tolist())}")
-            print(f"\n  Muestra de datos:")
-            print(df.head(3).to_string(index=False))
+            print(f"  Registros: {metadata.num_rows:,}")
+            print(f"  Columnas: {len(columns)}")
+            print(f"  Campos: {', '.join(columns)}")
         else:
             print(f"\n{name}: NO ENCONTRADO")
     